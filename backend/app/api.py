@@ -1,71 +1,309 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy import delete as sqldelete, update as sqlupdate
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete as sqldelete, tuple_
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlmodel import Session, select
-
-from .database import SessionLocal
-from . import schemas, models
-from .payroll import gross_to_net, PayrollInputData
-from .tarif import berechne_nrw_2025, TarifInputData, get_monthly_breakdown
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .audit import log_action
+from .database import AsyncSessionLocal, INSERT_BY_DIALECT
+from . import (
+    audit, auth, cache, income, jobs, live, metrics, payroll, payroll_batch, revisions, schemas,
+    settings, snapshots, summary, models, transfer,
+)
+from .cache import gross_to_net, berechne_nrw_2025, get_monthly_breakdown
+from .payroll import KIST_BY_STATE, PayrollInputData
+from .responses import FastJSONResponse
+from .tarif import TarifInputData
 
 router = APIRouter()
+# routes that must stay reachable without a token (main.py guards ``router``)
+public_router = APIRouter()
+
+# calculators without a cache in front (the cached ones are timed in cache.py)
+net_to_gross = metrics.timed("net_to_gross")(payroll.net_to_gross)
+gross_to_net_batch = metrics.timed("gross_to_net_batch")(payroll_batch.gross_to_net_batch)
+net_curve = metrics.timed("net_curve")(payroll_batch.net_curve)
+monthly_net = metrics.timed("monthly_net")(income.monthly_net)
+
+# rows per statement for bulk writes
+UPSERT_CHUNK = 1_000
 
 
 # ───────────────────────── helpers ─────────────────────────
-def db():
-    with SessionLocal() as session:
+async def db():
+    async with AsyncSessionLocal() as session:
         yield session
 
 
-def log_action(session: Session, action: str, info: dict) -> None:
-    """Tiny audit-trail – one log line per API call."""
-    session.add(models.ActionLog(action=action, info=info))
-    session.commit()
+async def cached_json(
+    request: Request, year: int, kind: str, revision: Optional[int], load
+) -> Response:
+    """
+    Serve a finance snapshot with an ETag: 304 if the client's copy is
+    current, the cached encoded body if we have one, else ``await load()``.
+    """
+    c = snapshots.cache
+    version = c.version(year, kind)
+    headers = {"ETag": c.etag(year, kind, revision, version), "Cache-Control": "no-cache"}
+    if snapshots.etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    body = c.get(year, kind, revision)
+    if body is None:
+        body = snapshots.encode(await load())
+        c.put(year, kind, revision, version, body)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 # ───────────────────────── payroll / tarif ─────────────────────────
+# The calculator routes answer with FastJSONResponse: the frozen result
+# dataclasses go straight to orjson, skipping asdict copies and the
+# response-model re-validation.  ``response_model`` documents the shape.
 @router.post("/payroll/gross-to-net", response_model=schemas.PayrollResult)
-def payroll_g2n(data: schemas.PayrollInput, s: Session = Depends(db)):
-    res = gross_to_net(PayrollInputData(**data.dict())).asdict()
-    log_action(s, "payroll_g2n", {"input": data.dict(), "result": res})
-    return res
+def payroll_g2n(data: schemas.PayrollInput):
+    params = data.dict()
+    res = gross_to_net(PayrollInputData(**params))
+    log_action("payroll_g2n", {"input": params, "result": res.asdict()})
+    return FastJSONResponse(res)
+
+
+@router.post("/payroll/net-to-gross", response_model=schemas.NetToGrossResult)
+def payroll_n2g(data: schemas.NetToGrossInput):
+    params = data.dict()
+    target = params.pop("net")
+    gross, res = net_to_gross(target, **params)
+    out = {"gross": gross, "result": res.asdict()}
+    log_action("payroll_n2g", {"input": {"net": target, **params}, "result": out})
+    return FastJSONResponse(out)
+
+
+@router.post("/payroll/curve", response_model=schemas.NetCurveResult)
+def payroll_curve(data: schemas.NetCurveInput):
+    """Net salary over a dense gross grid for one fixed parameter profile."""
+    profile = (data.tax_class, data.married, data.federal_state, data.church,
+               data.childless, data.additional_kv)
+    if data.church and data.federal_state not in KIST_BY_STATE:
+        raise HTTPException(422, f"Unbekanntes Bundesland: {data.federal_state}")
+    table = cache.curve_table(profile)
+    try:
+        res = net_curve(table, data.gross_from, data.gross_to, data.step, data.period)
+    except ValueError as exc:
+        raise HTTPException(422, str(exc))
+    scale = 1 if data.period == "monthly" else 12
+    res["breakpoints"] = np.round(table.breakpoints * scale, 2)
+    log_action("payroll_curve", {"input": data.dict(), "points": len(res["gross"])})
+    return FastJSONResponse(res)                # arrays are encoded without tolist()
+
+
+@router.post("/payroll/gross-to-net/batch", response_model=schemas.PayrollBatchResult)
+def payroll_g2n_batch(data: schemas.PayrollBatchInput):
+    """Whole-workforce simulation – one NumPy pass, one log line per batch."""
+    try:
+        res = gross_to_net_batch(**data.dict())
+    except ValueError as exc:
+        raise HTTPException(422, str(exc))
+    log_action("payroll_g2n_batch", {"rows": len(data.gross)})
+    return FastJSONResponse(res)
 
 
 @router.post("/tarif/estimate", response_model=schemas.TarifResult)
-def tarif_estimate(data: schemas.TarifInput, s: Session = Depends(db)):
-    res = berechne_nrw_2025(TarifInputData(**data.dict())).asdict()
-    log_action(s, "tarif_estimate", {"input": data.dict(), "result": res})
-    return res
+def tarif_estimate(data: schemas.TarifInput):
+    params = data.dict()
+    res = berechne_nrw_2025(TarifInputData(**params))
+    log_action("tarif_estimate", {"input": params, "result": res.asdict()})
+    return FastJSONResponse(res)
 
 
 @router.post("/tarif/breakdown", response_model=list[schemas.MonthlyBreakdown])
-def tarif_breakdown(data: schemas.TarifInput, s: Session = Depends(db)):
-    res = get_monthly_breakdown(TarifInputData(**data.dict()))
-    log_action(s, "tarif_breakdown", {"input": data.dict()})
+def tarif_breakdown(data: schemas.TarifInput):
+    params = data.dict()
+    res = get_monthly_breakdown(TarifInputData(**params))
+    log_action("tarif_breakdown", {"input": params})
+    return FastJSONResponse(res)
+
+
+@router.post("/tarif/net", response_model=schemas.TarifNetResult)
+def tarif_net(data: schemas.TarifNetInput):
+    """
+    Tarif breakdown → monthly net in one call; special payments are taxed
+    as sonstige Bezüge instead of being annualised like regular pay.
+    """
+    p = data.payroll
+    profile = (p.tax_class, p.married, p.federal_state, p.church,
+               p.childless, p.additional_kv)
+    try:
+        res = monthly_net(TarifInputData(**data.tarif.dict()), profile)
+    except ValueError as exc:
+        raise HTTPException(422, str(exc))
+    log_action("tarif_net", {"input": data.dict(), "jahr": res["jahr"]})
+    return FastJSONResponse(res)
+
+
+@router.get("/tarif/matrix", response_model=list[schemas.TarifMatrixRow])
+def tarif_matrix(
+    entgeltgruppe: Optional[str] = None,
+    stufe: Optional[str] = None,
+    wochenstunden: Optional[float] = None,
+    betriebszugehoerigkeit_monate: Optional[int] = None,
+    breakdown: bool = False,
+):
+    """
+    Precomputed tariff grid (EG × Stufe × Wochenstunden × tenure bucket),
+    served from memory; ``breakdown`` adds the twelve monthly gross values.
+    """
+    filters = {
+        "entgeltgruppe": entgeltgruppe,
+        "stufe": stufe,
+        "wochenstunden": wochenstunden,
+        "betriebszugehoerigkeit_monate": betriebszugehoerigkeit_monate,
+    }
+    res = cache.tarif_matrix_table().rows(**filters, breakdown=breakdown)
+    log_action("tarif_matrix", {"filters": filters, "rows": len(res)})
     return res
 
 
+# ───────────────────────── auth ─────────────────────────
+@public_router.post("/auth/token", response_model=schemas.Token)
+async def login(data: schemas.LoginInput):
+    """E-mail + password → bearer token; bcrypt runs on the dedicated hash pool."""
+    try:
+        user, token = await auth.login(data.email, data.password)
+    except auth.PoolBusy:
+        raise HTTPException(503, "Zu viele Anmeldungen – bitte gleich erneut versuchen",
+                            headers={"Retry-After": "1"})
+    if user is None:
+        raise HTTPException(401, "E-Mail oder Passwort falsch",
+                            headers={"WWW-Authenticate": "Bearer"})
+    log_action("login", {"user_id": user.id})
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.get("/auth/me", response_model=Optional[schemas.Me])
+async def me(user: Optional[auth.AuthUser] = Depends(auth.current_user)):
+    """The authenticated user (``null`` while auth is disabled)."""
+    return user and {"id": user.id, "email": user.email}
+
+
+@router.post("/auth/password", status_code=204)
+async def change_password(data: schemas.PasswordChange,
+                          user: Optional[auth.AuthUser] = Depends(auth.current_user)):
+    """New password for the caller; every token issued before is revoked."""
+    if user is None:
+        raise HTTPException(400, "Anmeldung ist deaktiviert")
+    try:
+        if await auth.authenticate(user.email, data.password) is None:
+            raise HTTPException(403, "Passwort falsch")
+        await auth.update_user(user.id, password=data.new_password)
+    except auth.PoolBusy:
+        raise HTTPException(503, "Zu viele Anmeldungen – bitte gleich erneut versuchen",
+                            headers={"Retry-After": "1"})
+    log_action("change_password", {"user_id": user.id})
+
+
+# ───────────────────────── admin ─────────────────────────
+@router.get("/admin/cache")
+def cache_stats():
+    """Hit/miss/eviction counters of the calculator, snapshot, settings and token caches."""
+    return {**cache.stats(), "snapshots": snapshots.cache.stats(),
+            "settings": settings.cache.stats(), "tokens": auth.token_cache.stats(),
+            "hash_pool": auth.hash_pool.stats()}
+
+
+@router.get("/admin/live")
+def live_stats():
+    """Open live-change subscriptions."""
+    return live.broker.stats()
+
+
+@router.get("/admin/audit")
+def audit_stats():
+    """Queue depth and written/dropped/sampled counters of the audit writer."""
+    return audit.writer.stats()
+
+
+# entries fetched per keyset query of the /audit reader
+AUDIT_PAGE = 500
+
+
+@router.get("/audit")
+async def audit_entries(
+    action: Optional[str] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_ts: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=100_000),
+):
+    """
+    Audit entries as NDJSON, newest first.  Next page: pass ``ts`` and
+    ``id`` of the last entry as ``before_ts`` / ``before_id`` – keyset
+    pagination, no OFFSET scans however deep the page.
+    """
+    if (before_ts is None) != (before_id is None):
+        raise HTTPException(400, "before_ts and before_id go together")
+    before = (before_ts, before_id) if before_ts is not None else None
+
+    async def body():
+        nonlocal before
+        left = limit
+        async with AsyncSessionLocal() as s:
+            while left:
+                page = (await s.execute(audit.entries_query(
+                    action=action, user_id=user_id, since=since, until=until,
+                    before=before, limit=min(left, AUDIT_PAGE),
+                ))).all()
+                if not page:
+                    return
+                yield b"".join(
+                    snapshots.encode({**r._mapping, "ts": r.ts.isoformat()}) + b"\n"
+                    for r in page
+                )
+                left -= len(page)
+                before = (page[-1].ts, page[-1].id)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.delete("/admin/cache", status_code=204)
+def cache_clear():
+    cache.clear()
+    snapshots.cache.clear()
+    settings.cache.clear()
+    auth.token_cache.clear()
+    return
+
+
 # ───────────────────────── row-meta persistence ─────────────────────────
 @router.get("/finance/{year}/rows", response_model=dict[int, schemas.RowMeta])
-def finance_rows(year: int, s: Session = Depends(db)):
-    rows = s.exec(
-        select(models.FinanceRow).where(
-            models.FinanceRow.year == year
-        )
-    ).all()
-    # return keyed by immutable row-id
-    out = {r.row: schemas.RowMeta(**r.dict()) for r in rows}
-    log_action(s, "finance_rows", {"year": year})
-    return out
+async def finance_rows(year: int, request: Request, s: AsyncSession = Depends(db)):
+    async def load():
+        rows = (await s.exec(
+            select(models.FinanceRow).where(
+                models.FinanceRow.year == year
+            )
+        )).all()
+        # return keyed by immutable row-id
+        return {r.row: schemas.RowMeta(**r.dict()).dict() for r in rows}
+
+    log_action("finance_rows", {"year": year})        # every read, cached or not
+    return await cached_json(request, year, snapshots.ROWS, None, load)
 
 
 @router.post("/finance/row", response_model=schemas.RowMeta)
-def save_row(meta: schemas.RowMeta, s: Session = Depends(db)):
-    rec = s.exec(
+async def save_row(meta: schemas.RowMeta, s: AsyncSession = Depends(db)):
+    rec = (await s.exec(
         select(models.FinanceRow).where(
             models.FinanceRow.year == meta.year,
             models.FinanceRow.row == meta.row,
         )
-    ).first()
+    )).first()
+    old_kind = summary.row_kind(rec, meta.row)
     if rec:
         # update editable fields
         rec.description = meta.description
@@ -76,192 +314,401 @@ def save_row(meta: schemas.RowMeta, s: Session = Depends(db)):
     else:
         rec = models.FinanceRow(**meta.dict())
         s.add(rec)
-    s.commit()
-    s.refresh(rec)
-    log_action(s, "save_row", {"row": rec.row, "year": rec.year})
-    return schemas.RowMeta(**rec.dict())
+    await s.run_sync(
+        summary.move_row, rec.year, rec.row, old_kind, summary.row_kind(rec, rec.row)
+    )
+    await s.commit()
+    snapshots.cache.invalidate(rec.year, snapshots.ROWS)
+    saved = schemas.RowMeta(**rec.dict())
+    live.publish(rec.year, rows=[saved.dict(exclude={"year"})])
+    log_action("save_row", {"row": rec.row, "year": rec.year})
+    return saved
 
 
 
 @router.delete("/finance/row/{year}/{row}", status_code=204)
-def delete_row(year: int, row: int, s: Session = Depends(db)):
+async def delete_row(year: int, row: int, s: AsyncSession = Depends(db)):
     """
     Logically delete a row (hide it in the UI) **and** zero-out all values
     so the deleted row no longer influences carry-over calculations.
     """
     # 1) mark meta-record as deleted (create if missing)
-    meta = s.exec(
+    meta = (await s.exec(
         select(models.FinanceRow).where(
             models.FinanceRow.year == year,
             models.FinanceRow.row == row,
         )
-    ).first()
+    )).first()
+    old_kind = summary.row_kind(meta, row)
     if not meta:
         meta = models.FinanceRow(year=year, row=row, description="", deleted=True)
         s.add(meta)
     else:
         meta.deleted = True
+    await s.run_sync(summary.move_row, year, row, old_kind, None)
 
     # 2) hard-delete the numeric cells to keep the DB small
-    s.execute(
+    await s.execute(
         sqldelete(models.FinanceCell).where(
             models.FinanceCell.year == year,
             models.FinanceCell.row == row,
         )
     )
-    s.commit()
-    log_action(s, "delete_row", {"year": year, "row": row})
+    await s.commit()
+    snapshots.cache.invalidate(year)
+    live.publish(year, cleared=[row],
+                 rows=[schemas.RowMeta(**meta.dict()).dict(exclude={"year"})])
+    log_action("delete_row", {"year": year, "row": row})
     return
 
 
+# ───────────────────────── monthly totals / carry-over ─────────────────────────
+@router.get("/finance/summary", response_model=list[schemas.YearSummary])
+async def finance_summary(
+    year_from: int = Query(..., alias="from"),
+    year_to: Optional[int] = Query(None, alias="to"),
+    s: AsyncSession = Depends(db),
+):
+    """
+    Income, expense, leftover and running carry-over per month for the
+    years ``from`` … ``to`` (default: just ``from``), read from the
+    maintained summary table.
+    """
+    year_to = year_from if year_to is None else year_to
+    if not 0 <= year_to - year_from < 100:
+        raise HTTPException(400, "'to' must be within 100 years after 'from'")
+    res = await s.run_sync(summary.year_summaries, year_from, year_to)
+    log_action("finance_summary", {"from": year_from, "to": year_to})
+    return res
+
+
+# ───────────────────────── multi-year range ─────────────────────────
+async def _by_year(result):
+    """Group an async result ordered by year into (year, revision, records)."""
+    year, revision, records = None, 0, []
+    async for rec in result:
+        if rec.year != year and year is not None:
+            yield year, revision, records
+            records = []
+        year, revision = rec.year, rec.revision
+        records.append(rec)
+    if year is not None:
+        yield year, revision, records
+
+
+@router.get("/finance/range", response_model=list[schemas.FinanceYear])
+async def finance_range(
+    year_from: int = Query(..., alias="from"),
+    year_to: int = Query(..., alias="to"),
+    aggregate: bool = False,
+):
+    """
+    Latest cells and row meta of every year ``from`` … ``to`` – two queries
+    in total, streamed year by year.  ``aggregate=true`` replaces the cells
+    by per-row totals over the twelve months.
+    """
+    if not 0 <= year_to - year_from < 100:
+        raise HTTPException(400, "'to' must be within 100 years after 'from'")
+    log_action("finance_range", {"from": year_from, "to": year_to, "aggregate": aggregate})
+
+    async def body():
+        # own session – a streamed response outlives the request's dependencies
+        async with AsyncSessionLocal() as s:
+            meta: dict = {}
+            for r in (await s.exec(
+                select(models.FinanceRow)
+                .where(models.FinanceRow.year.between(year_from, year_to))
+            )).all():
+                meta.setdefault(r.year, {})[r.row] = schemas.RowMeta(**r.dict()).dict()
+
+            def year_json(year: int, revision: int = 0, records=()) -> bytes:
+                out = {"year": year, "revision": revision, "rows": meta.get(year, {})}
+                if aggregate:
+                    out["totals"] = {r.row: r.total for r in records}
+                else:
+                    out["cells"] = [dict(r._mapping) for r in records]
+                return snapshots.encode(out)
+
+            stmt = (revisions.range_totals_query(year_from, year_to, summary.MONTHS)
+                    if aggregate else revisions.range_query(year_from, year_to))
+            sep, nxt = b"[", year_from
+            async for year, revision, records in _by_year(await s.stream(stmt)):
+                for y in range(nxt, year):                # years without cells
+                    yield sep + year_json(y)
+                    sep = b","
+                yield sep + year_json(year, revision, records)
+                sep, nxt = b",", year + 1
+            for y in range(nxt, year_to + 1):
+                yield sep + year_json(y)
+                sep = b","
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
 # ───────────────────────── finance-table snapshots ─────────────────────────
 @router.get("/finance/{year}", response_model=list[schemas.Cell])
-def finance_year(year: int, s: Session = Depends(db)):
-    """
-    Return the latest *revision* snapshot for the requested year.
-    """
-    latest_rev = (
-        s.exec(
-            select(models.FinanceCell.revision)
-            .where(models.FinanceCell.year == year)
-            .order_by(models.FinanceCell.revision.desc())
-            .limit(1)
-        ).first()
-        or 0
-    )
-    stmt = select(models.FinanceCell).where(
-        models.FinanceCell.year == year, models.FinanceCell.revision == latest_rev
+async def finance_year(
+    year: int,
+    request: Request,
+    revision: Optional[int] = None,
+    s: AsyncSession = Depends(db),
+):
+    """
+    Return the latest *revision* snapshot for the requested year
+    (or the one given by ``?revision=``), rebuilt from the stored deltas.
+    Unchanged years are answered from memory or with 304 Not Modified.
+    """
+    async def load():
+        return await s.run_sync(revisions.snapshot, year, revision)
+
+    log_action("finance_year", {"year": year})        # every read, cached or not
+    return await cached_json(request, year, snapshots.CELLS, revision, load)
+
+
+# ───────────────────────── live changes ─────────────────────────
+# idle seconds between SSE keep-alive comments
+LIVE_HEARTBEAT = 15.0
+
+
+@router.get("/finance/{year}/events")
+async def finance_events(year: int, request: Request, since: Optional[str] = None):
+    """
+    Server-sent events with the coalesced changes of *year* (see
+    :mod:`app.live`).  A reconnecting ``EventSource`` sends
+    ``Last-Event-ID`` and receives what it missed; ``?since=`` does the
+    same for clients that keep the id themselves.
+    """
+    sub = live.broker.subscribe(year, request.headers.get("last-event-id") or since)
+
+    async def body():
+        try:
+            yield b"retry: 2000\n\n"
+            while True:
+                try:
+                    msg = await asyncio.wait_for(sub.queue.get(), LIVE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield (f"id: {live.event_id(msg)}\nevent: diff\ndata: ".encode()
+                       + snapshots.encode(msg) + b"\n\n")
+        finally:
+            live.broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        body(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    cells = s.exec(stmt).all()
-    log_action(s, "finance_year", {"year": year})
-    return cells
+
+
+def upsert_cells(s: Session, cells: list[schemas.Cell]) -> list[dict]:
+    """
+    Write *cells* with one ``INSERT … ON CONFLICT DO UPDATE`` per chunk and
+    return the diff (old → new value) for the audit log.  The monthly totals
+    are updated in the same transaction; committing is left to the caller.
+    """
+    latest = {(c.year, c.row, c.col, c.revision): c.value for c in cells}
+    keys = list(latest)
+    t = models.FinanceCell.__table__
+    key_cols = (t.c.year, t.c.row, t.c.col, t.c.revision)
+
+    summary.track_cells(s, latest)              # locks the touched months first
+    old = {}
+    for i in range(0, len(keys), UPSERT_CHUNK):
+        old.update(
+            ((y, r, c, rev), v)
+            for y, r, c, rev, v in s.execute(
+                select(*key_cols, t.c.value).where(
+                    tuple_(*key_cols).in_(keys[i:i + UPSERT_CHUNK])
+                )
+            )
+        )
+
+    insert = INSERT_BY_DIALECT[s.get_bind().dialect.name]
+    now = datetime.utcnow()
+    for i in range(0, len(keys), UPSERT_CHUNK):
+        stmt = insert(t).values([
+            {"year": y, "row": r, "col": c, "revision": rev,
+             "value": latest[(y, r, c, rev)], "ts": now}
+            for y, r, c, rev in keys[i:i + UPSERT_CHUNK]
+        ])
+        s.execute(stmt.on_conflict_do_update(
+            index_elements=[col.name for col in key_cols],
+            set_={"value": stmt.excluded.value, "ts": stmt.excluded.ts},
+        ))
+
+    return [
+        dict(zip(("year", "row", "col", "revision"), k), old=old.get(k), new=latest[k])
+        for k in keys
+    ]
 
 
 @router.post("/finance/cell", response_model=schemas.Cell)
-def save_cell(cell: schemas.Cell, s: Session = Depends(db)):
+async def save_cell(cell: schemas.Cell, s: AsyncSession = Depends(db)):
     """
     Up-sert a single table cell inside the current revision.
     """
-    query = select(models.FinanceCell).where(
-        models.FinanceCell.year == cell.year,
-        models.FinanceCell.row == cell.row,
-        models.FinanceCell.col == cell.col,
-        models.FinanceCell.revision == cell.revision,
-    )
-    db_cell = s.exec(query).first()
-    old_val = db_cell.value if db_cell else None
-    if db_cell:
-        db_cell.value = cell.value
-    else:
-        db_cell = models.FinanceCell(**cell.dict())
-        s.add(db_cell)
+    (diff,) = await s.run_sync(upsert_cells, [cell])
+    await s.commit()
+    snapshots.cache.invalidate(cell.year, snapshots.CELLS)
+    live.publish(cell.year, cells=[cell.dict(exclude={"year"})])
+    log_action("save_cell", diff)
+    return cell
 
-    s.commit()
-    s.refresh(db_cell)
-    log_action(
-        s,
-        "save_cell",
-        {
-            "year": cell.year,
-            "row": cell.row,
-            "col": cell.col,
-            "old": old_val,
-            "new": cell.value,
-            "revision": cell.revision,
-        },
-    )
-    return db_cell
+
+@router.post("/finance/cells", response_model=list[schemas.Cell])
+async def save_cells(cells: list[schemas.Cell], s: AsyncSession = Depends(db)):
+    """
+    Bulk up-sert (paste, import): one statement, one commit, one audit
+    entry holding the whole diff.
+    """
+    diff = await s.run_sync(upsert_cells, cells)
+    await s.commit()
+    for year in {c.year for c in cells}:
+        snapshots.cache.invalidate(year, snapshots.CELLS)
+        live.publish(year, cells=[c.dict(exclude={"year"}) for c in cells if c.year == year])
+    log_action("save_cells", {"count": len(diff), "cells": diff})
+    return cells
 
 
 @router.post("/finance/revision/{year}/{direction}", response_model=int)
-def shift_revision(year: int, direction: str, s: Session = Depends(db)):
+async def shift_revision(year: int, direction: str, s: AsyncSession = Depends(db)):
     """
-    Create a new revision snapshot and return its id.
+    Step to the previous revision or open a new one and return its id.
     direction: **undo** | **redo**
+
+    Revisions are deltas, so nothing is copied; opening a revision folds
+    the one that reached the ``FINANCE_UNDO_DEPTH`` floor into the base.
     """
     if direction not in {"undo", "redo"}:
         raise HTTPException(400, "direction must be 'undo' or 'redo'")
 
-    latest = (
-        s.exec(
-            select(models.FinanceCell.revision)
-            .where(models.FinanceCell.year == year)
-            .order_by(models.FinanceCell.revision.desc())
-            .limit(1)
-        ).first()
-        or 0
-    )
+    floor, latest = await s.run_sync(revisions.revision_bounds, year)
+    if direction == "undo":
+        return max(floor, latest - 1)
 
-    target = max(0, latest - 1) if direction == "undo" else min(latest + 1, 10)
-    if target == latest:
-        return latest  # nothing to do
-
-    # if the target revision already exists just return it
-    exists = s.exec(
-        select(models.FinanceCell.id).where(
-            models.FinanceCell.year == year, models.FinanceCell.revision == target
-        )
-    ).first()
-    if exists:
-        return target
-
-    # otherwise copy snapshot from the latest revision
-    snapshot = s.exec(
-        select(models.FinanceCell).where(
-            models.FinanceCell.year == year, models.FinanceCell.revision == latest
-        )
-    ).all()
-    for c in snapshot:
-        s.add(
-            models.FinanceCell(
-                year=c.year,
-                row=c.row,
-                col=c.col,
-                value=c.value,
-                revision=target,
-            )
-        )
-    s.commit()
+    target = latest + 1
+    compacted = await s.run_sync(revisions.compact, year)
+    await s.commit()
+    snapshots.cache.invalidate(year, snapshots.CELLS)
+    live.publish(year, revision=target)
     log_action(
-        s, "shift_revision", {"year": year, "direction": direction, "revision": target}
+        "shift_revision",
+        {"year": year, "direction": direction, "revision": target, "compacted": compacted},
     )
     return target
 
 
 # ───────────────────────── wipe a complete year ─────────────────────────
-@router.delete("/finance/{year}/reset", status_code=204)
-def reset_year(year: int, tasks: BackgroundTasks, s: Session = Depends(db)):
+@router.delete("/finance/{year}/reset", response_model=schemas.Job, status_code=202)
+def reset_year(year: int):
     """
-    Delete **all** FinanceCell rows for the given year (across *all* revisions).
-    Runs asynchronously so the HTTP request returns immediately.
+    Delete **all** FinanceCell rows for the given year (across *all* revisions)
+    and its row meta.  Runs as a chunked background job – poll ``/jobs/{id}``.
     """
+    job = jobs.runner.submit("reset_year", year=year)
+    log_action("reset_year", {"year": year, "job": job.id})
+    return job.asdict()
 
-    def _delete():
-        s.execute(sqldelete(models.FinanceCell).where(models.FinanceCell.year == year))
-        s.execute(sqldelete(models.FinanceRow).where(models.FinanceRow.year == year))
-        s.commit()
-        log_action(s, "reset_year", {"year": year})
 
-    tasks.add_task(_delete)
-    return
+# ───────────────────────── export / import ─────────────────────────
+def _transfer_format(fmt: str) -> str:
+    if fmt not in transfer.FORMATS:
+        raise HTTPException(400, f"format must be one of {sorted(transfer.FORMATS)}")
+    return fmt
+
+
+@router.get("/finance/{year}/export")
+async def export_year(year: int, fmt: str = Query("ndjson", alias="format")):
+    """
+    Stream every stored revision and the row meta of *year* as NDJSON or
+    in the columnar ``binary`` format (see :mod:`app.transfer`).
+    """
+    _transfer_format(fmt)
+    log_action("export_year", {"year": year, "format": fmt})
+
+    async def body():
+        async with AsyncSessionLocal() as s:
+            async for chunk in transfer.export_year(s, year, fmt):
+                yield chunk
+
+    ext = "ndjson" if fmt == "ndjson" else "fsx"
+    return StreamingResponse(
+        body(), media_type=transfer.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="finance-{year}.{ext}"'},
+    )
+
+
+@router.post("/finance/{year}/import", response_model=dict[str, int])
+async def import_year(
+    year: int,
+    request: Request,
+    fmt: str = Query("ndjson", alias="format"),
+    s: AsyncSession = Depends(db),
+):
+    """
+    Replace *year* with an uploaded export (request body, parsed while it
+    arrives).  One transaction – a broken upload leaves the year as it was.
+    """
+    _transfer_format(fmt)
+    try:
+        counts = await transfer.import_year(s, year, fmt, request.stream())
+        await s.run_sync(summary.rebuild, [year])
+        await s.commit()
+    except (ValueError, IntegrityError, DataError) as exc:
+        await s.rollback()
+        raise HTTPException(400, f"Import fehlgeschlagen: {exc}".splitlines()[0])
+    snapshots.cache.invalidate(year)
+    live.publish(year, resync=True)
+    log_action("import_year", {"year": year, "format": fmt, **counts})
+    return counts
+
+
+# ───────────────────────── maintenance jobs ─────────────────────────
+@router.post("/jobs", response_model=schemas.Job, status_code=202)
+def start_job(req: schemas.JobRequest):
+    """Queue a maintenance job (``compact_revisions``, ``prune_audit``, …)."""
+    try:
+        job = jobs.runner.submit(req.kind, **req.params)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
+    return job.asdict()
+
+
+@router.get("/jobs", response_model=list[schemas.Job])
+def list_jobs():
+    return [j.asdict() for j in jobs.runner.list()]
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+def job_status(job_id: str):
+    job = jobs.runner.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job.asdict()
+
+
+@router.delete("/jobs/{job_id}", response_model=schemas.Job)
+def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one after its current chunk."""
+    job = jobs.runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job.asdict()
 
 
 # ───────────────────────── user settings persistence ────────────────────────
 @router.get("/settings/{group}", response_model=schemas.Settings)
-def get_settings(group: str, s: Session = Depends(db)):
-    rec = s.exec(
-        select(models.Setting)
-        .where(models.Setting.group == group)
-        .order_by(models.Setting.ts.desc())
-    ).first()
-    data = rec.data if rec else {}
-    log_action(s, "get_settings", {"group": group})
+async def get_settings(group: str, s: AsyncSession = Depends(db)):
+    data = await s.run_sync(settings.load, group)
+    log_action("get_settings", {"group": group})
     return data
 
 
 @router.post("/settings/{group}", response_model=schemas.Settings)
-def save_settings(group: str, payload: dict, s: Session = Depends(db)):
-    s.add(models.Setting(group=group, data=payload))
-    s.commit()
-    log_action(s, "save_settings", {"group": group})
+async def save_settings(group: str, payload: dict, s: AsyncSession = Depends(db)):
+    await s.run_sync(settings.save, group, payload)
+    await s.commit()
+    settings.cache.put(group, payload)
+    log_action("save_settings", {"group": group})
     return payload
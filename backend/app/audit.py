@@ -0,0 +1,201 @@
+"""
+Asynchronous audit trail.
+
+Request handlers only enqueue log records; a background thread drains the
+bounded queue and bulk-inserts ``ActionLog`` rows in batches, flushing when
+a batch is full or the flush interval has passed.
+
+* backpressure: when the queue is full new records are **dropped** (and
+  counted) – auditing must never stall an API request;
+* sampling: ``AUDIT_SAMPLE_RATES="finance_year=0.1,get_settings=0"`` keeps
+  only that fraction of the given actions (default 1.0 = keep all);
+* shutdown: :meth:`AuditWriter.stop` drains whatever is still queued;
+* retention: entries older than ``AUDIT_RETENTION_DAYS`` (0 = keep forever)
+  are removed every ``AUDIT_PRUNE_INTERVAL`` seconds by the chunked
+  ``prune_audit`` job.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, tuple_
+from sqlmodel import Session
+
+from . import metrics, models
+from .database import SessionLocal
+
+log = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "90"))
+AUDIT_PRUNE_INTERVAL = float(os.getenv("AUDIT_PRUNE_INTERVAL", str(6 * 3600)))
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """``"a=0.1,b=0"`` → ``{"a": 0.1, "b": 0.0}``."""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        action, _, rate = part.partition("=")
+        rates[action.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class AuditWriter:
+    """Bounded queue + background thread that bulk-inserts log records."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        maxsize: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rates = sample_rates or {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.enqueued = self.written = self.dropped = self.sampled_out = self.failed = 0
+
+    # ───────────── producer side ─────────────
+    def record(self, action: str, info: dict) -> bool:
+        """Queue one record; never blocks.  False if sampled out or dropped."""
+        rate = self.sample_rates.get(action, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(
+                {"action": action, "info": info, "ts": datetime.utcnow()}
+            )
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                log.warning("audit queue full – %d records dropped so far", self.dropped)
+            return False
+        self.enqueued += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "failed": self.failed,
+        }
+
+    # ───────────── lifecycle ─────────────
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything still queued and stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+
+    # ───────────── consumer side ─────────────
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stopping.is_set():
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            with self._session_factory() as s:
+                s.execute(insert(models.ActionLog.__table__), batch)
+                s.commit()
+            self.written += len(batch)
+        except Exception:                       # never kill the worker
+            self.failed += len(batch)
+            log.exception("audit batch of %d records could not be written", len(batch))
+
+
+writer = AuditWriter(sample_rates=parse_sample_rates(os.getenv("AUDIT_SAMPLE_RATES", "")))
+
+metrics.sampled("audit_queue_depth", "Audit records waiting to be written.",
+                lambda: writer._queue.qsize())
+metrics.sampled("audit_records", "Audit records by outcome.",
+                lambda: {(k,): v for k, v in writer.stats().items() if k != "queued"},
+                ("outcome",), kind="counter")
+
+
+def log_action(action: str, info: dict) -> None:
+    """Tiny audit-trail – one log line per API call, written in the background."""
+    writer.record(action, info)
+
+
+# ───────────── reader ─────────────
+def entries_query(
+    *,
+    action: Optional[str] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, int]] = None,
+    limit: int = 100,
+):
+    """
+    Newest entries first, keyset-paginated on (ts, id): *before* is the
+    ``(ts, id)`` of the last entry of the previous page.
+    """
+    t = models.ActionLog.__table__
+    stmt = select(t).order_by(t.c.ts.desc(), t.c.id.desc()).limit(limit)
+    if action is not None:
+        stmt = stmt.where(t.c.action == action)
+    if user_id is not None:
+        stmt = stmt.where(t.c.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(t.c.ts >= since)
+    if until is not None:
+        stmt = stmt.where(t.c.ts < until)
+    if before is not None:
+        stmt = stmt.where(tuple_(t.c.ts, t.c.id) < tuple_(*before))
+    return stmt
@@ -1,28 +1,415 @@
+"""
+Authentication: bcrypt password hashes and signed bearer tokens (HS256 JWT).
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from typing import Optional
+* hashing never runs on the event loop or in the request threadpool: it goes
+  to :data:`hash_pool`, a dedicated thread pool (bcrypt releases the GIL)
+  with ``AUTH_HASH_WORKERS`` threads and at most ``AUTH_HASH_PENDING`` calls
+  admitted at once – a login storm gets 503s instead of queueing without
+  bound and starving everything else;
+* rehash on login: a hash made with fewer than ``BCRYPT_ROUNDS`` rounds is
+  replaced transparently after a successful verification;
+* tokens are verified once, then served from :data:`token_cache` together
+  with their user (TTL ``AUTH_TOKEN_CACHE_TTL``, never past ``exp``); they
+  carry a fingerprint of the password hash, so :func:`update_user` revokes
+  them on a password change.
 
-SECRET_KEY = "secret"
+``AUTH_ENABLED=1`` makes :func:`current_user` reject anonymous requests and
+requires ``AUTH_SECRET_KEY``.
+Create accounts with ``python -m backend.app.auth create-user <email>``.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import bcrypt
+from fastapi import HTTPException, Request
+from sqlalchemy import update
+from sqlmodel import select
+
+from . import metrics, models
+from .database import AsyncSessionLocal
+
+log = logging.getLogger(__name__)
+
+AUTH_ENABLED = os.getenv("AUTH_ENABLED", "0") == "1"
+SECRET_KEY = os.getenv("AUTH_SECRET_KEY", "secret")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_PENDING = int(os.getenv("AUTH_HASH_PENDING", "16"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+
+if AUTH_ENABLED and SECRET_KEY == "secret":
+    # with the public default key anyone can mint {"sub": "1"} – refuse to start
+    raise RuntimeError("AUTH_ENABLED=1 needs AUTH_SECRET_KEY")
+
+
+class TokenError(ValueError):
+    pass
+
+
+class PoolBusy(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    id: int
+    email: str
+
+
+# ───────────────────────── passwords ─────────────────────────
+def _secret(password: str) -> bytes:
+    # bcrypt only ever looked at the first 72 bytes; bcrypt>=5 raises instead
+    return password.encode("utf-8")[:72]
+
+
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds or BCRYPT_ROUNDS)).decode()
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(plain_password), hashed_password.encode())
+    except ValueError:                          # not a bcrypt hash
+        return False
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """``$2b$<rounds>$…`` made with fewer rounds (or another variant) than configured."""
+    try:
+        ident, rounds = hashed_password.split("$")[1:3]
+        return ident != "2b" or int(rounds) < BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return get_password_hash(secrets.token_hex(16))
+
+
+def verify_and_update(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    One worker call for a login: verify, and rehash if the stored cost is
+    outdated.  Unknown users (``None``) are checked against a dummy hash so
+    the response time does not reveal which e-mail addresses exist.
+    """
+    if hashed_password is None:
+        verify_password(plain_password, _dummy_hash())
+        return False, None
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    return True, get_password_hash(plain_password) if needs_rehash(hashed_password) else None
+
+
+class HashPool:
+    """Dedicated, bounded thread pool for bcrypt calls."""
+
+    def __init__(self, workers: int = AUTH_HASH_WORKERS, max_pending: int = AUTH_HASH_PENDING) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = self.completed = self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool; :class:`PoolBusy` if too much is in flight."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolBusy
+            self.pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+            future = self._executor.submit(fn, *args)
+        # released when the work is done, not when the caller gives up waiting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "max_pending": self.max_pending, "pending": self.pending,
+                "completed": self.completed, "rejected": self.rejected}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+hash_pool = HashPool()
+
+
+# ───────────────────────── tokens ─────────────────────────
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
 
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(SECRET_KEY.encode(), signing_input.encode(), hashlib.sha256).digest())
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
 
+_HEADER = _b64encode(json.dumps({"alg": ALGORITHM, "typ": "JWT"}, separators=(",", ":")).encode())
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    expire = time.time() + (expires_delta or timedelta(minutes=15)).total_seconds()
+    to_encode.update({"exp": int(expire)})
+    payload = _b64encode(json.dumps(to_encode, separators=(",", ":")).encode())
+    signing_input = f"{_HEADER}.{payload}"
+    return f"{signing_input}.{_sign(signing_input)}"
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Claims of a token we signed and that has not expired, else :class:`TokenError`."""
+    try:
+        header, payload, signature = token.split(".")
+        if json.loads(_b64decode(header)).get("alg") != ALGORITHM:
+            raise TokenError("unsupported algorithm")
+        if not hmac.compare_digest(signature, _sign(f"{header}.{payload}")):
+            raise TokenError("bad signature")
+        claims = json.loads(_b64decode(payload))
+        if not isinstance(claims, dict):
+            raise TokenError("malformed token")
+    except (ValueError, AttributeError) as exc:        # includes TokenError
+        raise TokenError(str(exc) or "malformed token") from None
+    if not isinstance(claims.get("exp"), (int, float)) or claims["exp"] <= time.time():
+        raise TokenError("token expired")
+    return claims
+
+
+def password_fingerprint(hashed_password: str) -> str:
+    """Short keyed digest of a password hash – changes with the password."""
+    return _sign(hashed_password)[:16]
+
+
+class TokenCache:
+    """Verified token → :class:`AuthUser`; bounded LRU, entries live ``ttl`` seconds at most."""
+
+    def __init__(self, maxsize: int = AUTH_TOKEN_CACHE_SIZE, ttl: float = AUTH_TOKEN_CACHE_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[AuthUser, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, token: str) -> Optional[AuthUser]:
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is not None and entry[1] > time.time():
+                self._data.move_to_end(token)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[token]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, user: AuthUser, exp: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[token] = (user, min(time.time() + self.ttl, exp))
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget every token of *user_id* (password change, deactivation)."""
+        with self._lock:
+            for token in [t for t, (u, _) in self._data.items() if u.id == user_id]:
+                del self._data[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache()
+
+
+# ───────────────────────── dependency ─────────────────────────
+def _unauthorized(detail: str = "Nicht angemeldet") -> HTTPException:
+    return HTTPException(401, detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def bearer_token(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    # EventSource cannot send headers – live streams may pass ?access_token=
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return request.query_params.get("access_token")
+    return None
+
+
+async def load_user(user_id: int, fingerprint: Optional[str] = None) -> Optional[AuthUser]:
+    """The active user behind a token; ``None`` if gone, inactive or the password changed."""
+    async with AsyncSessionLocal() as s:
+        user = await s.get(models.User, user_id)
+    if user is None or not user.is_active:
+        return None
+    if fingerprint is not None and fingerprint != password_fingerprint(user.hashed_password):
+        return None
+    return AuthUser(user.id, user.email)
+
+
+async def current_user(request: Request) -> Optional[AuthUser]:
+    """Route dependency: the caller's user, ``None`` while ``AUTH_ENABLED`` is off."""
+    if not AUTH_ENABLED:
+        return None
+    token = bearer_token(request)
+    if token is None:
+        raise _unauthorized()
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    try:
+        claims = decode_token(token)
+        user = await load_user(int(claims["sub"]), claims.get("pwd"))
+    except (TokenError, KeyError, ValueError):
+        raise _unauthorized("Ungültiges Token")
+    if user is None:
+        raise _unauthorized("Ungültiges Token")
+    token_cache.put(token, user, claims["exp"])
+    return user
+
+
+async def authenticate(email: str, password: str) -> Optional[models.User]:
+    """
+    The active user with these credentials, else ``None``; an outdated hash
+    is upgraded on the way.  Raises :class:`PoolBusy` when the hash pool is
+    saturated.  No pooled connection is held while bcrypt runs.
+    """
+    async with AsyncSessionLocal() as s:
+        user = (await s.exec(select(models.User).where(models.User.email == email))).first()
+    stored = user.hashed_password if user else None
+    ok, new_hash = await hash_pool.run(verify_and_update, password, stored)
+    if not ok or not user.is_active:
+        return None
+    if new_hash is not None:
+        async with AsyncSessionLocal() as s:
+            t = models.User.__table__
+            rehashed = (await s.execute(
+                update(t).where(t.c.id == user.id, t.c.hashed_password == stored)
+                .values(hashed_password=new_hash)
+            )).rowcount
+            await s.commit()
+        if rehashed:
+            user.hashed_password = new_hash
+    return user
+
+
+async def login(email: str, password: str) -> Tuple[Optional[models.User], Optional[str]]:
+    """``(user, token)`` for valid credentials, ``(None, None)`` otherwise."""
+    user = await authenticate(email, password)
+    if user is None:
+        return None, None
+    token = create_access_token(
+        {"sub": str(user.id), "pwd": password_fingerprint(user.hashed_password)},
+        timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return user, token
+
+
+async def update_user(user_id: int, *, password: Optional[str] = None,
+                      active: Optional[bool] = None) -> bool:
+    """
+    Set a new password and/or the active flag (at least one); ``False``
+    if there is no such user.  The user's cached tokens are dropped at once, and a new
+    password revokes every token issued before it.
+    """
+    values: Dict[str, Any] = {}
+    if password is not None:
+        values["hashed_password"] = await hash_pool.run(get_password_hash, password)
+    if active is not None:
+        values["is_active"] = active
+    t = models.User.__table__
+    async with AsyncSessionLocal() as s:
+        found = (await s.execute(update(t).where(t.c.id == user_id).values(**values))).rowcount
+        await s.commit()
+    token_cache.invalidate_user(user_id)
+    return bool(found)
+
+
+metrics.sampled("auth_hash_pending", "Password hash calls admitted to the pool.",
+                lambda: hash_pool.pending)
+metrics.sampled("auth_hash_calls", "Password hash calls by outcome.",
+                lambda: {("completed",): hash_pool.completed, ("rejected",): hash_pool.rejected},
+                ("outcome",), kind="counter")
+metrics.sampled("auth_token_cache_lookups", "Token cache lookups by result.",
+                lambda: {("hit",): token_cache.hits, ("miss",): token_cache.misses},
+                ("result",), kind="counter")
+
+
+if __name__ == "__main__":
+    import argparse
+    import getpass
+
+    from .database import SessionLocal, migrate_db
 
+    p = argparse.ArgumentParser(description="user accounts")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    for cmd in ("create-user", "set-password", "activate", "deactivate"):
+        sub.add_parser(cmd).add_argument("email")
+    args = p.parse_args()
+    migrate_db()
+    with SessionLocal() as s:
+        user = s.exec(select(models.User).where(models.User.email == args.email)).first()
+    if args.cmd == "create-user":
+        if user is not None:
+            raise SystemExit(f"{args.email} existiert bereits")
+        password = getpass.getpass(f"Passwort für {args.email}: ")
+        with SessionLocal() as s:
+            s.add(models.User(email=args.email, hashed_password=get_password_hash(password)))
+            s.commit()
+        print(f"{args.email} angelegt")
+    elif user is None:
+        raise SystemExit(f"{args.email} unbekannt")
+    else:
+        # a running server drops its cached tokens within AUTH_TOKEN_CACHE_TTL
+        if args.cmd == "set-password":
+            password = getpass.getpass(f"Neues Passwort für {args.email}: ")
+            asyncio.run(update_user(user.id, password=password))
+        else:
+            asyncio.run(update_user(user.id, active=args.cmd == "activate"))
+        hash_pool.shutdown()
+        print(f"{args.email}: {args.cmd}")
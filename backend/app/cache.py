@@ -0,0 +1,197 @@
+"""
+Process-wide memoisation for the payroll/tarif calculators.
+
+The frontend re-sends identical inputs on every re-render, so results are
+kept in bounded LRU maps keyed by a canonical input tuple.  Each cache also
+remembers a fingerprint of the rule constants it was filled with and drops
+everything as soon as those constants change.  Fingerprints are taken on
+every lookup, so they must be cheap: the tariff table is read-only and
+enters by reference, not by content.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List
+
+from . import metrics, payroll, payroll_batch, tarif, tarif_matrix
+from .payroll import PayrollInputData, PayrollResultData, Profile
+from .tarif import TarifInputData, TarifResultData
+
+CACHE_SIZE = int(os.getenv("CALC_CACHE_SIZE", "4096"))
+
+
+class ResultCache:
+    """Bounded LRU map with hit/miss/eviction counters."""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        rules: Callable[[], Hashable],
+        on_invalidate: Callable[[], None] = lambda: None,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self._rules = rules
+        self._on_invalidate = on_invalidate
+        self._fingerprint = rules()
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        fingerprint = self._rules()
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._invalidate(fingerprint)
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = compute()                       # errors propagate, never cached
+        if self.maxsize > 0:
+            with self._lock:
+                # rules changed while computing: the value may use either set
+                if self._rules() != fingerprint or self._fingerprint != fingerprint:
+                    return value
+                self._data[key] = value
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _invalidate(self, fingerprint: Hashable) -> None:
+        self._data.clear()
+        self._fingerprint = fingerprint
+        self.invalidations += 1
+        self._on_invalidate()
+
+
+# ───────────────────────── rule fingerprints ─────────────────────────
+def _payroll_rules() -> Hashable:
+    p = payroll
+    return (
+        p.BASIC_ALLOWANCE, p.ZONE1_END, p.ZONE2_END, p.ZONE3_END,
+        p.SOLI_FREE_SINGLE, p.SOLI_FREE_MARRIED, p.SOLI_RATE,
+        tuple(p.KIST_BY_STATE.items()),
+        p.KV_GENERAL, p.PV_BASE, p.PV_CHILDLESS_SURCH, p.RV_RATE, p.AV_RATE,
+        p.BBG_KV_PV, p.BBG_RV_AV,
+        p.WK_PAUSCHALE, p.SONDERAUSG_PAUS, p.VSP_MAX_RATE,
+    )
+
+
+def _tarif_rules() -> Hashable:
+    # the table is immutable – the same object means the same tariffs, and
+    # comparing it with itself is an identity check
+    return (tarif.TARIF_NRW_2025, tarif.TZUG_B_REF, tarif.STANDARD_HOURS)
+
+
+# ───────────────────────── canonical keys ─────────────────────────
+def _payroll_key(d: PayrollInputData) -> Hashable:
+    # every period other than "monthly" is treated as yearly; the state only
+    # matters for church tax
+    return (
+        float(d.gross), d.period == "monthly", int(d.tax_class), bool(d.married),
+        d.federal_state if d.church else None, bool(d.church),
+        bool(d.childless), float(d.additional_kv),
+    )
+
+
+def _tarif_key(d: TarifInputData) -> Hashable:
+    return (
+        d.entgeltgruppe, d.stufe, float(d.wochenstunden),
+        float(d.leistungszulage_pct), float(d.sonstige_zulage_pct),
+        float(d.tzug_b_pct), float(d.urlaubsgeld_pct),
+        float(d.transformationsgeld_pct) if d.include_transformationsgeld else None,
+        float(d.tzug_a_pct), float(d.weihnachtsgeld_pct_base),
+        float(d.weihnachtsgeld_pct_max), int(d.betriebszugehoerigkeit_monate),
+    )
+
+
+# ───────────────────────── cached calculators ─────────────────────────
+payroll_cache = ResultCache(
+    "gross_to_net", CACHE_SIZE, _payroll_rules,
+    on_invalidate=payroll._segments.cache_clear,
+)
+tarif_cache = ResultCache("berechne_nrw_2025", CACHE_SIZE, _tarif_rules)
+breakdown_cache = ResultCache("get_monthly_breakdown", CACHE_SIZE, _tarif_rules)
+curve_cache = ResultCache(
+    "net_curve", 256, _payroll_rules,
+    on_invalidate=payroll._segments.cache_clear,
+)
+matrix_cache = ResultCache("tarif_matrix", 1, _tarif_rules)
+
+CACHES = (payroll_cache, tarif_cache, breakdown_cache, curve_cache, matrix_cache)
+
+
+@metrics.timed("gross_to_net")
+def gross_to_net(data: PayrollInputData) -> PayrollResultData:
+    # results are frozen – cached instances are shared, not copied
+    return payroll_cache.get(_payroll_key(data), lambda: payroll.gross_to_net(data))
+
+
+@metrics.timed("berechne_nrw_2025")
+def berechne_nrw_2025(data: TarifInputData) -> TarifResultData:
+    return tarif_cache.get(_tarif_key(data), lambda: tarif.berechne_nrw_2025(data))
+
+
+@metrics.timed("get_monthly_breakdown")
+def get_monthly_breakdown(data: TarifInputData) -> List[Dict[str, Any]]:
+    rows = breakdown_cache.get(
+        _tarif_key(data), lambda: tuple(tarif.get_monthly_breakdown(data))
+    )
+    return [dict(r) for r in rows]
+
+
+@metrics.timed("net_curve_table")
+def curve_table(profile: Profile) -> payroll_batch.CurveTable:
+    # tables are read-only arrays, shared without copying
+    return curve_cache.get(profile, lambda: payroll_batch.curve_table(profile))
+
+
+@metrics.timed("tarif_matrix")
+def tarif_matrix_table() -> tarif_matrix.TarifMatrix:
+    # built lazily on first use, rebuilt only when the tariff table changes
+    return matrix_cache.get("default", tarif_matrix.build_matrix)
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return {c.name: c.stats() for c in CACHES}
+
+
+def clear() -> None:
+    for c in CACHES:
+        c.clear()
+
+
+def _lookups():
+    out = {}
+    for c in CACHES:
+        out[(c.name, "hit")], out[(c.name, "miss")] = c.hits, c.misses
+    return out
+
+
+metrics.sampled("calc_cache_lookups", "Calculator cache lookups by cache and result.",
+                _lookups, ("cache", "result"), kind="counter")
+metrics.sampled("calc_cache_entries", "Entries held per calculator cache.",
+                lambda: {(c.name,): len(c._data) for c in CACHES}, ("cache",))
@@ -1,16 +1,30 @@
 """
-Centralised DB helpers – now with a small retry loop so the API waits
-until Postgres is actually ready before running migrations.
+Centralised DB helpers.  Importing this module never connects: engines are
+lazy, and the schema is brought up by :func:`init_db` from the app's
+lifespan (async, exponential backoff) or by :func:`migrate_db` as a deploy
+step (``python -m app.migrations``).
 """
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
-import time
 from typing import Callable
 
-from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import OperationalError  # NEW
+from sqlalchemy.exc import OperationalError
+
+from . import metrics, profiler
+from .migrations import HEAD, current_version, migrate
+
+log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 
@@ -19,33 +33,130 @@ DATABASE_URL = os.getenv(
     "postgresql://user:password@db:5432/finance",
 )
 
+# native "INSERT … ON CONFLICT" per backend
+INSERT_BY_DIALECT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+# async driver per sync driver; ASYNC_DATABASE_URL overrides the derived URL
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url: str) -> str:
+    """``postgresql://…`` → ``postgresql+asyncpg://…`` (same for SQLite)."""
+    u = make_url(url)
+    return u.set(drivername=ASYNC_DRIVERS[u.get_backend_name()]).render_as_string(
+        hide_password=False
+    )
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+
+def pool_options(url: str) -> dict:
+    """
+    Connection-pool tuning from the environment (per engine, per process):
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s).
+    SQLite keeps SQLAlchemy's default pool.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
 # set SQL_ECHO=1 in the environment if you want to see all SQL in the logs
-engine = create_engine(DATABASE_URL, echo=os.getenv("SQL_ECHO") == "1")
+SQL_ECHO = os.getenv("SQL_ECHO") == "1"
+
+# sync engine: start-up, background workers and scripts
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO, **pool_options(DATABASE_URL))
 
 # IMPORTANT: class_=Session → each instance is *sqlmodel.Session* (has .exec)
 SessionLocal: Callable[[], Session] = sessionmaker(
     bind=engine, class_=Session, expire_on_commit=False
 )
 
+# async engine: request handlers
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, echo=SQL_ECHO, **pool_options(ASYNC_DATABASE_URL)
+)
+AsyncSessionLocal: Callable[[], AsyncSession] = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# statement timings and pool stats for /metrics (SQL_ECHO stays for debugging);
+# the per-request profiler only hooks in with SQL_PROFILE set
+metrics.instrument_engine(engine, "sync")
+metrics.instrument_engine(async_engine.sync_engine, "async")
+profiler.instrument_engine(engine)
+profiler.instrument_engine(async_engine.sync_engine)
+
 # ---------------------------------------------------------------------------
 
 
-def init_db(retries: int = 10, delay: int = 2) -> None:
+# schema setup: RUN_MIGRATIONS=0 in the API workers when a deploy step runs
+# the migrations once; the workers then only check that the schema is current
+RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "1") != "0"
+DB_CONNECT_RETRIES = int(os.getenv("DB_CONNECT_RETRIES", "10"))
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", "2"))
+MIGRATION_LOCK = 0x46494E41                 # pg advisory lock key ("FINA")
+
+
+def _migrate_locked(conn: Connection) -> int:
+    """:func:`migrate` under an advisory lock – concurrent workers run it once."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK})
+    return migrate(conn)
+
+
+def _check_schema(conn: Connection) -> int:
+    version = current_version(conn) if inspect(conn).has_table("schema_version") else 0
+    if version != HEAD:
+        raise RuntimeError(f"schema at version {version}, expected {HEAD} – run the migrations")
+    return version
+
+
+def migrate_db() -> int:
+    """Run pending migrations now (deploy step, scripts)."""
+    with engine.begin() as conn:
+        return _migrate_locked(conn)
+
+
+async def init_db(
+    retries: int = DB_CONNECT_RETRIES, delay: float = 0.5, max_delay: float = 10.0
+) -> int:
     """
-    Create all tables that are still missing.
+    Migrate (or, with ``RUN_MIGRATIONS=0``, verify) the schema.
 
-    The container may start before Postgres finishes initialising; we therefore
-    retry the connection a few times instead of crashing immediately.
+    The container may start before Postgres finishes initialising; the
+    connection is retried with exponential backoff instead of crashing.
     """
+    step = _migrate_locked if RUN_MIGRATIONS else _check_schema
     for attempt in range(1, retries + 1):
         try:
-            SQLModel.metadata.create_all(engine)
-            return
-        except OperationalError as exc:
+            async with async_engine.begin() as conn:
+                return await conn.run_sync(step)
+        except (OperationalError, OSError) as exc:
             if attempt == retries:
                 raise
-            print(
-                f"[init_db] Postgres not ready (attempt {attempt}/{retries}): "
-                f"{exc}\n→ retrying in {delay}s ..."
-            )
-            time.sleep(delay)
+            log.warning("database not ready (attempt %d/%d): %s – retrying in %.1fs",
+                        attempt, retries, exc, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+    raise RuntimeError("unreachable")
+
+
+async def ping(timeout: float = 2.0) -> None:
+    async def select_one() -> None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.wait_for(select_one(), timeout)
+
+
+async def warm_pool(n: int = DB_POOL_WARM) -> None:
+    """Open *n* pooled connections up front so first requests skip the handshake."""
+    await asyncio.gather(*(ping(timeout=30.0) for _ in range(n)))
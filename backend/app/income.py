@@ -0,0 +1,90 @@
+"""Tarif → monthly net pipeline: the whole income year in one call.
+
+Regular monthly pay runs through the batched gross-to-net engine; the
+special payments (T-ZUG, Urlaubsgeld, Transformationsgeld, Weihnachtsgeld)
+are treated as *sonstige Bezüge*: taxed with the Jahreslohnsteuer method
+and subject to SV only up to the pro-rata annual contribution ceiling.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+from . import cache
+from .numeric import round2
+from .payroll import (
+    AV_RATE, BBG_KV_PV, BBG_RV_AV, KV_GENERAL, PV_BASE, PV_CHILDLESS_SURCH,
+    RV_RATE, Profile, sonstiger_bezug,
+)
+from .payroll_batch import gross_to_net_batch
+from .tarif import TarifInputData
+
+SV_FIELDS = ("health_employee", "care_employee", "pension_employee", "unemployment_employee")
+TOTAL_FIELDS = ("Brutto", "Lohnsteuer", "Solidaritaet", "Kirchensteuer",
+                "Sozialversicherung", "Netto")
+
+
+def _special_sv(regular: np.ndarray, special: np.ndarray, childless: bool,
+                additional_kv: float) -> np.ndarray:
+    """
+    Employee SV on one-off payments, capped by the anteilige Jahres-BBG:
+    BBG × months elapsed minus what was already contributory this year.
+    """
+    kv_pv_rate = (KV_GENERAL + additional_kv) / 2 + PV_BASE / 2
+    if childless:
+        kv_pv_rate += PV_CHILDLESS_SURCH
+    rv_av_rate = (RV_RATE + AV_RATE) / 2
+
+    out = np.zeros(12)
+    used_kv = used_rv = 0.0
+    for i in range(12):
+        used_kv += min(regular[i], BBG_KV_PV)
+        used_rv += min(regular[i], BBG_RV_AV)
+        if special[i] <= 0:
+            continue
+        kv_base = min(special[i], max(0.0, BBG_KV_PV * (i + 1) - used_kv))
+        rv_base = min(special[i], max(0.0, BBG_RV_AV * (i + 1) - used_rv))
+        used_kv += kv_base
+        used_rv += rv_base
+        out[i] = kv_base * kv_pv_rate + rv_base * rv_av_rate
+    return out
+
+
+def monthly_net(tarif_inp: TarifInputData, profile: Profile) -> Dict[str, Any]:
+    """Per-month gross/net/deduction table plus annual totals."""
+    months = cache.get_monthly_breakdown(tarif_inp)
+    brutto = np.array([m["Brutto"] for m in months])
+    regular = np.full(12, cache.berechne_nrw_2025(tarif_inp).monatsgesamt)
+    special = round2(brutto - regular)
+
+    tax_class, married, federal_state, church, childless, additional_kv = profile
+    reg = gross_to_net_batch(
+        regular, "monthly", tax_class, married, federal_state, church,
+        childless, additional_kv,
+    )
+
+    sb_tax, sb_soli, sb_kist = np.zeros(12), np.zeros(12), np.zeros(12)
+    paid = 0.0
+    for i in np.flatnonzero(special > 0):
+        # forecast annual pay: regular pay plus one-offs already paid this year
+        jahreslohn = 12 * regular[i] + paid
+        sb_tax[i], sb_soli[i], sb_kist[i] = sonstiger_bezug(jahreslohn, special[i], profile)
+        paid += special[i]
+    sb_tax, sb_soli, sb_kist = round2(sb_tax), round2(sb_soli), round2(sb_kist)
+    sb_sv = round2(_special_sv(regular, special, childless, additional_kv))
+
+    cols = {
+        "Brutto": brutto,
+        "Lohnsteuer": round2(reg["income_tax"] + sb_tax),
+        "Solidaritaet": round2(reg["solidarity"] + sb_soli),
+        "Kirchensteuer": round2(reg["church_tax"] + sb_kist),
+        "Sozialversicherung": round2(sum(reg[f] for f in SV_FIELDS) + sb_sv),
+        "Netto": round2(reg["net"] + special - sb_tax - sb_soli - sb_kist - sb_sv),
+    }
+
+    rows: List[Dict[str, Any]] = []
+    for i, month in enumerate(months):
+        rows.append({**month, **{k: v[i].item() for k, v in cols.items()}})
+    return {
+        "monate": rows,
+        "jahr": {k: round(float(cols[k].sum()), 2) for k in TOTAL_FIELDS},
+    }
@@ -0,0 +1,268 @@
+"""
+Background jobs for heavy maintenance work.
+
+Jobs run one at a time on a worker thread with their own sessions.  Deletes
+go in primary-key chunks, each in a short transaction of its own, so
+interactive edits are never blocked for longer than one chunk.  Progress
+is reported per chunk; a cancelled job stops after the current chunk and
+keeps what it has done so far.
+
+Job kinds are registered with :func:`job_type`::
+
+    @job_type("reset_year")
+    def reset_year(job, year: int) -> None: ...
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import exists, func, select
+from sqlalchemy import delete as sqldelete
+
+from . import live, metrics, models, revisions, snapshots, summary
+from .audit import AUDIT_RETENTION_DAYS, log_action
+from .database import SessionLocal
+
+log = logging.getLogger(__name__)
+
+JOB_CHUNK = int(os.getenv("JOB_CHUNK", "5000"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "100"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = {DONE, FAILED, CANCELLED}
+
+
+class Cancelled(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str = QUEUED
+    done: int = 0
+    total: Optional[int] = None
+    error: Optional[str] = None
+    created: datetime = field(default_factory=datetime.utcnow)
+    started: Optional[datetime] = None
+    finished: Optional[datetime] = None
+    cancel_requested: bool = False
+
+    def advance(self, n: int) -> None:
+        """Count *n* processed rows; raise :class:`Cancelled` if asked to stop."""
+        self.done += n
+        if self.cancel_requested:
+            raise Cancelled
+
+    def asdict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out.pop("cancel_requested")
+        return out
+
+
+JOB_TYPES: Dict[str, Callable[..., None]] = {}
+
+
+def job_type(kind: str):
+    def register(fn: Callable[..., None]) -> Callable[..., None]:
+        JOB_TYPES[kind] = fn
+        return fn
+    return register
+
+
+# ───────────────────────── runner ─────────────────────────
+class JobRunner:
+    """Job registry plus a single lazily started worker thread."""
+
+    def __init__(self, history: int = JOB_HISTORY) -> None:
+        self.history = history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, **params: Any) -> Job:
+        if kind not in JOB_TYPES:
+            raise ValueError(f"Unbekannter Job-Typ: {kind}")
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jobs", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; queued jobs never start, running ones stop after a chunk."""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status not in FINISHED:
+            job.cancel_requested = True
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+        return job
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Cancel whatever is pending and wait for the worker to exit."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _trim(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.status in FINISHED]
+        for job_id in finished[: max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status, job.error, job.finished = status, error, datetime.utcnow()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.status != QUEUED:
+                continue
+            job.status, job.started = RUNNING, datetime.utcnow()
+            try:
+                JOB_TYPES[job.kind](job, **job.params)
+            except Cancelled:
+                self._finish(job, CANCELLED)
+            except Exception as exc:                # never kill the worker
+                log.exception("job %s (%s) failed", job.id, job.kind)
+                self._finish(job, FAILED, str(exc))
+            else:
+                self._finish(job, DONE)
+            log_action("job", {"id": job.id, "kind": job.kind, "params": job.params,
+                               "status": job.status, "done": job.done})
+
+
+runner = JobRunner()
+
+
+def _job_states() -> Dict[tuple, float]:
+    states = {(status,): 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+    for job in runner.list():
+        states[(job.status,)] += 1
+    return states
+
+
+metrics.sampled("jobs", "Background jobs in the registry by status.", _job_states, ("status",))
+
+
+# ───────────────────────── chunk helpers ─────────────────────────
+def delete_in_chunks(job: Job, table, *where, chunk: Optional[int] = None,
+                     after_chunk: Callable[[], None] = lambda: None) -> int:
+    """
+    Delete the rows matching *where* in ascending-id chunks, one commit per
+    chunk.  Only rows that existed when the job reached this step are
+    touched, so anything written meanwhile survives.
+    """
+    chunk = chunk or JOB_CHUNK
+    with SessionLocal() as s:
+        high = s.execute(select(func.max(table.c.id)).where(*where)).scalar()
+        if high is None:
+            return 0
+        job.total = (job.total or 0) + s.execute(
+            select(func.count()).select_from(table).where(*where)
+        ).scalar_one()
+
+    deleted, low = 0, 0
+    while True:
+        with SessionLocal() as s:
+            ids = s.execute(
+                select(table.c.id)
+                .where(*where, table.c.id > low, table.c.id <= high)
+                .order_by(table.c.id)
+                .limit(chunk)
+            ).scalars().all()
+            if not ids:
+                return deleted
+            s.execute(sqldelete(table).where(table.c.id.in_(ids)))
+            s.commit()
+        after_chunk()
+        deleted += len(ids)
+        low = ids[-1]
+        job.advance(len(ids))
+
+
+# ───────────────────────── job types ─────────────────────────
+@job_type("reset_year")
+def reset_year(job: Job, year: int) -> None:
+    """All cells (every revision) and row meta of *year*."""
+    cells, rows = models.FinanceCell.__table__, models.FinanceRow.__table__
+    try:
+        delete_in_chunks(job, cells, cells.c.year == year,
+                         after_chunk=lambda: snapshots.cache.invalidate(year, snapshots.CELLS))
+        delete_in_chunks(job, rows, rows.c.year == year,
+                         after_chunk=lambda: snapshots.cache.invalidate(year, snapshots.ROWS))
+    finally:
+        snapshots.cache.invalidate(year)
+        rebuild_summary(job, years=[year])
+        live.publish(year, resync=True)
+
+
+@job_type("compact_revisions")
+def compact_revisions(job: Job, year: int) -> None:
+    """
+    Fold every revision below the undo floor at once, chunk by chunk – the
+    backlog :func:`revisions.compact` (one revision per redo) leaves behind.
+    """
+    t = models.FinanceCell.__table__
+    with SessionLocal() as s:
+        floor, _ = revisions.revision_bounds(s, year)
+    if floor <= 0:
+        return
+
+    newer = t.alias("newer")
+    shadowed = exists().where(
+        newer.c.year == t.c.year,
+        newer.c.row == t.c.row,
+        newer.c.col == t.c.col,
+        newer.c.revision > t.c.revision,
+        newer.c.revision <= floor,
+    )
+    try:
+        delete_in_chunks(job, t, t.c.year == year, t.c.revision < floor, shadowed)
+    finally:
+        snapshots.cache.invalidate(year, snapshots.CELLS)
+
+
+@job_type("rebuild_summary")
+def rebuild_summary(job: Job, years: Optional[List[int]] = None) -> None:
+    """Recompute the monthly totals of *years* (default: all) from the cells."""
+    with SessionLocal() as s:
+        summary.rebuild(s, years)
+        s.commit()
+
+
+@job_type("prune_audit")
+def prune_audit(job: Job, days: Optional[int] = None) -> None:
+    """Audit-log entries older than *days* (default ``AUDIT_RETENTION_DAYS``)."""
+    days = AUDIT_RETENTION_DAYS if days is None else days
+    if days <= 0:
+        return
+    t = models.ActionLog.__table__
+    delete_in_chunks(job, t, t.c.ts < datetime.utcnow() - timedelta(days=days))
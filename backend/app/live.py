@@ -0,0 +1,368 @@
+"""
+Live finance-table changes for open tabs (``GET /finance/{year}/events``).
+
+Write routes :func:`publish` what they changed after their commit.  Changes
+reach every worker through a pluggable :class:`Backend` – in process by
+default, ``LIVE_BACKEND=postgres`` fans out via ``LISTEN/NOTIFY`` – and the
+:class:`Broker` of each worker coalesces them per year over
+``LIVE_WINDOW`` seconds into one diff::
+
+    {"version": 7, "cleared": [3], "rows": [{…RowMeta}], "cells": [{…}],
+     "revision": 4, "resync": false}
+
+Clients apply ``cleared`` (rows whose cells were dropped), ``rows``, then
+``cells``; ``resync`` means "refetch the year".  Versions grow by one per
+diff and year; the last ``LIVE_BUFFER`` diffs are kept so a reconnecting
+client (``Last-Event-ID``) gets exactly what it missed – or a resync if
+that has left the buffer or the worker restarted (ids carry the boot
+nonce).
+
+The same channel carries cache invalidations: a worker that invalidates
+its snapshot cache or saves a settings group has the backend tell every
+other worker to drop it as well.  If the ``LISTEN`` connection drops, the
+backend reconnects with backoff; whatever passed meanwhile is unknown, so
+every worker then clears its shared caches and tells open streams to resync.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from . import metrics, settings, snapshots
+from .snapshots import BOOT
+
+log = logging.getLogger(__name__)
+
+LIVE_WINDOW = float(os.getenv("LIVE_WINDOW", "0.05"))
+LIVE_BUFFER = int(os.getenv("LIVE_BUFFER", "256"))
+LIVE_QUEUE = int(os.getenv("LIVE_QUEUE", "256"))
+LIVE_BACKEND = os.getenv("LIVE_BACKEND", "local")
+NOTIFY_CHANNEL = "finance_live"
+NOTIFY_LIMIT = 7900                                 # Postgres caps payloads at 8000 bytes
+LIVE_RECONNECT_MAX = float(os.getenv("LIVE_RECONNECT_MAX", "30"))   # backoff cap, seconds
+
+Change = Dict[str, Any]
+Message = Dict[str, Any]
+
+
+# ───────────────────────── coalescing ─────────────────────────
+class _Pending:
+    """Changes of one year collected during a window, last write wins."""
+
+    def __init__(self) -> None:
+        self.cleared: Set[int] = set()
+        self.rows: Dict[int, dict] = {}
+        self.cells: Dict[Tuple[int, int, int], dict] = {}
+        self.revision: Optional[int] = None
+        self.resync = False
+
+    def add(self, change: Change) -> None:
+        for row in change.get("cleared", ()):
+            self.cleared.add(row)
+            self.cells = {k: c for k, c in self.cells.items() if k[0] != row}
+        for meta in change.get("rows", ()):
+            self.rows[meta["row"]] = meta
+        for c in change.get("cells", ()):
+            self.cells[(c["row"], c["col"], c["revision"])] = c
+        if change.get("revision") is not None:
+            self.revision = change["revision"]
+        self.resync |= bool(change.get("resync"))
+
+    def message(self, version: int) -> Message:
+        if self.resync:                             # the client refetches anyway
+            return {"version": version, "resync": True}
+        return {
+            "version": version,
+            "cleared": sorted(self.cleared),
+            "rows": list(self.rows.values()),
+            "cells": list(self.cells.values()),
+            "revision": self.revision,
+            "resync": False,
+        }
+
+
+class Subscription:
+    def __init__(self, year: int) -> None:
+        self.year = year
+        self.queue: "asyncio.Queue[Message]" = asyncio.Queue(LIVE_QUEUE)
+
+    def deliver(self, msg: Message) -> None:
+        try:
+            self.queue.put_nowait(msg)
+        except asyncio.QueueFull:                   # too slow – make it start over
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"version": msg["version"], "resync": True})
+
+
+# ───────────────────────── broker ─────────────────────────
+class Broker:
+    """Per-worker fan-out: coalescing windows, versions, replay buffer."""
+
+    def __init__(self, window: float = LIVE_WINDOW, buffer: int = LIVE_BUFFER) -> None:
+        self.window = window
+        self.buffer = buffer
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subs: Dict[int, Set[Subscription]] = {}
+        self._pending: Dict[int, _Pending] = {}
+        self._versions: Dict[int, int] = {}
+        self._history: Dict[int, Deque[Message]] = {}
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    # ───────────── called from any thread ─────────────
+    def receive(self, year: int, change: Change) -> None:
+        """Queue *change* for the next diff of *year* (thread-safe)."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._add, year, change)
+
+    # ───────────── event-loop side ─────────────
+    def _add(self, year: int, change: Change) -> None:
+        pending = self._pending.get(year)
+        if pending is None:
+            pending = self._pending[year] = _Pending()
+            self._loop.call_later(self.window, self._flush, year)
+        pending.add(change)
+
+    def _flush(self, year: int) -> None:
+        pending = self._pending.pop(year, None)
+        if pending is None:
+            return
+        version = self._versions[year] = self._versions.get(year, 0) + 1
+        msg = pending.message(version)
+        self._history.setdefault(year, deque(maxlen=self.buffer)).append(msg)
+        for sub in list(self._subs.get(year, ())):
+            sub.deliver(msg)
+
+    def version(self, year: int) -> int:
+        return self._versions.get(year, 0)
+
+    def resync_all(self) -> None:
+        """Make every open stream refetch – changes may have been lost."""
+        for year in list(self._subs):
+            self.receive(year, {"resync": True})
+
+    def subscribe(self, year: int, last_event_id: Optional[str] = None) -> Subscription:
+        """New subscription, pre-filled with whatever the client missed."""
+        self.bind(asyncio.get_running_loop())
+        sub = Subscription(year)
+        self._subs.setdefault(year, set()).add(sub)
+        for msg in self.missed(year, last_event_id):
+            sub.deliver(msg)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.year, set())
+        subs.discard(sub)
+        if not subs:
+            self._subs.pop(sub.year, None)
+
+    def missed(self, year: int, last_event_id: Optional[str]) -> List[Message]:
+        if not last_event_id:
+            return []
+        boot, _, seen = last_event_id.rpartition("-")
+        current = self.version(year)
+        if boot != BOOT or not seen.isdigit() or int(seen) > current:
+            return [{"version": current, "resync": True}]
+        history = self._history.get(year, ())
+        missed = [m for m in history if m["version"] > int(seen)]
+        if int(seen) < current and (not missed or missed[0]["version"] != int(seen) + 1):
+            return [{"version": current, "resync": True}]
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "years": len(self._subs),
+            "subscribers": sum(len(s) for s in self._subs.values()),
+            "backend": type(backend).__name__,
+        }
+
+
+def event_id(msg: Message) -> str:
+    return f"{BOOT}-{msg['version']}"
+
+
+broker = Broker()
+
+metrics.sampled("live_subscribers", "Open live-update streams.",
+                lambda: broker.stats()["subscribers"])
+
+
+# ───────────────────────── shared caches ─────────────────────────
+def _drop_snapshots(key: Any) -> None:
+    year, kinds = key
+    snapshots.cache.invalidate(year, *kinds, share=False)
+
+
+# cache name → how another worker's invalidation (its key) is applied here
+SHARED_CACHES: Dict[str, Callable[[Any], None]] = {
+    "snapshots": _drop_snapshots,
+    "settings": lambda group: settings.cache.drop(group),
+}
+
+
+def apply_shared(cache: str, key: Any) -> None:
+    handler = SHARED_CACHES.get(cache)
+    if handler is None:
+        log.warning("invalidation for unknown cache %r ignored", cache)
+        return
+    handler(key)
+
+
+def forget_shared() -> None:
+    """Drop everything another worker might have invalidated unheard."""
+    snapshots.cache.reset()
+    settings.cache.reset()
+    broker.resync_all()
+
+
+# ───────────────────────── backends ─────────────────────────
+class Backend:
+    """In-process fan-out: changes go straight to this worker's broker."""
+
+    async def start(self) -> None:
+        broker.bind(asyncio.get_running_loop())
+
+    async def stop(self) -> None:
+        pass
+
+    def send(self, year: int, change: Change) -> None:
+        broker.receive(year, change)
+
+    def share(self, cache: str, key: Any) -> None:
+        """Repeat a local cache invalidation elsewhere – no one else here."""
+
+
+class PostgresBackend(Backend):
+    """
+    ``NOTIFY`` on one channel; every worker ``LISTEN``s and feeds its broker.
+    A lost connection is re-established in the background; messages posted
+    until then are dropped, and the others are told to forget everything.
+    """
+
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self._conn = None
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnecting: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    async def start(self) -> None:
+        await super().start()
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+            self._reconnecting = None
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await conn.close()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        try:
+            await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except BaseException:
+            await conn.close()
+            raise
+        conn.add_termination_listener(self._on_terminate)
+        self._pid = conn.get_server_pid()
+        self._conn = conn
+
+    def _on_terminate(self, conn) -> None:
+        if conn is not self._conn or self._stopped:
+            return                                  # closed on purpose
+        log.warning("live LISTEN connection lost, reconnecting")
+        self._conn = None
+        self._reconnecting = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = min(0.5, LIVE_RECONNECT_MAX)
+        while not self._stopped:
+            try:
+                await self._connect()
+            except Exception as exc:
+                log.warning("live reconnect failed (%s), retrying in %.1fs", exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LIVE_RECONNECT_MAX)
+                continue
+            self._reconnecting = None
+            if self._stopped:                       # stop() came in meanwhile
+                conn, self._conn = self._conn, None
+                await conn.close()
+                return
+            log.info("live LISTEN connection restored")
+            forget_shared()                         # missed while we were away
+            self._post(json.dumps({"lost": True}))  # … and so may the others
+            return
+
+    def _on_notify(self, _conn, pid: int, _channel, payload: str) -> None:
+        msg = json.loads(payload)
+        if msg.get("lost"):
+            if pid != self._pid:
+                forget_shared()
+            return
+        if "cache" in msg:
+            if pid != self._pid:                    # ours is invalidated already
+                apply_shared(msg["cache"], msg["key"])
+            return
+        broker.receive(msg["year"], msg["change"])
+
+    def send(self, year: int, change: Change) -> None:
+        payload = json.dumps({"year": year, "change": change}, separators=(",", ":"))
+        if len(payload) > NOTIFY_LIMIT:             # too big for NOTIFY – just refetch
+            payload = json.dumps({"year": year, "change": {"resync": True}})
+        self._post(payload)
+
+    def share(self, cache: str, key: Any) -> None:
+        self._post(json.dumps({"cache": cache, "key": key}, separators=(",", ":")))
+
+    def _post(self, payload: str) -> None:
+        if self._loop is None or self._conn is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._notify(payload), self._loop)
+
+    async def _notify(self, payload: str) -> None:
+        conn = self._conn
+        if conn is None or conn.is_closed():        # reconnecting – the others resync
+            return
+        try:
+            await conn.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, payload)
+        except Exception:
+            log.exception("live change could not be published")
+
+
+def _make_backend() -> Backend:
+    if LIVE_BACKEND == "postgres":
+        from sqlalchemy.engine import make_url
+
+        from .database import DATABASE_URL
+
+        url = make_url(DATABASE_URL).set(drivername="postgresql")
+        return PostgresBackend(url.render_as_string(hide_password=False))
+    return Backend()
+
+
+backend = _make_backend()
+snapshots.cache.on_invalidate.append(
+    lambda year, kinds: backend.share("snapshots", [year, list(kinds)])
+)
+settings.cache.on_invalidate.append(lambda group: backend.share("settings", group))
+
+
+def publish(year: int, **change: Any) -> None:
+    """Announce a committed change of *year* (cells, rows, cleared, revision, resync)."""
+    backend.send(year, change)
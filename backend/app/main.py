@@ -1,16 +1,72 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from .api import router
-from .database import init_db
+from . import audit, auth, jobs, live, metrics, profiler
+from .api import public_router, router
+from .database import async_engine, init_db, ping, warm_pool
 
-# ---------------------------------------------------------------------------
-# initialise DB schema once at process start-up
-# ---------------------------------------------------------------------------
-init_db()
+log = logging.getLogger(__name__)
+
+
+class Startup:
+    """Outcome of the deferred DB start-up, for the health probes."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.error: Optional[str] = None
+
+
+startup = Startup()
+
+
+async def prune_audit_periodically() -> None:
+    """Queue the audit retention job every ``AUDIT_PRUNE_INTERVAL`` seconds."""
+    while True:
+        jobs.runner.submit("prune_audit")
+        await asyncio.sleep(audit.AUDIT_PRUNE_INTERVAL)
+
+
+async def start_services() -> None:
+    """
+    Everything that needs the database, off the import path and off the
+    lifespan's critical path: the process serves ``/healthz`` right away
+    and ``/readyz`` once this has finished.
+    """
+    try:
+        await init_db()
+        await warm_pool()
+        await live.backend.start()
+    except Exception as exc:
+        log.exception("start-up failed")
+        startup.error = f"{type(exc).__name__}: {exc}"
+        return
+    startup.ready = True
+    if audit.AUDIT_RETENTION_DAYS > 0:
+        await prune_audit_periodically()
 
-app = FastAPI(title="Finance Suite API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services = asyncio.create_task(start_services())
+    yield
+    services.cancel()
+    with suppress(asyncio.CancelledError):
+        await services
+    await live.backend.stop()
+    # stop maintenance jobs after their current chunk, then flush the audit queue
+    jobs.runner.stop()
+    audit.writer.stop()
+    auth.hash_pool.shutdown()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Finance Suite API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,10 +76,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(router, prefix="/api")
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+if profiler.SQL_PROFILE_ENABLED:
+    app.add_middleware(profiler.ProfilerMiddleware)
+
+# with AUTH_ENABLED=1 everything under /api except login needs a bearer token
+app.include_router(public_router, prefix="/api")
+app.include_router(router, prefix="/api", dependencies=[Depends(auth.current_user)])
 
 
 @app.get("/")
 def read_root():
     return {"message": "Finance Suite API"}
 
+
+# ---------------------------------------------------------------------------
+# probes – liveness never touches the DB, readiness does
+# ---------------------------------------------------------------------------
+@app.get("/healthz")
+def healthz():
+    """Process is up; 503 only if start-up gave up for good (restart me)."""
+    if startup.error:
+        return JSONResponse({"status": "failed", "error": startup.error}, status_code=503)
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Schema in place, pool warmed and the database answering right now."""
+    if not startup.ready:
+        return JSONResponse({"status": "starting", "error": startup.error}, status_code=503)
+    try:
+        await ping()
+    except Exception as exc:
+        return JSONResponse({"status": "unavailable", "error": str(exc)}, status_code=503)
+    pool = async_engine.pool
+    return {"status": "ready", "pool": pool.status()}
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape target (text exposition format)."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
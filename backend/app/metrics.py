@@ -0,0 +1,313 @@
+"""
+Prometheus metrics, served in the text exposition format at ``/metrics``.
+
+No client library: counters and histograms are dicts of per-label-set
+values behind one lock each, so recording costs a ``perf_counter()`` pair,
+a bisect and a dict update – cheap enough to stay on in production
+(``METRICS_ENABLED=0`` turns all instrumentation off).
+
+* requests: :class:`MetricsMiddleware` counts every HTTP request by route
+  template and status and times it (event streams are counted, not timed);
+* database: :func:`instrument_engine` times every statement by engine and
+  statement type and the wait for a pooled connection; pool sizes are
+  sampled at scrape time;
+* calculators: :func:`timed` wraps the calculator entry points;
+* queues: modules register scrape-time gauges with :func:`sampled`
+  (audit queue, job queue, live subscribers, …).
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+NAMESPACE = "finance"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 2.5)
+CALC_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 0.001, 0.0025, 0.01, 0.05, 0.25)
+
+Labels = Tuple[str, ...]
+
+
+# ───────────────────────── metric types ─────────────────────────
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = f"{NAMESPACE}_{name}"
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        """(suffix, label names, label values, value) per exposed line."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, n: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + n
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield "_total", self.labelnames, labels, value
+
+
+class Histogram(_Metric):
+    """Cumulative buckets (``le``) plus ``_sum`` and ``_count`` per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[Any]] = {}        # labels → [sum, counts]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)                # first bucket with value <= le
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0, [0] * (len(self.buckets) + 1)]
+            series[0] += value
+            series[1][i] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, total, list(counts)) for labels, (total, counts) in self._series.items()]
+        names = self.labelnames + ("le",)
+        for labels, total, counts in items:
+            acc = 0
+            for le, n in zip(self.buckets + (math.inf,), counts):
+                acc += n
+                yield "_bucket", names, labels + (_number(le),), acc
+            yield "_sum", self.labelnames, labels, total
+            yield "_count", self.labelnames, labels, acc
+
+
+class Sampled(_Metric):
+    """Read at scrape time: *fn* returns a value, or ``{label values: value}``."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Union[float, Dict[Labels, float]]],
+                 labelnames: Sequence[str] = (), kind: str = "gauge") -> None:
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self._fn = fn
+
+    def samples(self):
+        values = self._fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        suffix = "_total" if self.kind == "counter" else ""
+        for labels, value in values.items():
+            yield suffix, self.labelnames, labels, value
+
+
+REGISTRY: List[_Metric] = []
+
+
+def sampled(name: str, help: str, fn, labelnames: Sequence[str] = (),
+            kind: str = "gauge") -> Sampled:
+    return Sampled(name, help, fn, labelnames, kind)
+
+
+# ───────────────────────── exposition ─────────────────────────
+def _number(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(v)
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def render() -> str:
+    lines = []
+    for m in REGISTRY:
+        try:
+            samples = list(m.samples())
+        except Exception as exc:                # a broken gauge must not break the scrape
+            lines.append(f"# {m.name} unavailable: {type(exc).__name__}")
+            continue
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        for suffix, names, labels, value in samples:
+            if names:
+                pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(names, labels))
+                lines.append(f"{m.name}{suffix}{{{pairs}}} {_number(value)}")
+            else:
+                lines.append(f"{m.name}{suffix} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ───────────────────────── HTTP requests ─────────────────────────
+http_requests = Counter(
+    "http_requests", "HTTP requests by route template and status.",
+    ("method", "route", "status"),
+)
+http_duration = Histogram(
+    "http_request_duration_seconds", "Time until the response was sent, by route template.",
+    ("method", "route"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no ``BaseHTTPMiddleware`` task overhead).  Routes
+    are labelled by their template – ``/finance/{year}``, never the concrete
+    path – so the label set stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status, stream = 500, False
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stream = any(k == b"content-type" and v.startswith(b"text/event-stream")
+                             for k, v in message.get("headers", ()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            http_requests.inc(method, path, str(status))
+            if not stream:                      # SSE connections live for hours
+                http_duration.observe(time.perf_counter() - start, method, path)
+
+
+# ───────────────────────── database ─────────────────────────
+db_duration = Histogram(
+    "db_statement_duration_seconds", "Statement execution time by engine and statement type.",
+    ("engine", "statement"), buckets=DB_BUCKETS,
+)
+db_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+    ("engine",), buckets=DB_BUCKETS,
+)
+STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY", "BEGIN",
+                   "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "CREATE", "DROP", "ALTER"}
+_pools: Dict[str, Any] = {}                  # engine label → engine (pool read at scrape)
+_timed_pool_classes: Dict[Tuple[type, str], type] = {}
+
+
+def statement_type(statement: str) -> str:
+    head = statement.lstrip("( \n\t")[:10].split(None, 1)
+    verb = head[0].upper() if head else ""
+    return verb if verb in STATEMENT_TYPES else "OTHER"
+
+
+def _timed_pool(cls: type, label: str) -> type:
+    """Subclass of *cls* timing ``_do_get``; survives ``pool.recreate()``."""
+    key = (cls, label)
+    if key not in _timed_pool_classes:
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super(timed, self)._do_get()
+            finally:
+                db_checkout_wait.observe(time.perf_counter() - start, label)
+
+        timed = type(f"Timed{cls.__name__}", (cls,), {"_do_get": _do_get})
+        _timed_pool_classes[key] = timed
+    return _timed_pool_classes[key]
+
+
+def instrument_engine(engine, label: str) -> None:
+    """Statement timings, checkout wait and pool gauges for one (sync) engine."""
+    if not METRICS_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_start", None)
+        if start is not None:
+            db_duration.observe(time.perf_counter() - start, label, statement_type(statement))
+
+    engine.pool.__class__ = _timed_pool(type(engine.pool), label)
+    _pools[label] = engine
+
+
+def _pool_state() -> Dict[Labels, float]:
+    out: Dict[Labels, float] = {}
+    for label, engine in _pools.items():
+        pool = engine.pool
+        for state, attr in (("size", "size"), ("checked_out", "checkedout"),
+                            ("idle", "checkedin"), ("overflow", "overflow")):
+            fn = getattr(pool, attr, None)
+            if fn is not None:
+                out[(label, state)] = max(fn(), 0)
+    return out
+
+
+sampled("db_pool_connections", "Connection pool size and usage by engine.", _pool_state,
+        ("engine", "state"))
+
+
+# ───────────────────────── calculators ─────────────────────────
+calc_duration = Histogram(
+    "calculator_duration_seconds", "Calculator calls (including cache hits) and their duration.",
+    ("calculator",), buckets=CALC_BUCKETS,
+)
+
+
+def timed(name: str):
+    """Decorator: record every call of the wrapped calculator as *name*."""
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                calc_duration.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorate
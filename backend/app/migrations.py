@@ -0,0 +1,153 @@
+"""
+Minimal schema migrations.
+
+``create_all`` only creates tables that are missing; it never touches
+indexes or columns of existing ones.  Schema changes to existing tables
+therefore go here as numbered steps, and the applied step is recorded in
+``schema_version``.
+
+* fresh database → ``create_all`` builds the current schema, stamped as head;
+* database from before this module → every step runs (they are idempotent);
+* otherwise → only the steps newer than the recorded version run.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, delete, func, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from . import models
+
+log = logging.getLogger(__name__)
+
+_meta = MetaData()
+schema_version = Table("schema_version", _meta, Column("version", Integer, nullable=False))
+
+
+def _index_names(conn: Connection, table: str) -> set:
+    return {i["name"] for i in inspect(conn).get_indexes(table)}
+
+
+def _index(model, name: str):
+    return next(i for i in model.__table__.indexes if i.name == name)
+
+
+def _dedupe(conn: Connection, model, *cols: str) -> None:
+    """Keep the newest row (max id) per *cols* ahead of a unique index."""
+    c = model.__table__.c
+    keep = select(func.max(c.id)).group_by(*(c[n] for n in cols))
+    conn.execute(delete(model.__table__).where(c.id.not_in(keep)))
+
+
+# ───────────────────────── steps ─────────────────────────
+def _0001_cell_unique_index(conn: Connection) -> None:
+    """Unique (year, row, col, revision) – target of the bulk upsert."""
+    if "ux_financecell_cell" in _index_names(conn, "financecell"):
+        return
+    _dedupe(conn, models.FinanceCell, "year", "row", "col", "revision")
+    _index(models.FinanceCell, "ux_financecell_cell").create(conn)
+
+
+def _0002_composite_indexes(conn: Connection) -> None:
+    """
+    Composite indexes for the finance queries; the single-column ones they
+    cover are dropped.  On Postgres the cell index also carries ``value`` so
+    snapshots are served by index-only scans.
+    """
+    cells = _index_names(conn, "financecell")
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("DROP INDEX IF EXISTS ux_financecell_cell"))
+        _index(models.FinanceCell, "ux_financecell_cell").create(conn)
+    if "ix_financecell_year_revision" not in cells:
+        _index(models.FinanceCell, "ix_financecell_year_revision").create(conn)
+    conn.execute(text("DROP INDEX IF EXISTS ix_financecell_year"))
+
+    if "ux_financerow_row" not in _index_names(conn, "financerow"):
+        _dedupe(conn, models.FinanceRow, "year", "row")
+        _index(models.FinanceRow, "ux_financerow_row").create(conn)
+    conn.execute(text("DROP INDEX IF EXISTS ix_financerow_year"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_financerow_row"))
+
+
+def _0003_month_summary(conn: Connection) -> None:
+    """Fill the new ``financemonthsummary`` table from the existing cells."""
+    from . import summary
+
+    summary.rebuild(conn)
+
+
+def _0004_actionlog_indexes(conn: Connection) -> None:
+    """(action, ts) and (ts) on the audit log for the reader and retention."""
+    existing = _index_names(conn, "actionlog")
+    for name in ("ix_actionlog_action_ts", "ix_actionlog_ts"):
+        if name not in existing:
+            _index(models.ActionLog, name).create(conn)
+
+
+def _0005_current_settings(conn: Connection) -> None:
+    """
+    Newest ``Setting`` per group into ``currentsetting``, history trimmed to
+    ``SETTINGS_HISTORY`` per group, (group, ts) index instead of (group).
+    """
+    from . import settings
+
+    h = models.Setting.__table__
+    newest = (
+        select(h.c.group, h.c.user_id, h.c.data, h.c.ts)
+        .where(h.c.id.in_(select(func.max(h.c.id)).group_by(h.c.group)))
+    )
+    conn.execute(delete(models.CurrentSetting.__table__))
+    conn.execute(models.CurrentSetting.__table__.insert().from_select(
+        ["group", "user_id", "data", "ts"], newest
+    ))
+    for group in conn.execute(select(h.c.group).distinct()).scalars().all():
+        settings.prune_history(conn, group)
+
+    conn.execute(text("DROP INDEX IF EXISTS ix_setting_group"))
+    if "ix_setting_group_ts" not in _index_names(conn, "setting"):
+        _index(models.Setting, "ix_setting_group_ts").create(conn)
+
+
+MIGRATIONS: List[Tuple[int, Callable[[Connection], None]]] = [
+    (1, _0001_cell_unique_index),
+    (2, _0002_composite_indexes),
+    (3, _0003_month_summary),
+    (4, _0004_actionlog_indexes),
+    (5, _0005_current_settings),
+]
+HEAD = MIGRATIONS[-1][0]
+
+
+# ───────────────────────── runner ─────────────────────────
+def current_version(conn: Connection) -> int:
+    return conn.execute(select(schema_version.c.version)).scalar_one()
+
+
+def migrate(conn: Connection) -> int:
+    """Bring the schema to ``HEAD`` inside the caller's transaction."""
+    fresh = not inspect(conn).has_table(models.FinanceCell.__tablename__)
+    SQLModel.metadata.create_all(conn)
+    schema_version.create(conn, checkfirst=True)
+
+    version = conn.execute(select(schema_version.c.version)).scalar()
+    if version is None:
+        version = HEAD if fresh else 0
+        conn.execute(schema_version.insert().values(version=version))
+
+    for step, apply in MIGRATIONS:
+        if step > version:
+            apply(conn)
+            conn.execute(schema_version.update().values(version=step))
+            log.info("applied migration %d (%s)", step, apply.__name__.lstrip("_"))
+            version = step
+    return version
+
+
+if __name__ == "__main__":                  # deploy step: python -m app.migrations
+    from .database import migrate_db
+
+    logging.basicConfig(level=logging.INFO, format="[migrate] %(message)s")
+    log.info("schema at version %d", migrate_db())
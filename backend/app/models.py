@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON as SA_JSON
+from sqlalchemy import Column, Index, JSON as SA_JSON
 
 
 class User(SQLModel, table=True):
@@ -17,9 +17,19 @@ class User(SQLModel, table=True):
 #  Finance-table cells
 # ────────────────────────────────────────────────────────────────
 class FinanceCell(SQLModel, table=True):
+    # one value per (year, row, col, revision) – target of the bulk upsert and
+    # of the snapshot window query; (year, revision) serves the revision bounds
+    __table_args__ = (
+        Index(
+            "ux_financecell_cell", "year", "row", "col", "revision",
+            unique=True, postgresql_include=["value"],
+        ),
+        Index("ix_financecell_year_revision", "year", "revision"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
-    year: int = Field(index=True)
+    year: int
     row: int
     col: int
     value: float
@@ -31,10 +41,12 @@ class FinanceCell(SQLModel, table=True):
 #  Row meta-data – one per logical row / year
 # ────────────────────────────────────────────────────────────────
 class FinanceRow(SQLModel, table=True):
+    __table_args__ = (Index("ux_financerow_row", "year", "row", unique=True),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
-    year: int = Field(index=True)
-    row: int = Field(index=True)          # immutable row-id
+    year: int
+    row: int                              # immutable row-id
     position: int = 0
     description: str
     deleted: bool = False
@@ -43,10 +55,28 @@ class FinanceRow(SQLModel, table=True):
     ts: datetime = Field(default_factory=datetime.utcnow)
 
 
+# ────────────────────────────────────────────────────────────────
+#  Monthly totals – maintained by summary.py on every write
+# ────────────────────────────────────────────────────────────────
+class FinanceMonthSummary(SQLModel, table=True):
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True)  # 0 = Jan … 11 = Dec
+    income: float = 0.0
+    expense: float = 0.0                  # incl. irregular rows
+    irregular: float = 0.0
+
+
 # ────────────────────────────────────────────────────────────────
 #  Action log
 # ────────────────────────────────────────────────────────────────
 class ActionLog(SQLModel, table=True):
+    # (action, ts) serves the filtered /audit reader, (ts) retention pruning
+    # and the unfiltered reader
+    __table_args__ = (
+        Index("ix_actionlog_action_ts", "action", "ts"),
+        Index("ix_actionlog_ts", "ts"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
     action: str
@@ -57,9 +87,20 @@ class ActionLog(SQLModel, table=True):
 # ────────────────────────────────────────────────────────────────
 #  Persisted UI settings blobs
 # ────────────────────────────────────────────────────────────────
+class CurrentSetting(SQLModel, table=True):
+    # newest blob per group, upserted in place – reads are a PK lookup
+    group: str = Field(primary_key=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    data: Dict[str, Any] = Field(sa_column=Column(SA_JSON))
+    ts: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Setting(SQLModel, table=True):
+    # bounded history (SETTINGS_HISTORY entries per group)
+    __table_args__ = (Index("ix_setting_group_ts", "group", "ts"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
-    group: str = Field(index=True)
+    group: str
     data: Dict[str, Any] = Field(sa_column=Column(SA_JSON))
     ts: datetime = Field(default_factory=datetime.utcnow)
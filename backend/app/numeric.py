@@ -0,0 +1,20 @@
+"""Small NumPy helpers shared by the vectorised calculators."""
+import numpy as np
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to cents exactly like the built-in ``round(x, 2)``.
+
+    ``np.round`` scales by 100 before rounding, which can tip values that sit
+    right on a half cent to the other side.  Those few ties are re-rounded
+    with Python's correctly rounded ``round`` so batch and scalar results
+    agree to the cent.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, 2)
+    scaled = values * 100
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if tie.any():
+        out[tie] = [round(v, 2) for v in values[tie].tolist()]
+    return out
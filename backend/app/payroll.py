@@ -1,7 +1,9 @@
 
 """Payroll calculator for German net salary estimation (2025)."""
-from dataclasses import dataclass, asdict
-from typing import Dict, Tuple
+import math
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 # ---------------- 1  Konstanten ----------------
 BASIC_ALLOWANCE = 12_096
@@ -42,7 +44,7 @@ def soli(tax: float, married: bool=False) -> float:
     return min(0.19945 * diff, SOLI_RATE * tax) if diff < 1_000 else SOLI_RATE * tax
 
 # --------------- 3  Datenklassen -------------
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PayrollInputData:
     gross: float
     period: str = "monthly"          # 'monthly' | 'yearly'
@@ -53,7 +55,7 @@ class PayrollInputData:
     childless: bool = True
     additional_kv: float = KV_AVG_ADD
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PayrollResultData:
     net: float
     income_tax: float
@@ -68,19 +70,31 @@ class PayrollResultData:
     unemployment_employee: float
     unemployment_employer: float
     def asdict(self) -> Dict:
-        return asdict(self)
+        # flat scalars: a shallow dict, not dataclasses.asdict's deep copy
+        return {k: getattr(self, k) for k in self.__slots__}
 
 # --------------- 4  Hauptfunktion -----------
-def gross_to_net(data: PayrollInputData) -> PayrollResultData:
-    m_gross = data.gross if data.period == "monthly" else data.gross / 12
+Profile = Tuple[int, bool, str, bool, bool, float]
+
+
+def _profile(data: PayrollInputData) -> Profile:
+    """Everything except gross/period – the key of the inverse segment table."""
+    return (data.tax_class, data.married, data.federal_state, data.church,
+            data.childless, data.additional_kv)
+
+
+def _deductions(m_gross: float, tax_class: int, married: bool,
+                federal_state: str, church: bool, childless: bool,
+                additional_kv: float) -> Tuple[float, ...]:
+    """Unrounded monthly SV shares (employee/employer), annual tax, soli, KiSt."""
     a_gross = m_gross * 12
 
     # Sozialversicherung
-    kv_rate = KV_GENERAL + data.additional_kv
+    kv_rate = KV_GENERAL + additional_kv
     kv_emp = kv_ag = min(m_gross, BBG_KV_PV) * kv_rate / 2
 
     pv_emp = pv_ag = min(m_gross, BBG_KV_PV) * PV_BASE / 2
-    if data.childless:                              # Zuschlag mit BBG-Deckel!
+    if childless:                                   # Zuschlag mit BBG-Deckel!
         pv_emp += min(m_gross, BBG_KV_PV) * PV_CHILDLESS_SURCH
 
     rv_emp = rv_ag = min(m_gross, BBG_RV_AV) * RV_RATE / 2
@@ -92,14 +106,31 @@ def gross_to_net(data: PayrollInputData) -> PayrollResultData:
     # Steuer
     zvE = a_gross - vsp - WK_PAUSCHALE - SONDERAUSG_PAUS
     tax_y = income_tax(max(0, zvE))
-    if   data.tax_class == 3: tax_y = 2 * income_tax(zvE / 2)
-    elif data.tax_class == 5: tax_y *= 1.20
-    elif data.tax_class == 6: tax_y *= 1.30
+    if   tax_class == 3: tax_y = 2 * income_tax(zvE / 2)
+    elif tax_class == 5: tax_y *= 1.20
+    elif tax_class == 6: tax_y *= 1.30
 
     tax_m  = tax_y / 12
-    soli_m = soli(tax_y, data.married) / 12
-    kist_m = tax_m * KIST_BY_STATE[data.federal_state] if data.church else 0.0
+    soli_m = soli(tax_y, married) / 12
+    kist_m = tax_m * KIST_BY_STATE[federal_state] if church else 0.0
+
+    return (kv_emp, kv_ag, pv_emp, pv_ag, rv_emp, rv_ag, av_emp, av_ag,
+            tax_y, soli_m, kist_m)
+
 
+def _net_monthly(m_gross: float, profile: Profile) -> float:
+    kv_emp, _, pv_emp, _, rv_emp, _, av_emp, _, tax_y, soli_m, kist_m = \
+        _deductions(m_gross, *profile)
+    tax_m = tax_y / 12
+    return m_gross - (tax_m + soli_m + kist_m + kv_emp + pv_emp + rv_emp + av_emp)
+
+
+def gross_to_net(data: PayrollInputData) -> PayrollResultData:
+    m_gross = data.gross if data.period == "monthly" else data.gross / 12
+    (kv_emp, kv_ag, pv_emp, pv_ag, rv_emp, rv_ag, av_emp, av_ag,
+     tax_y, soli_m, kist_m) = _deductions(m_gross, *_profile(data))
+
+    tax_m = tax_y / 12
     deductions = tax_m + soli_m + kist_m + kv_emp + pv_emp + rv_emp + av_emp
     net_m = m_gross - deductions
     net   = net_m if data.period == "monthly" else net_m * 12
@@ -119,12 +150,145 @@ def gross_to_net(data: PayrollInputData) -> PayrollResultData:
         unemployment_employer=round(av_ag, 2),
     )
 
+def sonstiger_bezug(jahreslohn: float, bezug: float, profile: Profile) -> Tuple[float, float, float]:
+    """
+    Lohnsteuer, Soli and KiSt on a one-off payment (§39b Abs. 3 EStG): the
+    difference of the annual amounts with and without the payment, instead
+    of annualising the payment as if it were paid every month.
+    """
+    *_, tax0, soli0, kist0 = _deductions(jahreslohn / 12, *profile)
+    *_, tax1, soli1, kist1 = _deductions((jahreslohn + bezug) / 12, *profile)
+    return tax1 - tax0, 12 * (soli1 - soli0), 12 * (kist1 - kist0)
+
+# --------------- 5  Umkehrfunktion -----------
+# Between the kinks of the tariff (SV caps, VSP cap, tax zones, soli phase-in)
+# the monthly net is a quadratic polynomial in the monthly gross.  We locate
+# those kinks analytically once per parameter profile, store each segment's
+# polynomial and invert it in closed form.
+
+def _income_tax_inverse(tax: float) -> float:
+    """Smallest zvE with ``income_tax(zvE) == tax``."""
+    if tax <= 0:
+        return BASIC_ALLOWANCE
+    if tax <= income_tax(ZONE1_END):
+        y = (-1_400 + math.sqrt(1_400 ** 2 + 4 * 932.3 * tax)) / (2 * 932.3)
+        return BASIC_ALLOWANCE + 10_000 * y
+    if tax <= income_tax(ZONE2_END):
+        z = (-2_397 + math.sqrt(2_397 ** 2 + 4 * 176.64 * (tax - 1_015.13))) / (2 * 176.64)
+        return ZONE1_END + 10_000 * z
+    if tax <= income_tax(ZONE3_END):
+        return (tax + 10_911.92) / 0.42
+    return (tax + 19_246.67) / 0.45
+
+
+def _zve_pieces(childless: bool, additional_kv: float) -> List[Tuple[float, float, float, float]]:
+    """zvE(m) = p*m + q on ``[lo, hi)`` as ``(lo, hi, p, q)`` tuples."""
+    ck = (KV_GENERAL + additional_kv) / 2 + PV_BASE / 2
+    if childless:
+        ck += PV_CHILDLESS_SURCH
+    cr = (RV_RATE + AV_RATE) / 2
+    # employee SV per month: slope * m + icpt
+    sv = [(0.0, BBG_KV_PV, ck + cr, 0.0),
+          (BBG_KV_PV, BBG_RV_AV, cr, BBG_KV_PV * ck),
+          (BBG_RV_AV, math.inf, 0.0, BBG_KV_PV * ck + BBG_RV_AV * cr)]
+    const = WK_PAUSCHALE + SONDERAUSG_PAUS
+    pieces = []
+    for lo, hi, slope, icpt in sv:
+        cuts = [lo, hi]
+        if slope != VSP_MAX_RATE:                   # VSP cap switches sides
+            cross = icpt / (VSP_MAX_RATE - slope)
+            if lo < cross < hi:
+                cuts.insert(1, cross)
+        for a, b in zip(cuts, cuts[1:]):
+            mid = a + 1 if b == math.inf else (a + b) / 2
+            if slope * mid + icpt < VSP_MAX_RATE * mid:
+                pieces.append((a, b, 12 * (1 - slope), -12 * icpt - const))
+            else:
+                pieces.append((a, b, 12 * (1 - VSP_MAX_RATE), -const))
+    return pieces
+
+
+def _breakpoints(profile: Profile) -> List[float]:
+    tax_class, married, _, _, childless, additional_kv = profile
+    mult, div = {3: (2, 2), 5: (1.20, 1), 6: (1.30, 1)}.get(tax_class, (1, 1))
+    free = SOLI_FREE_MARRIED if married else SOLI_FREE_SINGLE
+
+    zve_edges = [div * e for e in (BASIC_ALLOWANCE, ZONE1_END, ZONE2_END, ZONE3_END)]
+    for tax in (free, free + 1_000, 0.19945 * free / (0.19945 - SOLI_RATE)):
+        zve_edges.append(div * _income_tax_inverse(tax / mult))
+
+    pieces = _zve_pieces(childless, additional_kv)
+    points = {0.0} | {p[0] for p in pieces}
+    for lo, hi, p, q in pieces:
+        points.update(m for m in ((e - q) / p for e in zve_edges) if lo < m < hi)
+    return sorted(points)
+
+
+@lru_cache(maxsize=256)
+def _segments(profile: Profile) -> Tuple[Tuple[float, ...], ...]:
+    """
+    ``(lo, hi, x, net, slope, curv, exact)`` per segment, so that on
+    ``[lo, hi]`` ``net(m) = net + slope * (m - x) + curv * (m - x) ** 2``;
+    *exact* records that two further points confirmed the polynomial.
+    """
+    points = _breakpoints(profile)
+    bounds = [(a, b) for a, b in zip(points, points[1:] + [math.inf]) if b - a > 1e-6]
+    segments = []
+    for lo, hi in bounds:
+        if hi == math.inf:
+            x, h = lo + 2_000, 1_000.0
+        else:
+            x, h = (lo + hi) / 2, (hi - lo) / 4
+        n0, n1, n2 = (_net_monthly(m, profile) for m in (x - h, x, x + h))
+        slope, curv = (n2 - n0) / (2 * h), (n2 - 2 * n1 + n0) / (2 * h * h)
+        exact = all(
+            abs(n1 + (m - x) * (slope + curv * (m - x)) - _net_monthly(m, profile)) < 1e-7
+            for m in (x - 1.5 * h, x + 0.5 * h)
+        )
+        segments.append((lo, hi, x, n1, slope, curv, exact))
+    return tuple(segments)
+
+
+def _solve_monthly(target: float, profile: Profile) -> float:
+    """Smallest monthly gross whose unrounded net reaches *target*."""
+    if target <= 0:
+        return 0.0
+    for lo, hi, x, n1, slope, curv, exact in _segments(profile):
+        if hi == math.inf or n1 + (hi - x) * (slope + curv * (hi - x)) >= target:
+            break
+    if n1 + (lo - x) * (slope + curv * (lo - x)) >= target:
+        return lo                                   # net jumps across the kink
+
+    c0 = n1 - target
+    disc = slope * slope - 4 * curv * c0
+    m = x - 2 * c0 / (slope + math.sqrt(disc)) if disc >= 0 else lo
+    if exact and disc >= 0:
+        return m
+
+    # Newton fallback – only for segments where the closed form is not exact
+    for _ in range(20):
+        resid = _net_monthly(m, profile) - target
+        if abs(resid) < 1e-7:
+            break
+        m = min(max(m - resid / (slope + 2 * curv * (m - x)), lo), hi)
+    return m
+
+
 def net_to_gross(target_net: float, **kwargs) -> Tuple[float, PayrollResultData]:
-    lo, hi = 0.0, target_net * 3
-    result = None
-    for _ in range(25):
-        mid = (lo + hi) / 2
-        result = gross_to_net(PayrollInputData(gross=mid, **kwargs))
-        hi, lo = (mid, lo) if result.net > target_net else (hi, mid)
-    return round(hi, 2), result
+    """
+    Inverse of :func:`gross_to_net`: the smallest gross (in cents) whose net
+    reaches *target_net*, together with the result computed for that gross.
+    The reported net is rounded to cents, so the unrounded net only has to
+    reach ``target_net - 0.005``; on a warm segment table that costs one
+    :func:`gross_to_net` evaluation.
+    """
+    data = PayrollInputData(gross=0.0, **kwargs)
+    scale = 1 if data.period == "monthly" else 12
+    m_gross = _solve_monthly((target_net - 0.005) / scale, _profile(data))
 
+    gross = math.ceil(round(m_gross * scale * 100, 6)) / 100
+    result = gross_to_net(replace(data, gross=gross))
+    while result.net < target_net:                  # float noise at the cent edge
+        gross = round(gross + 0.01, 2)
+        result = gross_to_net(replace(data, gross=gross))
+    return gross, result
@@ -0,0 +1,197 @@
+"""
+Opt-in per-request SQL profiler.
+
+    SQL_PROFILE=1          profile every request
+    SQL_PROFILE=header     profile requests sent with ``X-SQL-Profile: 1``
+
+Every statement a profiled request executes – on either engine, from async
+handlers, threadpool handlers and ``run_sync`` alike – is recorded with its
+duration, plus the commits and rollbacks.  The response carries the summary
+in a ``Server-Timing`` header (visible in the browser's network panel)::
+
+    Server-Timing: db;dur=12.4;desc="9 statements", commit;desc="2",
+                   repeat;desc="5", total;dur=30.1
+
+``repeat`` counts executions of a statement text already seen in the same
+request – the N+1 signature.  A request slower than ``SLOW_REQUEST_MS``, or
+repeating one statement ``SQL_PROFILE_REPEAT`` times, is logged with its
+statements grouped by text; statements slower than ``SLOW_QUERY_MS`` get
+their ``EXPLAIN`` plan captured right after they ran, on the same
+connection and with the same parameters.
+
+Off by default: the engine events are only attached when enabled.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import Counter as Tally
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0").lower()         # "0", "1" or "header"
+SQL_PROFILE_ENABLED = SQL_PROFILE in ("1", "header")
+PROFILE_HEADER = b"x-sql-profile"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SQL_PROFILE_REPEAT = int(os.getenv("SQL_PROFILE_REPEAT", "10"))
+PARAMS_SHOWN = 200                          # characters of bound parameters kept per statement
+
+EXPLAIN_PREFIX = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+@dataclass
+class Statement:
+    sql: str
+    params: str
+    ms: float
+    rows: int
+    many: bool
+    plan: Optional[List[str]] = None
+
+
+@dataclass
+class Profile:
+    method: str
+    path: str
+    start: float = field(default_factory=time.perf_counter)
+    statements: List[Statement] = field(default_factory=list)
+    commits: int = 0
+    rollbacks: int = 0
+    explained: set = field(default_factory=set)
+
+    @property
+    def db_ms(self) -> float:
+        return sum(st.ms for st in self.statements)
+
+    def repeats(self) -> List[Tuple[str, int]]:
+        """Statement texts run more than once, most frequent first."""
+        tally = Tally(st.sql for st in self.statements)
+        return [(sql, n) for sql, n in tally.most_common() if n > 1]
+
+    def server_timing(self, total_ms: float) -> str:
+        repeated = sum(n - 1 for _, n in self.repeats())
+        return (
+            f'db;dur={self.db_ms:.2f};desc="{len(self.statements)} statements", '
+            f'commit;desc="{self.commits}", repeat;desc="{repeated}", total;dur={total_ms:.2f}'
+        )
+
+    def report(self, total_ms: float) -> str:
+        lines = [
+            f"{self.method} {self.path}: {total_ms:.1f} ms total, "
+            f"{len(self.statements)} statements in {self.db_ms:.1f} ms, "
+            f"{self.commits} commits, {self.rollbacks} rollbacks"
+        ]
+        grouped: Dict[str, List[Statement]] = {}
+        for st in self.statements:
+            grouped.setdefault(st.sql, []).append(st)
+        for sql, runs in sorted(grouped.items(), key=lambda kv: -sum(s.ms for s in kv[1])):
+            ms = sum(s.ms for s in runs)
+            lines.append(f"  {len(runs):>4}× {ms:9.2f} ms  {' '.join(sql.split())}")
+            lines.append(f"         params: {runs[0].params}")
+            plan = next((s.plan for s in runs if s.plan), None)
+            lines.extend(f"         plan: {p}" for p in plan or ())
+        return "\n".join(lines)
+
+
+current: ContextVar[Optional[Profile]] = ContextVar("sql_profile", default=None)
+
+
+# ───────────────────────── engine events ─────────────────────────
+def _explain(conn, statement: str, parameters) -> List[str]:
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None:
+        return []
+    cursor = conn.connection.cursor()       # fresh DBAPI cursor, no SQLAlchemy events
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" | ".join(str(c) for c in row) for row in cursor.fetchall()]
+    except Exception as exc:                # e.g. a server-side cursor still open
+        return [f"EXPLAIN failed: {type(exc).__name__}: {exc}"]
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine) -> None:
+    """Record statements and commits of profiled requests on one (sync) engine."""
+    if not SQL_PROFILE_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if current.get() is not None:
+            context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = current.get()
+        start = getattr(context, "_profile_start", None)
+        if profile is None or start is None:
+            return
+        ms = 1000 * (time.perf_counter() - start)
+        st = Statement(statement, repr(parameters)[:PARAMS_SHOWN], ms,
+                       cursor.rowcount if cursor is not None else -1, executemany)
+        if (ms >= SLOW_QUERY_MS and not executemany and statement not in profile.explained
+                and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE"))):
+            profile.explained.add(statement)
+            st.plan = _explain(conn, statement, parameters)
+        profile.statements.append(st)
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        profile = current.get()
+        if profile is not None:
+            profile.commits += 1
+
+    @event.listens_for(engine, "rollback")
+    def _rollback(conn):
+        profile = current.get()
+        if profile is not None:
+            profile.rollbacks += 1
+
+
+# ───────────────────────── middleware ─────────────────────────
+class ProfilerMiddleware:
+    """Starts a :class:`Profile` per selected request and reports it."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    def _selected(self, scope) -> bool:
+        if SQL_PROFILE == "1":
+            return True
+        return any(k == PROFILE_HEADER and v.strip() in (b"1", b"true")
+                   for k, v in scope.get("headers", ()))
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+        profile = Profile(scope["method"], scope["path"])
+        token = current.set(profile)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = 1000 * (time.perf_counter() - profile.start)
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", profile.server_timing(total_ms).encode()))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current.reset(token)
+            total_ms = 1000 * (time.perf_counter() - profile.start)
+            repeats = profile.repeats()
+            if total_ms >= SLOW_REQUEST_MS:
+                log.warning("slow request – %s", profile.report(total_ms))
+            elif repeats and repeats[0][1] >= SQL_PROFILE_REPEAT:
+                log.warning("statement repeated %d× (N+1?) – %s",
+                            repeats[0][1], profile.report(total_ms))
@@ -0,0 +1,27 @@
+"""
+Direct JSON responses for the hot calculator routes.
+
+Returning a :class:`FastJSONResponse` bypasses FastAPI's response-model
+validation and ``jsonable_encoder``: orjson writes the (slotted) result
+dataclasses, dicts and NumPy arrays straight to bytes.  Routes keep their
+``response_model`` for the OpenAPI schema – the shapes are unchanged.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=OPTIONS)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
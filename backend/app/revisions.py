@@ -0,0 +1,161 @@
+"""
+Delta revision storage for the finance table.
+
+A ``FinanceCell`` row means "this cell was set to *value* in *revision*".
+Revision *r* of a year is therefore the newest value per (row, col) among
+the rows with ``revision <= r``; a new revision only stores the cells that
+changed in it.  Once a revision falls out of the configured undo depth the
+values it shadows are deleted, so storage does not grow with every
+undo/redo step.
+"""
+from __future__ import annotations
+
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, literal, select, tuple_
+from sqlmodel import Session
+
+from . import models
+
+UNDO_DEPTH = int(os.getenv("FINANCE_UNDO_DEPTH", "10"))
+
+_t = models.FinanceCell.__table__
+
+
+def bounds_query(year: int):
+    # two scalar subqueries: each is a single (year, revision) index probe,
+    # whereas min() and max() in one aggregate scan the whole year
+    return select(*(
+        select(agg(_t.c.revision)).where(_t.c.year == year).scalar_subquery()
+        for agg in (func.min, func.max)
+    ))
+
+
+def revision_bounds(s: Session, year: int) -> Tuple[int, int]:
+    """
+    (oldest reconstructable, latest) revision of *year* – (0, 0) if empty.
+    Undo reaches back ``UNDO_DEPTH`` steps; anything older is (being)
+    folded into the base and no longer reconstructable.
+    """
+    lo, hi = s.execute(bounds_query(year)).one()
+    lo, hi = lo or 0, hi or 0
+    return max(lo, hi - UNDO_DEPTH), hi
+
+
+def snapshot_query(year: int, revision: Optional[int] = None):
+    """
+    Latest value per (row, col) with ``revision <= target`` plus the target
+    itself – one indexed query.  Without *revision* the target is the
+    newest revision of the year, resolved in the same statement.
+    """
+    cond = [_t.c.year == year]
+    if revision is None:
+        target = (
+            select(func.max(_t.c.revision)).where(_t.c.year == year).scalar_subquery()
+        )
+    else:
+        target = literal(revision)
+        cond.append(_t.c.revision <= revision)
+    ranked = (
+        select(
+            _t.c.row,
+            _t.c.col,
+            _t.c.value,
+            func.row_number()
+            .over(partition_by=(_t.c.row, _t.c.col), order_by=_t.c.revision.desc())
+            .label("rn"),
+        )
+        .where(*cond)
+        .subquery()
+    )
+    return select(
+        ranked.c.row, ranked.c.col, ranked.c.value, target.label("revision")
+    ).where(ranked.c.rn == 1)
+
+
+def _latest_in_range(year_from: int, year_to: int):
+    return (
+        select(
+            _t.c.year,
+            _t.c.row,
+            _t.c.col,
+            _t.c.value,
+            func.max(_t.c.revision).over(partition_by=_t.c.year).label("revision"),
+            func.row_number()
+            .over(partition_by=(_t.c.year, _t.c.row, _t.c.col), order_by=_t.c.revision.desc())
+            .label("rn"),
+        )
+        .where(_t.c.year.between(year_from, year_to))
+        .subquery()
+    )
+
+
+def range_query(year_from: int, year_to: int):
+    """
+    Latest cells of every year in ``year_from … year_to`` in one statement,
+    each tagged with its year's newest revision, ordered by (year, row, col).
+    """
+    latest = _latest_in_range(year_from, year_to)
+    return (
+        select(latest.c.year, latest.c.row, latest.c.col, latest.c.value, latest.c.revision)
+        .where(latest.c.rn == 1)
+        .order_by(latest.c.year, latest.c.row, latest.c.col)
+    )
+
+
+def range_totals_query(year_from: int, year_to: int, months: int = 12):
+    """Like :func:`range_query`, but summed per (year, row) over the month columns."""
+    latest = _latest_in_range(year_from, year_to)
+    return (
+        select(
+            latest.c.year,
+            latest.c.row,
+            func.sum(latest.c.value).label("total"),
+            func.max(latest.c.revision).label("revision"),
+        )
+        .where(latest.c.rn == 1, latest.c.col < months)
+        .group_by(latest.c.year, latest.c.row)
+        .order_by(latest.c.year, latest.c.row)
+    )
+
+
+def snapshot(s: Session, year: int, revision: Optional[int] = None) -> List[dict]:
+    """Cells of *year* as of *revision* (default: latest), tagged with that revision."""
+    return [
+        {"year": year, "row": row, "col": col, "value": value, "revision": rev}
+        for row, col, value, rev in s.execute(snapshot_query(year, revision))
+    ]
+
+
+def fold_query(year: int, revision: int):
+    """
+    Delete the older values of every cell *revision* changed – afterwards
+    *revision* itself is the base for those cells.  Both sides are index
+    probes (the ids go through the covering (year, revision) index), so the
+    cost is the size of that one revision, not of the year.
+    """
+    changed = select(_t.c.row, _t.c.col).where(
+        _t.c.id.in_(select(_t.c.id).where(_t.c.year == year, _t.c.revision == revision))
+    )
+    return delete(_t).where(
+        _t.c.year == year,
+        _t.c.revision < revision,
+        tuple_(_t.c.row, _t.c.col).in_(changed),
+    )
+
+
+def compact(s: Session, year: int) -> int:
+    """
+    Fold the revision that just dropped to the undo floor into the base.
+
+    Called whenever a revision is opened, so each revision is folded once
+    as it leaves the window; surviving base rows keep their revision tag.
+    A backlog left behind (e.g. a larger depth before) is swept by the
+    ``compact_revisions`` job.  Returns the number of deleted rows; nothing
+    is committed here.
+    """
+    floor, _ = revision_bounds(s, year)
+    if floor <= 0:
+        return 0
+    return s.execute(fold_query(year, floor)).rowcount
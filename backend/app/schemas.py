@@ -1,4 +1,5 @@
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Union
 from pydantic import BaseModel
 
 
@@ -20,6 +21,16 @@ class RowMeta(BaseModel):
     income: bool = False
     irregular: bool = False   # NEW
 
+
+class FinanceYear(BaseModel):
+    """One year of ``/finance/range``: cells, or per-row totals if aggregated."""
+    year: int
+    revision: int
+    rows: Dict[int, RowMeta]
+    cells: Optional[List[Cell]] = None
+    totals: Optional[Dict[int, float]] = None     # row → Jan … Dez sum
+
+
 # ───────────── payroll / tarif DTOs (unchanged) ─────────────
 class PayrollInput(BaseModel):
     gross: float
@@ -47,6 +58,72 @@ class PayrollResult(BaseModel):
     unemployment_employer: float
 
 
+class NetToGrossInput(BaseModel):
+    net: float
+    period: str = "monthly"
+    tax_class: int = 1
+    married: bool = False
+    federal_state: str = "NW"
+    church: bool = False
+    childless: bool = True
+    additional_kv: float = 0.025
+
+
+class NetToGrossResult(BaseModel):
+    gross: float
+    result: PayrollResult
+
+
+class NetCurveInput(BaseModel):
+    gross_from: float = 0.0
+    gross_to: float
+    step: float = 10.0
+    period: str = "monthly"
+    tax_class: int = 1
+    married: bool = False
+    federal_state: str = "NW"
+    church: bool = False
+    childless: bool = True
+    additional_kv: float = 0.025
+
+
+class NetCurveResult(BaseModel):
+    gross: List[float]
+    net: List[float]
+    deductions: List[float]
+    marginal_rate: List[float]
+    average_rate: List[float]
+    breakpoints: List[float]
+
+
+# ───────────── columnar DTOs for /payroll/gross-to-net/batch ─────────────
+class PayrollBatchInput(BaseModel):
+    """One list entry per employee; scalars apply to every row."""
+    gross: List[float]
+    period: Union[str, List[str]] = "monthly"
+    tax_class: Union[int, List[int]] = 1
+    married: Union[bool, List[bool]] = False
+    federal_state: Union[str, List[str]] = "NW"
+    church: Union[bool, List[bool]] = False
+    childless: Union[bool, List[bool]] = True
+    additional_kv: Union[float, List[float]] = 0.025
+
+
+class PayrollBatchResult(BaseModel):
+    net: List[float]
+    income_tax: List[float]
+    solidarity: List[float]
+    church_tax: List[float]
+    health_employee: List[float]
+    health_employer: List[float]
+    care_employee: List[float]
+    care_employer: List[float]
+    pension_employee: List[float]
+    pension_employer: List[float]
+    unemployment_employee: List[float]
+    unemployment_employer: List[float]
+
+
 class TarifInput(BaseModel):
     entgeltgruppe: str
     stufe: str
@@ -75,22 +152,12 @@ class TarifResult(BaseModel):
     jahresentgelt: float
 
 
-# ───────────── finance-table persistence DTOs ─────────────
-class Cell(BaseModel):
-    year: int
-    row: int
-    col: int
-    value: float
-    revision: int = 0
-
-
-class RowMeta(BaseModel):
-    year: int
-    row: int
-    position: int = 0          # NEW
-    description: str
-    deleted: bool = False
-    income: bool = False
+class TarifMatrixRow(TarifResult):
+    entgeltgruppe: str
+    stufe: str
+    wochenstunden: float
+    betriebszugehoerigkeit_monate: int
+    monate: Optional[List[float]] = None      # Januar … Dezember
 
 
 # ───────────── extra DTO for /tarif/breakdown ─────────────
@@ -100,5 +167,90 @@ class MonthlyBreakdown(BaseModel):
     Bestandteile: str
 
 
+# ───────────── combined tarif → net pipeline (/tarif/net) ─────────────
+class PayrollProfile(BaseModel):
+    tax_class: int = 1
+    married: bool = False
+    federal_state: str = "NW"
+    church: bool = False
+    childless: bool = True
+    additional_kv: float = 0.025
+
+
+class TarifNetInput(BaseModel):
+    tarif: TarifInput
+    payroll: PayrollProfile = PayrollProfile()
+
+
+class MonthlyNet(MonthlyBreakdown):
+    Lohnsteuer: float
+    Solidaritaet: float
+    Kirchensteuer: float
+    Sozialversicherung: float
+    Netto: float
+
+
+class TarifNetResult(BaseModel):
+    monate: List[MonthlyNet]
+    jahr: Dict[str, float]
+
+
+# ───────────── monthly totals (/finance/summary) ─────────────
+class MonthSummary(BaseModel):
+    month: int                                 # 0 = Jan … 11 = Dec
+    income: float
+    expense: float                             # incl. irregular
+    irregular: float
+    leftover: float                            # income − expense
+    carry: float                               # running, incl. carry_in
+
+
+class YearSummary(BaseModel):
+    year: int
+    carry_in: float                            # previous year's leftover
+    leftover: float
+    months: List[MonthSummary]
+
+
+# ───────────── background jobs (/jobs) ─────────────
+class JobRequest(BaseModel):
+    kind: str                                  # reset_year | compact_revisions | prune_audit
+    params: Dict[str, Any] = {}
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str                                # queued | running | done | failed | cancelled
+    done: int
+    total: Optional[int] = None
+    error: Optional[str] = None
+    created: datetime
+    started: Optional[datetime] = None
+    finished: Optional[datetime] = None
+
+
+# ───────────── auth (/auth) ─────────────
+class LoginInput(BaseModel):
+    email: str
+    password: str
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+
+class Me(BaseModel):
+    id: int
+    email: str
+
+
+class PasswordChange(BaseModel):
+    password: str
+    new_password: str
+
+
 # ───────────── shorthand alias ─────────────
 Settings = Dict[str, Any]
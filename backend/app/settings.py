@@ -0,0 +1,135 @@
+"""
+UI settings blobs: one current row per group plus a bounded history.
+
+``CurrentSetting`` is upserted in place, so a read is a primary-key lookup –
+and usually not even that: reads go through a write-through in-process
+cache that is filled on first read and replaced after each committed save.
+Every save also appends to ``Setting``, which keeps the newest
+``SETTINGS_HISTORY`` entries per group (0 = no history).  Saves run the
+cache's ``on_invalidate`` hooks, through which :mod:`live` drops the group
+in the other workers (``LIVE_BACKEND=postgres`` with more than one worker).
+"""
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from . import models
+from .database import INSERT_BY_DIALECT
+
+SETTINGS_HISTORY = int(os.getenv("SETTINGS_HISTORY", "20"))
+
+_current = models.CurrentSetting.__table__
+_history = models.Setting.__table__
+
+Data = Dict[str, Any]
+
+
+class SettingsCache:
+    """group → data; ``None`` values are never stored, misses read the DB."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Data] = {}
+        self._generations: Dict[str, int] = {}   # bumped by every put/drop
+        self._base = 0                              # generation of untouched groups
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.on_invalidate: List[Callable[[str], None]] = []
+
+    def get(self, group: str) -> Optional[Data]:
+        with self._lock:
+            data = self._data.get(group)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return data
+
+    def generation(self, group: str) -> int:
+        with self._lock:
+            return self._generations.get(group, self._base)
+
+    def put(self, group: str, data: Data) -> None:
+        """Write-through after a committed save; other workers drop *group*."""
+        with self._lock:
+            self._data[group] = data
+            self._generations[group] = self._generations.get(group, self._base) + 1
+        for hook in self.on_invalidate:
+            hook(group)
+
+    def drop(self, group: str) -> None:
+        """Forget *group* – another worker saved it."""
+        with self._lock:
+            self._data.pop(group, None)
+            self._generations[group] = self._generations.get(group, self._base) + 1
+
+    def fill(self, group: str, data: Data, generation: int) -> Data:
+        """
+        Store a DB read made at *generation*, unless a save got there first
+        (its value wins) or the group was dropped meanwhile (the read may
+        predate that save; it is returned but not kept).
+        """
+        with self._lock:
+            if self._generations.get(group, self._base) != generation:
+                return self._data.get(group, data)
+            return self._data.setdefault(group, data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def reset(self) -> None:
+        """Forget every group; DB reads already under way are not kept."""
+        with self._lock:
+            self._base = max(self._generations.values(), default=self._base) + 1
+            self._generations.clear()
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+cache = SettingsCache()
+
+
+def load(s: Session, group: str) -> Data:
+    """Current blob of *group* (``{}`` if never saved)."""
+    data = cache.get(group)
+    if data is None:
+        generation = cache.generation(group)
+        rec = s.get(models.CurrentSetting, group)
+        data = cache.fill(group, rec.data if rec else {}, generation)
+    return data
+
+
+def save(s: Session, group: str, data: Data) -> None:
+    """Upsert the current blob and append to the history; the caller commits."""
+    now = datetime.utcnow()
+    insert = INSERT_BY_DIALECT[s.get_bind().dialect.name]
+    stmt = insert(_current).values(group=group, data=data, ts=now)
+    s.execute(stmt.on_conflict_do_update(
+        index_elements=["group"], set_={"data": stmt.excluded.data, "ts": stmt.excluded.ts},
+    ))
+    if SETTINGS_HISTORY > 0:
+        s.execute(_history.insert().values(group=group, data=data, ts=now))
+    prune_history(s, group)
+
+
+def prune_history(s: Session | Connection, group: str, keep: Optional[int] = None) -> None:
+    """Drop all but the newest *keep* (default ``SETTINGS_HISTORY``) entries of *group*."""
+    keep = SETTINGS_HISTORY if keep is None else keep
+    newest = (
+        select(_history.c.id)
+        .where(_history.c.group == group)
+        .order_by(_history.c.ts.desc(), _history.c.id.desc())
+        .limit(keep)
+    )
+    s.execute(delete(_history).where(
+        _history.c.group == group, _history.c.id.not_in(newest.scalar_subquery())
+    ))
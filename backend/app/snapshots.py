@@ -0,0 +1,135 @@
+"""
+Read cache + ETags for the finance year endpoints.
+
+Every (year, kind) pair – kind is ``"cells"`` or ``"rows"`` – carries a
+version counter that the write routes bump after their commit.  Cached
+responses are stored as encoded JSON together with the version they were
+read at, so a bump invalidates all of them at once and a read racing a
+write can never be served under the new version.
+
+The ETag combines a per-process boot nonce, the version and the requested
+revision; a restart therefore never answers 304 for data it has not seen.
+The cache lives in process memory; every invalidation is also passed to the
+``on_invalidate`` hooks, through which :mod:`live` repeats it in the other
+workers (``LIVE_BACKEND=postgres`` – required with more than one worker).
+"""
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CELLS = "cells"
+ROWS = "rows"
+
+SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "64"))
+BOOT = secrets.token_hex(4)
+
+Key = Tuple[int, str, Optional[int]]
+
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    """RFC 9110 weak comparison against an ``If-None-Match`` header."""
+    if not if_none_match:
+        return False
+    candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in candidates or tag in candidates
+
+
+def encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+class SnapshotCache:
+    """LRU of encoded responses keyed by (year, kind, revision)."""
+
+    def __init__(self, maxsize: int = SNAPSHOT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._versions: Dict[Tuple[int, str], int] = {}
+        self._base = 0                              # version of untouched keys
+        self._data: "OrderedDict[Key, Tuple[int, bytes]]" = OrderedDict()
+        self.hits = self.misses = self.invalidations = 0
+        self._lock = threading.Lock()              # background jobs invalidate too
+        self.on_invalidate: List[Callable[[int, Tuple[str, ...]], None]] = []
+
+    def version(self, year: int, kind: str) -> int:
+        return self._versions.get((year, kind), self._base)
+
+    def etag(self, year: int, kind: str, revision: Optional[int], version: int) -> str:
+        rev = "latest" if revision is None else revision
+        return f'"{BOOT}-{year}-{kind}-{version}-{rev}"'
+
+    def current_etag(self, year: int, kind: str, revision: Optional[int] = None) -> str:
+        return self.etag(year, kind, revision, self.version(year, kind))
+
+    def get(self, year: int, kind: str, revision: Optional[int] = None) -> Optional[bytes]:
+        key = (year, kind, revision)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != self.version(year, kind):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(
+        self, year: int, kind: str, revision: Optional[int], version: int, body: bytes
+    ) -> None:
+        """Store *body* read at *version*; stale reads are silently dropped."""
+        key = (year, kind, revision)
+        with self._lock:
+            if version != self.version(year, kind):
+                return
+            self._data[key] = (version, body)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, year: int, *kinds: str, share: bool = True) -> None:
+        """
+        Bump the version of *year* for every kind given (default: all) and,
+        unless *share* is off (an invalidation from another worker), run
+        the ``on_invalidate`` hooks.
+        """
+        with self._lock:
+            for kind in kinds or (CELLS, ROWS):
+                self._versions[(year, kind)] = self.version(year, kind) + 1
+                for key in [k for k in self._data if k[:2] == (year, kind)]:
+                    del self._data[key]
+            self.invalidations += 1
+        if share:
+            for hook in self.on_invalidate:
+                hook(year, kinds)
+
+    def clear(self) -> None:
+        """Drop cached bodies; versions (and thus client ETags) stay valid."""
+        with self._lock:
+            self._data.clear()
+
+    def reset(self) -> None:
+        """
+        Forget everything, including versions: every key moves past any
+        version handed out so far, so no old ETag or pending read matches.
+        """
+        with self._lock:
+            self._base = max(self._versions.values(), default=self._base) + 1
+            self._versions.clear()
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+cache = SnapshotCache()
@@ -0,0 +1,255 @@
+"""
+Monthly income / expense / leftover totals per year, kept in
+``FinanceMonthSummary`` so reports read O(months) rows instead of every cell.
+
+The totals describe the latest snapshot (what ``GET /finance/{year}``
+returns) with the rules of the finance table: columns 0–11 are the months,
+cells of deleted rows do not count, rows without meta count as expense
+except row 0 (income).  Irregular rows are expenses that are also reported
+separately.
+
+Writes keep the table current incrementally: cell upserts add the change of
+the latest value, row meta changes move a row's values between buckets.
+Both first lock the (year, month) rows they touch, so concurrent writers of
+a month take turns and each reads the cells the previous one committed.
+:func:`rebuild` recomputes years from scratch with one GROUP BY.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, case, delete, func, literal, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from . import models
+from .database import INSERT_BY_DIALECT
+
+MONTHS = 12
+CHUNK = 1_000                                       # keys per IN (…) lookup
+INCOME, EXPENSE, IRREGULAR = "income", "expense", "irregular"
+
+_cells = models.FinanceCell.__table__
+_rows = models.FinanceRow.__table__
+_sum = models.FinanceMonthSummary.__table__
+
+Delta = Dict[Tuple[int, int], List[float]]         # (year, month) → [income, expense, irregular]
+
+
+def row_kind(meta: Optional[models.FinanceRow], row: int) -> Optional[str]:
+    """Bucket of a row, None if it does not count (deleted)."""
+    if meta is None:
+        return INCOME if row == 0 else EXPENSE
+    if meta.deleted:
+        return None
+    if meta.income:
+        return INCOME
+    return IRREGULAR if meta.irregular else EXPENSE
+
+
+def _add(delta: Delta, year: int, month: int, kind: Optional[str], amount: float) -> None:
+    if kind is None or not amount or not 0 <= month < MONTHS:
+        return
+    d = delta.setdefault((year, month), [0.0, 0.0, 0.0])
+    if kind == INCOME:
+        d[0] += amount
+    else:
+        d[1] += amount
+        if kind == IRREGULAR:
+            d[2] += amount
+
+
+def _apply(s: Session, delta: Delta) -> None:
+    """Add *delta* to the stored totals (``INSERT … ON CONFLICT`` increment)."""
+    if not delta:
+        return
+    insert = INSERT_BY_DIALECT[s.get_bind().dialect.name]
+    stmt = insert(_sum).values([
+        {"year": y, "month": m, "income": d[0], "expense": d[1], "irregular": d[2]}
+        for (y, m), d in delta.items()
+    ])
+    s.execute(stmt.on_conflict_do_update(
+        index_elements=["year", "month"],
+        set_={c: _sum.c[c] + stmt.excluded[c] for c in ("income", "expense", "irregular")},
+    ))
+
+
+def _lock(s: Session, months: Iterable[Tuple[int, int]]) -> None:
+    """
+    Create the summary rows of *months* if missing and lock them, in key
+    order (no deadlocks), before any cell is read.  On SQLite the INSERT
+    alone takes the database write lock.
+    """
+    keys = sorted(set(months))
+    if not keys:
+        return
+    insert = INSERT_BY_DIALECT[s.get_bind().dialect.name]
+    s.execute(insert(_sum).values([{"year": y, "month": m} for y, m in keys])
+              .on_conflict_do_nothing(index_elements=["year", "month"]))
+    s.execute(
+        select(_sum.c.year)
+        .where(tuple_(_sum.c.year, _sum.c.month).in_(keys))
+        .order_by(_sum.c.year, _sum.c.month)
+        .with_for_update()
+    )
+
+
+def _kinds(s: Session, year_rows: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[str]]:
+    keys = set(year_rows)
+    metas = {
+        (m.year, m.row): m
+        for m in s.execute(
+            select(models.FinanceRow).where(tuple_(_rows.c.year, _rows.c.row).in_(keys))
+        ).scalars()
+    } if keys else {}
+    return {k: row_kind(metas.get(k), k[1]) for k in keys}
+
+
+# ───────────────────────── incremental updates ─────────────────────────
+def track_cells(s: Session, writes: Dict[Tuple[int, int, int, int], float]) -> None:
+    """
+    Account for cell upserts *before* they are executed – and before the
+    caller reads any cell: *writes* maps (year, row, col, revision) → new
+    value.  A write changes the latest
+    snapshot only if its revision is not older than the cell's newest one.
+    """
+    newest: Dict[Tuple[int, int, int], Tuple[int, float]] = {}
+    for (y, r, c, rev), value in writes.items():
+        if c < MONTHS and ((y, r, c) not in newest or rev >= newest[(y, r, c)][0]):
+            newest[(y, r, c)] = (rev, value)
+    if not newest:
+        return
+
+    _lock(s, ((y, c) for y, _, c in newest))
+    keys = list(newest)
+    current: Dict[Tuple[int, int, int], Tuple[int, float]] = {}
+    for i in range(0, len(keys), CHUNK):
+        for y, r, c, rev, value in s.execute(
+            select(_cells.c.year, _cells.c.row, _cells.c.col, _cells.c.revision, _cells.c.value)
+            .where(tuple_(_cells.c.year, _cells.c.row, _cells.c.col).in_(keys[i:i + CHUNK]))
+        ):
+            if (y, r, c) not in current or rev > current[(y, r, c)][0]:
+                current[(y, r, c)] = (rev, value)
+
+    kinds = _kinds(s, ((y, r) for y, r, _ in newest))
+    delta: Delta = {}
+    for key, (rev, value) in newest.items():
+        old_rev, old = current.get(key, (rev, 0.0))
+        if rev >= old_rev:
+            y, r, c = key
+            _add(delta, y, c, kinds[(y, r)], value - old)
+    _apply(s, delta)
+
+
+def move_row(s: Session, year: int, row: int, old: Optional[str], new: Optional[str]) -> None:
+    """Move the latest values of one row from bucket *old* to *new* (None = not counted)."""
+    if old == new:
+        return
+    _lock(s, ((year, m) for m in range(MONTHS)))
+    latest: Dict[int, Tuple[int, float]] = {}
+    for c, rev, value in s.execute(
+        select(_cells.c.col, _cells.c.revision, _cells.c.value)
+        .where(_cells.c.year == year, _cells.c.row == row)
+    ):
+        if c not in latest or rev > latest[c][0]:
+            latest[c] = (rev, value)
+    delta: Delta = {}
+    for c, (_, value) in latest.items():
+        _add(delta, year, c, old, -value)
+        _add(delta, year, c, new, value)
+    _apply(s, delta)
+
+
+# ───────────────────────── full recompute ─────────────────────────
+def rebuild(s: Union[Session, Connection], years: Optional[Iterable[int]] = None) -> None:
+    """Recompute the totals of *years* (default: every year) with one GROUP BY."""
+    if years is None:
+        years = s.execute(
+            select(_cells.c.year).union(select(_sum.c.year))
+        ).scalars().all()
+    years = sorted(set(years))
+    if not years:
+        return
+
+    latest = (
+        select(
+            _cells.c.year, _cells.c.row, _cells.c.col, _cells.c.value,
+            func.row_number().over(
+                partition_by=(_cells.c.year, _cells.c.row, _cells.c.col),
+                order_by=_cells.c.revision.desc(),
+            ).label("rn"),
+        )
+        .where(_cells.c.year.in_(years), _cells.c.col < MONTHS)
+        .subquery()
+    )
+    meta = _rows.alias("meta")
+    joined = latest.outerjoin(
+        meta, and_(meta.c.year == latest.c.year, meta.c.row == latest.c.row)
+    )
+    is_income = case(
+        (meta.c.id.is_(None), latest.c.row == 0), else_=meta.c.income
+    )
+    counted = func.coalesce(meta.c.deleted, literal(False)).is_(False)
+
+    def total(cond):
+        return func.coalesce(func.sum(case((cond, latest.c.value), else_=0.0)), 0.0)
+
+    totals = (
+        select(
+            latest.c.year,
+            latest.c.col.label("month"),
+            total(is_income),
+            total(~is_income),
+            total(and_(~is_income, meta.c.irregular.is_(True))),
+        )
+        .select_from(joined)
+        .where(latest.c.rn == 1, counted)
+        .group_by(latest.c.year, latest.c.col)
+    )
+    s.execute(delete(_sum).where(_sum.c.year.in_(years)))
+    s.execute(
+        _sum.insert().from_select(["year", "month", "income", "expense", "irregular"], totals)
+    )
+
+
+# ───────────────────────── read side ─────────────────────────
+def _months(s: Session, year_from: int, year_to: int) -> Dict[int, List[List[float]]]:
+    out: Dict[int, List[List[float]]] = defaultdict(lambda: [[0.0] * 3 for _ in range(MONTHS)])
+    for y, m, inc, exp, irr in s.execute(
+        select(_sum.c.year, _sum.c.month, _sum.c.income, _sum.c.expense, _sum.c.irregular)
+        .where(_sum.c.year.between(year_from, year_to))
+    ):
+        out[y][m] = [inc, exp, irr]
+    return out
+
+
+def year_summaries(s: Session, year_from: int, year_to: int) -> List[dict]:
+    """
+    Per month: income, expense, irregular, leftover and the running
+    carry-over.  Like the finance table, a year starts with the previous
+    year's total leftover as ``carry_in``.
+    """
+    months = _months(s, year_from - 1, year_to)
+    out = []
+    for year in range(year_from, year_to + 1):
+        carry_in = sum(inc - exp for inc, exp, _ in months[year - 1])
+        running = carry_in
+        rows = []
+        for m, (inc, exp, irr) in enumerate(months[year]):
+            running += inc - exp
+            rows.append({
+                "month": m,
+                "income": round(inc, 2),
+                "expense": round(exp, 2),
+                "irregular": round(irr, 2),
+                "leftover": round(inc - exp, 2),
+                "carry": round(running, 2),
+            })
+        out.append({
+            "year": year,
+            "carry_in": round(carry_in, 2),
+            "leftover": round(running - carry_in, 2),
+            "months": rows,
+        })
+    return out
@@ -1,9 +1,10 @@
 
 """IG Metall NRW 2025 tariff calculator."""
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Any
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping
 
-TARIF_NRW_2025: Dict[str, Dict[str, float]] = {
+_TABLE: Dict[str, Dict[str, float]] = {
     "EG 1":  {"Grundentgelt": 2_705.00},
     "EG 2":  {"Grundentgelt": 2_738.00},
     "EG 3":  {"Grundentgelt": 2_769.50},
@@ -29,11 +30,17 @@ TARIF_NRW_2025: Dict[str, Dict[str, float]] = {
     },
 }
 
+# read-only, so a cached fingerprint holding the table stays valid; new
+# rules mean binding a new table
+TARIF_NRW_2025: Mapping[str, Mapping[str, float]] = MappingProxyType(
+    {eg: MappingProxyType(stufen) for eg, stufen in _TABLE.items()}
+)
+
 TZUG_B_REF = TARIF_NRW_2025["EG 8"]["Grundentgelt"]
 
 STANDARD_HOURS = 35
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TarifInputData:
     entgeltgruppe: str
     stufe: str
@@ -49,7 +56,7 @@ class TarifInputData:
     betriebszugehoerigkeit_monate: int = 0
     include_transformationsgeld: bool = True
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TarifResultData:
     monatsgrund: float
     zulagen: float
@@ -61,7 +68,7 @@ class TarifResultData:
     weihnachtsgeld: float
     jahresentgelt: float
     def asdict(self):
-        return asdict(self)
+        return {k: getattr(self, k) for k in self.__slots__}
 
 
 def berechne_nrw_2025(inp: TarifInputData) -> TarifResultData:
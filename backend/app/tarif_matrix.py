@@ -0,0 +1,142 @@
+"""Whole IG Metall NRW 2025 table – every EG × Stufe × hours × tenure bucket.
+
+The grid is built column-wise with NumPy; every formula mirrors
+:func:`tarif.berechne_nrw_2025` and :func:`tarif.get_monthly_breakdown`
+so that each matrix row equals the scalar result to the cent.
+"""
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .numeric import round2
+from .tarif import (
+    TARIF_NRW_2025, TZUG_B_REF, STANDARD_HOURS,
+    TarifInputData, TarifResultData,
+)
+
+WOCHENSTUNDEN = (20.0, 25.0, 28.0, 30.0, 35.0, 40.0)
+# representative tenure per Weihnachtsgeld bucket: "< 36 Monate" / ">= 36 Monate"
+BETRIEBSZUGEHOERIGKEIT = (0, 36)
+
+RESULT_FIELDS = tuple(f.name for f in fields(TarifResultData))
+
+
+@dataclass
+class TarifMatrix:
+    entgeltgruppe: np.ndarray
+    stufe: np.ndarray
+    wochenstunden: np.ndarray
+    betriebszugehoerigkeit_monate: np.ndarray
+    results: Dict[str, np.ndarray]      # one column per TarifResultData field
+    monate: np.ndarray                  # (rows, 12) gross per month, Jan..Dez
+
+    def __len__(self) -> int:
+        return len(self.stufe)
+
+    def rows(
+        self,
+        entgeltgruppe: Optional[str] = None,
+        stufe: Optional[str] = None,
+        wochenstunden: Optional[float] = None,
+        betriebszugehoerigkeit_monate: Optional[int] = None,
+        breakdown: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Filtered matrix rows as plain dicts (tenure is matched by bucket)."""
+        mask = np.ones(len(self), dtype=bool)
+        if entgeltgruppe is not None:
+            mask &= self.entgeltgruppe == entgeltgruppe
+        if stufe is not None:
+            mask &= self.stufe == stufe
+        if wochenstunden is not None:
+            mask &= self.wochenstunden == wochenstunden
+        if betriebszugehoerigkeit_monate is not None:
+            mask &= (self.betriebszugehoerigkeit_monate >= 36) == (
+                betriebszugehoerigkeit_monate >= 36
+            )
+
+        cols = {
+            "entgeltgruppe": self.entgeltgruppe[mask].tolist(),
+            "stufe": self.stufe[mask].tolist(),
+            "wochenstunden": self.wochenstunden[mask].tolist(),
+            "betriebszugehoerigkeit_monate": self.betriebszugehoerigkeit_monate[mask].tolist(),
+            **{k: v[mask].tolist() for k, v in self.results.items()},
+        }
+        if breakdown:
+            cols["monate"] = self.monate[mask].tolist()
+        return [dict(zip(cols, values)) for values in zip(*cols.values())]
+
+
+def build_matrix(
+    wochenstunden: Sequence[float] = WOCHENSTUNDEN,
+    betriebszugehoerigkeit: Sequence[int] = BETRIEBSZUGEHOERIGKEIT,
+    defaults: TarifInputData = TarifInputData(entgeltgruppe="", stufe=""),
+) -> TarifMatrix:
+    """Evaluate the full grid in one pass; all other inputs come from *defaults*."""
+    cells = [(eg, st, grund) for eg, stufen in TARIF_NRW_2025.items()
+             for st, grund in stufen.items()]
+    ci, hi, bi = (a.ravel() for a in np.meshgrid(
+        np.arange(len(cells)), np.arange(len(wochenstunden)),
+        np.arange(len(betriebszugehoerigkeit)), indexing="ij",
+    ))
+    eg = np.array([c[0] for c in cells], dtype=object)[ci]
+    st = np.array([c[1] for c in cells], dtype=object)[ci]
+    grund_tab = np.array([c[2] for c in cells])[ci]
+    hours = np.asarray(wochenstunden, dtype=float)[hi]
+    tenure = np.asarray(betriebszugehoerigkeit, dtype=int)[bi]
+    d = defaults
+
+    faktor = hours / STANDARD_HOURS
+    grund_zeit = grund_tab * faktor
+
+    lz = grund_zeit * d.leistungszulage_pct / 100
+    sonst = grund_zeit * d.sonstige_zulage_pct / 100
+    monatsgesamt = grund_zeit + lz + sonst
+
+    tzug_b = TZUG_B_REF * d.tzug_b_pct / 100 * faktor
+    urlaubsgeld = monatsgesamt * d.urlaubsgeld_pct / 100
+    transformationsgeld = (
+        monatsgesamt * d.transformationsgeld_pct / 100
+        if d.include_transformationsgeld else np.zeros_like(monatsgesamt)
+    )
+    tzug_a = monatsgesamt * d.tzug_a_pct / 100
+
+    wg_pct = np.where(
+        tenure >= 36, d.weihnachtsgeld_pct_max, d.weihnachtsgeld_pct_base
+    )
+    weihnachtsgeld = monatsgesamt * wg_pct / 100
+
+    jahresentgelt = (
+        monatsgesamt * 12 +
+        tzug_b + urlaubsgeld + transformationsgeld + tzug_a + weihnachtsgeld
+    )
+
+    results = {
+        "monatsgrund": round2(grund_zeit),
+        "zulagen": round2(lz + sonst),
+        "monatsgesamt": round2(monatsgesamt),
+        "tzug_b": round2(tzug_b),
+        "urlaubsgeld": round2(urlaubsgeld),
+        "transformationsgeld": round2(transformationsgeld),
+        "tzug_a": round2(tzug_a),
+        "weihnachtsgeld": round2(weihnachtsgeld),
+        "jahresentgelt": round2(jahresentgelt),
+    }
+
+    # same month layout as get_monthly_breakdown, built from the rounded parts
+    base = results["monatsgesamt"]
+    extra = np.zeros((len(base), 12))
+    extra[:, 1] = results["tzug_b"]
+    extra[:, 5] = results["urlaubsgeld"]
+    extra[:, 6] = results["tzug_a"] + results["transformationsgeld"]
+    extra[:, 10] = results["weihnachtsgeld"]
+    monate = round2(base[:, None] + extra)
+
+    return TarifMatrix(
+        entgeltgruppe=eg,
+        stufe=st,
+        wochenstunden=hours,
+        betriebszugehoerigkeit_monate=tenure,
+        results={k: results[k] for k in RESULT_FIELDS},
+        monate=monate,
+    )
@@ -0,0 +1,271 @@
+"""
+Streaming export / import of one finance year.
+
+Both directions work in chunks of ``TRANSFER_CHUNK`` cells, so memory stays
+constant however large the year is; an import rejects frames and lines
+over ``TRANSFER_MAX_FRAME`` bytes instead of buffering them.  All stored revisions are transferred,
+i.e. an imported year keeps its undo history.
+
+Formats
+-------
+``ndjson``  one JSON object per line::
+
+    {"kind": "year", "year": 2025, "version": 1}
+    {"kind": "row", "row": 0, "description": "Gehalt", ...}
+    {"kind": "cell", "row": 0, "col": 3, "value": 4200.0, "revision": 2}
+
+``binary``  ``FSX1`` magic + little-endian frames ``<u1 type><u4 length>``:
+
+    type 1  year header, JSON ``{"year": …}``
+    type 2  row meta, JSON list
+    type 3  cell chunk: ``<u4 n>`` then the columns row ``<i4>``, col ``<i2>``,
+            revision ``<i4>`` and value ``<f8>``, n entries each
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+import asyncpg
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import models, schemas
+
+TRANSFER_CHUNK = int(os.getenv("TRANSFER_CHUNK", "20000"))
+TRANSFER_MAX_FRAME = int(os.getenv("TRANSFER_MAX_FRAME", str(16 << 20)))
+FORMATS = {"ndjson": "application/x-ndjson", "binary": "application/octet-stream"}
+
+MAGIC = b"FSX1"
+FRAME = struct.Struct("<BI")
+YEAR, ROWS, CELLS = 1, 2, 3
+COLUMNS = (("row", "<i4"), ("col", "<i2"), ("revision", "<i4"), ("value", "<f8"))
+ROW_FIELDS = ("row", "position", "description", "deleted", "income", "irregular")
+
+Columns = Dict[str, np.ndarray]
+
+_cells = models.FinanceCell.__table__
+_rows = models.FinanceRow.__table__
+
+
+class TransferError(ValueError):
+    pass
+
+
+# ───────────────────────── export ─────────────────────────
+async def _row_meta(s: AsyncSession, year: int) -> List[Dict[str, Any]]:
+    res = await s.execute(select(*(_rows.c[f] for f in ROW_FIELDS)).where(_rows.c.year == year))
+    return [dict(r._mapping) for r in res]
+
+
+async def _cell_chunks(s: AsyncSession, year: int) -> AsyncIterator[Columns]:
+    result = await s.stream(
+        select(*(_cells.c[name] for name, _ in COLUMNS))
+        .where(_cells.c.year == year)
+        .order_by(_cells.c.row, _cells.c.col, _cells.c.revision)
+        .execution_options(yield_per=TRANSFER_CHUNK)
+    )
+    async for part in result.partitions(TRANSFER_CHUNK):
+        data = list(zip(*part))
+        yield {name: np.asarray(data[i], dtype=dt) for i, (name, dt) in enumerate(COLUMNS)}
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+async def export_year(s: AsyncSession, year: int, fmt: str) -> AsyncIterator[bytes]:
+    """Encoded export of *year*, one chunk of cells at a time."""
+    meta = await _row_meta(s, year)
+    if fmt == "ndjson":
+        yield json.dumps({"kind": "year", "year": year, "version": 1}).encode() + b"\n"
+        yield b"".join(json.dumps({"kind": "row", **r}).encode() + b"\n" for r in meta)
+        async for cols in _cell_chunks(s, year):
+            yield "".join(
+                f'{{"kind":"cell","row":{r},"col":{c},"value":{v!r},"revision":{rev}}}\n'
+                for r, c, rev, v in zip(*(cols[n].tolist() for n, _ in COLUMNS))
+            ).encode()
+    else:
+        yield MAGIC + _frame(YEAR, json.dumps({"year": year}).encode())
+        yield _frame(ROWS, json.dumps(meta).encode())
+        async for cols in _cell_chunks(s, year):
+            n = len(cols["row"])
+            yield _frame(CELLS, struct.pack("<I", n) + b"".join(
+                cols[name].astype(dt, copy=False).tobytes() for name, dt in COLUMNS
+            ))
+
+
+# ───────────────────────── parsing ─────────────────────────
+Item = Tuple[str, Any]              # ("rows", [meta…]) | ("cells", Columns)
+
+
+class NdjsonReader:
+    """Incremental NDJSON parser; yields row meta and cell chunks."""
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._cells: List[Tuple[int, int, int, float]] = []
+
+    def feed(self, data: bytes) -> Iterator[Item]:
+        lines = (self._buf + data).split(b"\n")
+        self._buf = lines.pop()
+        if len(self._buf) > TRANSFER_MAX_FRAME:
+            raise TransferError(f"NDJSON line longer than {TRANSFER_MAX_FRAME} bytes")
+        yield from self._lines(lines)
+
+    def close(self) -> Iterator[Item]:
+        yield from self._lines([self._buf])
+        self._buf = b""
+        if self._cells:
+            yield "cells", self._columns()
+
+    def _lines(self, lines: List[bytes]) -> Iterator[Item]:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+                kind = obj.pop("kind")
+                if kind == "cell":
+                    self._cells.append((obj["row"], obj["col"], obj.get("revision", 0),
+                                        obj["value"]))
+                elif kind == "row":
+                    yield "rows", [obj]
+                elif kind != "year":
+                    raise TransferError(f"unknown record kind {kind!r}")
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                raise TransferError(f"invalid NDJSON line: {line[:80]!r}") from exc
+            if len(self._cells) >= TRANSFER_CHUNK:
+                yield "cells", self._columns()
+
+    def _columns(self) -> Columns:
+        data = list(zip(*self._cells))
+        self._cells = []
+        try:
+            return {name: np.asarray(data[i], dtype=dt) for i, (name, dt) in enumerate(COLUMNS)}
+        except (OverflowError, ValueError, TypeError) as exc:
+            raise TransferError(f"invalid cell values: {exc}") from exc
+
+
+class BinaryReader:
+    """Incremental parser for the ``FSX1`` frame format."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._magic = False
+
+    def feed(self, data: bytes) -> Iterator[Item]:
+        self._buf += data
+        if not self._magic:
+            if len(self._buf) < len(MAGIC):
+                return
+            if self._buf[:len(MAGIC)] != MAGIC:
+                raise TransferError("not a finance export (bad magic)")
+            del self._buf[:len(MAGIC)]
+            self._magic = True
+        while len(self._buf) >= FRAME.size:
+            kind, size = FRAME.unpack_from(self._buf)
+            if size > TRANSFER_MAX_FRAME:
+                raise TransferError(f"frame of {size} bytes exceeds {TRANSFER_MAX_FRAME}")
+            if len(self._buf) < FRAME.size + size:
+                return
+            payload = bytes(self._buf[FRAME.size:FRAME.size + size])
+            del self._buf[:FRAME.size + size]
+            if kind == ROWS:
+                yield "rows", json.loads(payload)
+            elif kind == CELLS:
+                yield "cells", self._columns(payload)
+            elif kind != YEAR:
+                raise TransferError(f"unknown frame type {kind}")
+
+    def close(self) -> Iterator[Item]:
+        if self._buf or not self._magic:
+            raise TransferError("truncated finance export")
+        return iter(())
+
+    @staticmethod
+    def _columns(payload: bytes) -> Columns:
+        (n,) = struct.unpack_from("<I", payload)
+        cols, offset = {}, 4
+        for name, dt in COLUMNS:
+            cols[name] = np.frombuffer(payload, dtype=dt, count=n, offset=offset)
+            offset += n * np.dtype(dt).itemsize
+        if offset != len(payload):
+            raise TransferError("corrupt cell frame")
+        return cols
+
+
+READERS = {"ndjson": NdjsonReader, "binary": BinaryReader}
+
+
+# ───────────────────────── import ─────────────────────────
+async def _copy_cells(s: AsyncSession, year: int, cols: Columns, now: datetime) -> None:
+    """
+    Bulk-load one chunk: COPY on asyncpg, otherwise the driver's
+    ``executemany`` on a once-compiled INSERT (skips per-row bind processing).
+    COPY bypasses SQLAlchemy, so its constraint and data errors are raised
+    as :class:`TransferError` here.
+    """
+    n = len(cols["row"])
+    conn = await s.connection()
+    if conn.dialect.driver == "asyncpg":
+        raw = (await conn.get_raw_connection()).driver_connection
+        try:
+            await raw.copy_records_to_table(
+                _cells.name, columns=("year", "row", "col", "value", "revision", "ts"),
+                records=zip([year] * n, cols["row"].tolist(), cols["col"].tolist(),
+                            cols["value"].tolist(), cols["revision"].tolist(), [now] * n),
+            )
+        except (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError) as exc:
+            raise TransferError(str(exc)) from exc
+        return
+    bind_ts = _cells.c.ts.type.bind_processor(conn.dialect)
+    data = {
+        "year": [year] * n,
+        "row": cols["row"].tolist(),
+        "col": cols["col"].tolist(),
+        "value": cols["value"].tolist(),
+        "revision": cols["revision"].tolist(),
+        "ts": [bind_ts(now) if bind_ts else now] * n,
+    }
+    stmt = insert(_cells).compile(dialect=conn.dialect, column_keys=list(data))
+    if stmt.positional:
+        params = list(zip(*(data[k] for k in stmt.positiontup)))
+    else:
+        params = [dict(zip(data, v)) for v in zip(*data.values())]
+    await conn.exec_driver_sql(stmt.string, params)
+
+
+async def import_year(
+    s: AsyncSession, year: int, fmt: str, chunks: AsyncIterator[bytes]
+) -> Dict[str, int]:
+    """
+    Replace *year* with the streamed export.  Everything runs in the
+    caller's transaction, so a broken file leaves the year untouched.
+    """
+    reader = READERS[fmt]()
+    await s.execute(delete(_cells).where(_cells.c.year == year))
+    await s.execute(delete(_rows).where(_rows.c.year == year))
+    now = datetime.utcnow()
+    counts = {"rows": 0, "cells": 0}
+
+    async def load(items: Iterator[Item]) -> None:
+        for kind, payload in items:
+            if not len(payload):
+                continue
+            if kind == "rows":
+                await s.execute(insert(_rows), [
+                    {**schemas.RowMeta(**{**r, "year": year}).dict(), "ts": now} for r in payload
+                ])
+            else:
+                await _copy_cells(s, year, payload, now)
+            counts[kind] += len(payload) if kind == "rows" else len(payload["row"])
+
+    async for data in chunks:
+        await load(reader.feed(data))
+    await load(reader.close())
+    return counts
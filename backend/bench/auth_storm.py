@@ -0,0 +1,144 @@
+"""
+Load test: does a login storm starve the finance endpoints?
+
+    python -m backend.bench.auth_storm --logins 200 --concurrency 64
+    python -m backend.bench.auth_storm --inline      # contrast: bcrypt on the event loop
+
+Readers keep requesting an authenticated finance year while a burst of
+logins (real bcrypt at ``BCRYPT_ROUNDS``) hits ``/auth/token``.  Reader
+latency is reported idle and during the storm, plus how many logins were
+served or turned away with 503 by the bounded hash pool.  ``--inline``
+swaps the pool for direct calls on the event loop to show what the pool
+prevents.
+
+Without ``DATABASE_URL`` a throw-away SQLite file is used; otherwise users
+``storm-*@bench.invalid`` and the cells of year 2098 are created.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["AUTH_ENABLED"] = "1"
+os.environ.setdefault("AUTH_SECRET_KEY", "auth-storm-bench")
+
+import httpx  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from backend.app import audit, auth, jobs, models, schemas  # noqa: E402
+from backend.app.api import upsert_cells  # noqa: E402
+from backend.app.database import SessionLocal, async_engine, migrate_db  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.bench.harness import summarize  # noqa: E402
+
+YEAR = 2098
+PASSWORD = "storm-passwort"
+
+
+class InlinePool:
+    """bcrypt straight on the event loop – what ``auth.hash_pool`` avoids."""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+def seed(users: int) -> None:
+    migrate_db()
+    hashed = auth.get_password_hash(PASSWORD)
+    with SessionLocal() as s:
+        known = set(s.exec(select(models.User.email).where(models.User.email.like("storm-%"))))
+        s.add_all(models.User(email=f"storm-{i}@bench.invalid", hashed_password=hashed)
+                  for i in range(users) if f"storm-{i}@bench.invalid" not in known)
+        upsert_cells(s, [schemas.Cell(year=YEAR, row=r, col=c, value=r + c)
+                         for r in range(40) for c in range(14)])
+        s.commit()
+
+
+async def readers(client, headers, stop: asyncio.Event, concurrency: int) -> list:
+    latencies = []
+
+    async def loop() -> None:
+        while not stop.is_set():
+            t = time.perf_counter()
+            r = await client.get(f"/api/finance/{YEAR}", headers=headers)
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t)
+
+    await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies
+
+
+async def storm(client, n: int, concurrency: int, users: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    status, latencies = {}, []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t = time.perf_counter()
+            r = await client.post("/api/auth/token", json={
+                "email": f"storm-{i % users}@bench.invalid", "password": PASSWORD})
+            latencies.append(time.perf_counter() - t)
+            status[r.status_code] = status.get(r.status_code, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return {"status": status, **summarize(latencies, time.perf_counter() - t0)}
+
+
+async def phase(client, headers, args, logins: int) -> dict:
+    stop = asyncio.Event()
+    reading = asyncio.create_task(readers(client, headers, stop, args.readers))
+    if logins:
+        result = await storm(client, logins, args.concurrency, args.users)
+    else:
+        await asyncio.sleep(args.idle)
+        result = None
+    stop.set()
+    reads = await reading
+    wall = sum(reads) / args.readers
+    return {"reads": summarize(reads, wall), "logins": result}
+
+
+async def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--logins", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=64, help="logins in flight")
+    p.add_argument("--readers", type=int, default=8, help="concurrent finance readers")
+    p.add_argument("--users", type=int, default=50)
+    p.add_argument("--idle", type=float, default=2.0, help="seconds of idle baseline")
+    p.add_argument("--inline", action="store_true", help="hash on the event loop instead")
+    args = p.parse_args()
+
+    seed(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 timeout=120) as client:
+        r = await client.post("/api/auth/token", json={
+            "email": "storm-0@bench.invalid", "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        if args.inline:
+            auth.hash_pool = InlinePool()
+        print(f"bcrypt rounds {auth.BCRYPT_ROUNDS}, hash pool "
+              f"{'inline' if args.inline else auth.hash_pool.stats()}")
+        for name, logins in (("idle", 0), ("storm", args.logins)):
+            res = await phase(client, headers, args, logins)
+            reads = res["reads"]
+            print(f"{name:6} reads n={reads['n']:6} p50={reads['p50_ms']:8.2f} ms "
+                  f"p95={reads['p95_ms']:8.2f} ms", end="")
+            if res["logins"]:
+                lg = res["logins"]
+                print(f" | logins {lg['status']} p50={lg['p50_ms']:.0f} ms "
+                      f"p95={lg['p95_ms']:.0f} ms", end="")
+            print()
+        print(f"token cache {auth.token_cache.stats()}")
+
+    jobs.runner.stop()
+    audit.writer.stop()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Read endpoints through the ASGI app (no network) against the seeded
+database: finance snapshots cold and cached, row meta, monthly totals,
+multi-year range, audit reader, settings and the calculator routes.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+import httpx
+
+from backend.app import snapshots
+from backend.bench.harness import Result, ameasure
+
+
+async def run(client: httpx.AsyncClient, years: range, quick: bool = False) -> Dict[str, Result]:
+    n = 50 if quick else 300
+    first, last = years[0], years[-1]
+
+    def get(url: str, before=lambda: None):
+        async def call(i: int) -> None:
+            before()
+            r = await client.get(url.format(year=years[i % len(years)]))
+            r.raise_for_status()
+            await r.aread()
+        return call
+
+    def post(url: str, payload: dict):
+        async def call(i: int) -> None:
+            (await client.post(url, json=payload)).raise_for_status()
+        return call
+
+    return {
+        "api.finance_year.cold": await ameasure(
+            get("/api/finance/{year}", before=snapshots.cache.clear), n),
+        "api.finance_year.cached": await ameasure(get("/api/finance/{year}"), n * 4),
+        "api.finance_rows": await ameasure(
+            get("/api/finance/{year}/rows", before=snapshots.cache.clear), n),
+        "api.finance_summary": await ameasure(
+            get(f"/api/finance/summary?from={first}&to={last}"), n),
+        "api.finance_range": await ameasure(
+            get(f"/api/finance/range?from={first}&to={last}"), max(n // 10, 10)),
+        "api.audit.page": await ameasure(get("/api/audit?limit=500"), n // 2),
+        "api.audit.filtered": await ameasure(get("/api/audit?action=save_cell&limit=100"), n),
+        "api.settings": await ameasure(get("/api/settings/tarif"), n * 4),
+        "api.payroll.gross_to_net": await ameasure(
+            post("/api/payroll/gross-to-net", {"gross": 4200, "tax_class": 1}), n * 4),
+        "api.payroll.net_to_gross": await ameasure(
+            post("/api/payroll/net-to-gross", {"net": 2500, "tax_class": 3}), n),
+        "api.payroll.curve": await ameasure(
+            post("/api/payroll/curve", {"gross_from": 500, "gross_to": 12000, "step": 10}), n),
+        "api.payroll.batch": await ameasure(
+            post("/api/payroll/gross-to-net/batch",
+                 {"gross": [1000 + 7.5 * i for i in range(1000)], "tax_class": 1}), n),
+        "api.tarif.estimate": await ameasure(
+            post("/api/tarif/estimate", {"entgeltgruppe": "EG 8", "stufe": "Grundentgelt"}),
+            n * 4),
+        "api.tarif.breakdown": await ameasure(
+            post("/api/tarif/breakdown", {"entgeltgruppe": "EG 8", "stufe": "Grundentgelt"}),
+            n * 4),
+        "api.tarif.net": await ameasure(
+            post("/api/tarif/net", {"tarif": {"entgeltgruppe": "EG 8", "stufe": "Grundentgelt"}}),
+            n * 4),
+        "api.finance_year.concurrent": await ameasure(
+            get("/api/finance/{year}", before=snapshots.cache.clear), n * 2, concurrency=32),
+    }
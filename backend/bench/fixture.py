@@ -0,0 +1,57 @@
+"""
+Seed data for the endpoint benchmarks: several years of a realistic finance
+table (60 rows × 14 columns, a base snapshot plus sparse revisions), row
+meta, monthly totals, settings and a populated audit log.
+"""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from backend.app import models, settings, summary
+from backend.app.database import engine, migrate_db
+
+ROWS, COLS = 60, 14
+REVISIONS = 20                      # per year, each touching ~5 % of the cells
+ACTIONS = ("finance_year", "save_cell", "finance_rows", "shift_revision", "get_settings")
+
+
+def seed(years: range, log_rows: int, rnd: random.Random) -> Dict[str, int]:
+    migrate_db()
+    now = datetime.utcnow()
+    cells, metas = [], []
+    for year in years:
+        for r in range(ROWS):
+            metas.append({"year": year, "row": r, "position": r, "description": f"Posten {r}",
+                          "deleted": False, "income": r == 0, "irregular": r % 12 == 5,
+                          "ts": now})
+            for c in range(COLS):
+                cells.append({"year": year, "row": r, "col": c, "revision": 0, "ts": now,
+                              "value": round(rnd.uniform(3000, 5000) if r == 0
+                                             else rnd.uniform(5, 400), 2)})
+        for rev in range(1, REVISIONS + 1):
+            for _ in range(ROWS * COLS // 20):
+                cells.append({"year": year, "row": rnd.randrange(ROWS), "col": rnd.randrange(COLS),
+                              "revision": rev, "ts": now, "value": round(rnd.uniform(5, 400), 2)})
+    # the unique index keeps one value per (year, row, col, revision)
+    cells = list({(c["year"], c["row"], c["col"], c["revision"]): c for c in cells}.values())
+
+    t0 = now - timedelta(days=365)
+    log = [{"action": rnd.choice(ACTIONS), "info": {"i": i}, "user_id": None,
+            "ts": t0 + timedelta(seconds=i * 365 * 86400 // max(log_rows, 1))}
+           for i in range(log_rows)]
+
+    with Session(engine) as s:
+        for table, rows in ((models.FinanceCell, cells), (models.FinanceRow, metas),
+                            (models.ActionLog, log)):
+            for i in range(0, len(rows), 20_000):
+                s.execute(insert(table.__table__), rows[i:i + 20_000])
+        summary.rebuild(s, years)
+        settings.save(s, "tarif", {"entgeltgruppe": "EG 8", "stufe": "Grundentgelt"})
+        settings.save(s, "payroll", {"gross": 4200, "tax_class": 1})
+        s.commit()
+    return {"cells": len(cells), "rows": len(metas), "log": len(log)}
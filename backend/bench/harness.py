@@ -0,0 +1,85 @@
+"""
+Timing helpers shared by the benchmark suite (see ``suite.py``).
+
+Every benchmark produces one :data:`Result`::
+
+    {"n": 2000, "p50_ms": 0.012, "p95_ms": 0.020, "mean_ms": 0.013, "ops_s": 76923.1}
+
+``ops_s`` is calls per second of wall time – for sequential runs the inverse
+of the mean latency, for concurrent ones the achieved throughput.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+Result = Dict[str, float]
+
+
+def summarize(latencies: List[float], wall: float) -> Result:
+    latencies = sorted(latencies)
+    n = len(latencies)
+    return {
+        "n": n,
+        "p50_ms": round(1000 * statistics.median(latencies), 6),
+        "p95_ms": round(1000 * latencies[int(0.95 * (n - 1))], 6),
+        "mean_ms": round(1000 * statistics.fmean(latencies), 6),
+        "ops_s": round(n / wall, 1),
+    }
+
+
+def measure(fn: Callable[[Any], Any], inputs: Sequence[Any], warmup: int = 20,
+            min_batch_s: float = 200e-6, repeat: int = 3,
+            setup: Callable[[], None] = lambda: None) -> Result:
+    """
+    Call ``fn(x)`` for every *x* of *inputs*, *repeat* times, and keep the
+    fastest round (like ``timeit``: slower rounds measure other load on the
+    machine); *setup* runs before each round.  Calls are timed in batches
+    of at least *min_batch_s* so sub-microsecond functions are not lost in
+    the timer's resolution; latencies are per call.
+    """
+    t = time.perf_counter()
+    for x in inputs[:warmup]:
+        fn(x)
+    per_call = (time.perf_counter() - t) / max(min(warmup, len(inputs)), 1)
+    k = max(1, int(min_batch_s / per_call)) if per_call else 1
+    batches = [inputs[i:i + k] for i in range(0, len(inputs) - k + 1, k)]
+    rounds = []
+    for _ in range(repeat):
+        setup()
+        gc.collect()
+        latencies = []
+        for batch in batches:
+            t = time.perf_counter()
+            for x in batch:
+                fn(x)
+            latencies.append((time.perf_counter() - t) / k)
+        result = summarize(latencies, sum(latencies) * k)
+        result["n"] = len(batches) * k
+        result["ops_s"] = round(1000 / result["mean_ms"], 1)      # pure call time
+        rounds.append(result)
+    return min(rounds, key=lambda r: r["mean_ms"])
+
+
+async def ameasure(
+    fn: Callable[[int], Awaitable[Any]], n: int, warmup: int = 5, concurrency: int = 1
+) -> Result:
+    """Await ``fn(i)`` for ``i < n`` with at most *concurrency* calls in flight."""
+    for i in range(warmup):
+        await fn(i)
+    gc.collect()
+    latencies: List[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            t = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - t)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return summarize(latencies, time.perf_counter() - t0)
@@ -0,0 +1,76 @@
+"""
+Micro-benchmarks of the calculators over realistic input distributions:
+monthly gross salaries log-normal around 3 900 €, the real mix of tax
+classes, church tax and child status, every IG Metall pay group.
+
+The uncached functions are timed directly; ``cache.*`` shows the memoised
+path the API uses, with the repeat rate of a UI re-rendering its inputs.
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List
+
+from backend.app import cache, payroll, tarif
+from backend.app.payroll import PayrollInputData
+from backend.app.tarif import TARIF_NRW_2025, TarifInputData
+from backend.bench.harness import Result, measure
+
+SEED = 2025
+
+
+def payroll_inputs(n: int, rnd: random.Random) -> List[PayrollInputData]:
+    out = []
+    for _ in range(n):
+        tax_class = rnd.choices((1, 2, 3, 4, 5, 6), weights=(50, 5, 15, 20, 5, 5))[0]
+        yearly = rnd.random() < 0.2
+        gross = round(min(max(rnd.lognormvariate(8.27, 0.45), 520.0), 25_000.0), 2)
+        out.append(PayrollInputData(
+            gross=gross * 12 if yearly else gross,
+            period="yearly" if yearly else "monthly",
+            tax_class=tax_class,
+            married=tax_class in (3, 4, 5) and rnd.random() < 0.9,
+            federal_state=rnd.choice(("NW", "NW", "BY", "BW", "HE", "BE")),
+            church=rnd.random() < 0.45,
+            childless=rnd.random() < 0.55,
+            additional_kv=rnd.choice((0.017, 0.025, 0.029)),
+        ))
+    return out
+
+
+def tarif_inputs(n: int, rnd: random.Random) -> List[TarifInputData]:
+    groups = list(TARIF_NRW_2025)
+    return [
+        TarifInputData(
+            entgeltgruppe=(eg := rnd.choice(groups)),
+            stufe=rnd.choice(list(TARIF_NRW_2025[eg])),
+            wochenstunden=rnd.choice((35, 35, 35, 30, 28, 20, 40)),
+            leistungszulage_pct=rnd.choice((0, 5, 10, 14)),
+            betriebszugehoerigkeit_monate=rnd.randrange(0, 480),
+        )
+        for _ in range(n)
+    ]
+
+
+def run(quick: bool = False) -> Dict[str, Result]:
+    rnd = random.Random(SEED)
+    n = 2_000 if quick else 20_000
+    pay = payroll_inputs(n, rnd)
+    tar = tarif_inputs(n // 4, rnd)
+    zve = [round(rnd.uniform(0, 300_000), 2) for _ in range(n)]
+    taxes = [payroll.income_tax(z) for z in zve]
+    nets = [(round(rnd.lognormvariate(7.9, 0.4), 2), {"tax_class": rnd.choice((1, 3, 4))})
+            for _ in range(n // 10)]
+    # a UI re-sends the same few inputs: 90 % repeats
+    repeats = [pay[rnd.randrange(n // 10)] for _ in range(n)]
+
+    results = {
+        "micro.income_tax": measure(payroll.income_tax, zve),
+        "micro.soli": measure(payroll.soli, taxes),
+        "micro.gross_to_net": measure(payroll.gross_to_net, pay),
+        "micro.net_to_gross": measure(lambda a: payroll.net_to_gross(a[0], **a[1]), nets),
+        "micro.berechne_nrw_2025": measure(tarif.berechne_nrw_2025, tar),
+        "micro.get_monthly_breakdown": measure(tarif.get_monthly_breakdown, tar),
+    }
+    results["micro.cache.gross_to_net"] = measure(cache.gross_to_net, repeats, setup=cache.clear)
+    return results
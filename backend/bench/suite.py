@@ -0,0 +1,152 @@
+"""
+Benchmark suite with stored baselines and a regression gate.
+
+    python -m backend.bench.suite run                        # every group
+    python -m backend.bench.suite run --only micro --quick
+    python -m backend.bench.suite run --save                 # refresh the baseline
+    python -m backend.bench.suite run --compare              # run, then gate
+    python -m backend.bench.suite compare results.json       # gate a stored run
+
+Groups: ``micro`` (calculators), ``endpoints`` (reads through the ASGI
+app), ``writes`` (edits, undo/redo, reset, mixed load).  The API groups run
+in-process against a throw-away SQLite database seeded by ``fixture.py``;
+with ``DATABASE_URL`` set that database is used instead (years 2090+ and
+2199 are overwritten).
+
+``compare`` exits with status 1 when a benchmark's p50 latency grew by more
+than ``--threshold`` (default 25 %), its p95 by more than ``--p95-threshold``
+(50 %), or its throughput fell by more than ``--threshold``.  Baselines are
+machine specific – refresh them with ``--save`` on the machine that gates.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx  # noqa: E402
+
+from backend.app import audit, jobs  # noqa: E402
+from backend.app.database import DATABASE_URL, async_engine  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.bench import endpoints, fixture, micro, writes  # noqa: E402
+
+GROUPS = ("micro", "endpoints", "writes")
+BASELINE = Path(__file__).parent / "baselines" / "default.json"
+RESULTS = Path(__file__).parent / "results.json"
+
+
+async def run_groups(groups, quick: bool) -> dict:
+    results = {}
+    if "micro" in groups:
+        results.update(micro.run(quick))
+    if {"endpoints", "writes"} & set(groups):
+        years = range(2090, 2093 if quick else 2097)
+        seeded = fixture.seed(years, log_rows=20_000 if quick else 200_000,
+                              rnd=random.Random(fixture.ROWS))
+        print(f"seeded {seeded}", file=sys.stderr)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if "endpoints" in groups:
+                results.update(await endpoints.run(client, years, quick))
+            if "writes" in groups:
+                results.update(await writes.run(client, years, quick))
+        jobs.runner.stop()
+        audit.writer.stop()
+        await async_engine.dispose()
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float, p95_threshold: float) -> list:
+    """Print a comparison table; return the regressions found."""
+    if current["meta"].get("quick") != baseline["meta"].get("quick"):
+        print("warning: comparing a --quick run with a full one", file=sys.stderr)
+    regressions = []
+    print(f"{'benchmark':34} {'p50 ms':>10} {'base':>10} {'Δ':>7} {'ops/s':>11} {'base':>11} {'Δ':>7}")
+    for name, cur in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:34} {cur['p50_ms']:>10.3f} {'(new)':>10}")
+            continue
+        d50 = cur["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        d95 = cur["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        dops = cur["ops_s"] / base["ops_s"] - 1 if base["ops_s"] else 0.0
+        flags = []
+        if d50 > threshold:
+            flags.append(f"p50 +{d50:.0%}")
+        if d95 > p95_threshold:
+            flags.append(f"p95 +{d95:.0%}")
+        if dops < -threshold:
+            flags.append(f"throughput {dops:.0%}")
+        if flags:
+            regressions.append(f"{name}: {', '.join(flags)}")
+        print(f"{name:34} {cur['p50_ms']:>10.3f} {base['p50_ms']:>10.3f} {d50:>+7.0%} "
+              f"{cur['ops_s']:>11.1f} {base['ops_s']:>11.1f} {dops:>+7.0%}"
+              + ("  << REGRESSION" if flags else ""))
+    return regressions
+
+
+def gate(current: dict, args) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())
+    regressions = compare(current, baseline, args.threshold, args.p95_threshold)
+    for r in regressions:
+        print(f"REGRESSION {r}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run benchmarks and write a results file")
+    r.add_argument("--only", default=",".join(GROUPS), help="comma-separated groups")
+    r.add_argument("--quick", action="store_true", help="smaller data and fewer calls")
+    r.add_argument("--out", default=str(RESULTS))
+    r.add_argument("--save", action="store_true", help="also store the run as the baseline")
+    r.add_argument("--compare", action="store_true", help="gate against the baseline")
+    c = sub.add_parser("compare", help="gate a results file against the baseline")
+    c.add_argument("results")
+    for q in (r, c):
+        q.add_argument("--baseline", default=str(BASELINE))
+        q.add_argument("--threshold", type=float, default=0.25)
+        q.add_argument("--p95-threshold", type=float, default=0.5)
+    args = p.parse_args()
+
+    if args.cmd == "compare":
+        return gate(json.loads(Path(args.results).read_text()), args)
+
+    groups = [g for g in args.only.split(",") if g]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        p.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+    current = {
+        "meta": {
+            "date": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "database": DATABASE_URL.split(":", 1)[0],
+            "quick": args.quick,
+        },
+        "results": asyncio.run(run_groups(groups, args.quick)),
+    }
+    Path(args.out).write_text(json.dumps(current, indent=2) + "\n")
+    print(f"results → {args.out}", file=sys.stderr)
+    if args.save:
+        if Path(args.baseline).exists():            # keep groups not re-run
+            old = json.loads(Path(args.baseline).read_text())["results"]
+            current = {**current, "results": {**old, **current["results"]}}
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.baseline).write_text(json.dumps(current, indent=2) + "\n")
+        print(f"baseline → {args.baseline}", file=sys.stderr)
+    return gate(current, args) if args.compare else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
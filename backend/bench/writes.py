@@ -0,0 +1,84 @@
+"""
+Write-heavy scenarios through the ASGI app: the UI's cell edit (open a
+revision, save the cell), pasting a block, undo/redo, row meta edits, a
+full year reset (chunked job, timed until it has finished) and a mixed
+read/write load with many clients.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Dict
+
+import httpx
+
+from backend.bench.fixture import COLS, ROWS
+from backend.bench.harness import Result, ameasure, summarize
+
+SCRATCH_YEAR = 2199
+
+
+async def run(client: httpx.AsyncClient, years: range, quick: bool = False) -> Dict[str, Result]:
+    n = 50 if quick else 300
+    year = years[-1]
+    rnd = random.Random(7)
+
+    async def ok(r: httpx.Response) -> httpx.Response:
+        r.raise_for_status()
+        return r
+
+    async def cell_edit(i: int) -> None:
+        rev = (await ok(await client.post(f"/api/finance/revision/{year}/redo"))).json()
+        await ok(await client.post("/api/finance/cell", json={
+            "year": year, "row": rnd.randrange(ROWS), "col": rnd.randrange(COLS),
+            "value": round(rnd.uniform(5, 400), 2), "revision": rev,
+        }))
+
+    async def paste(i: int) -> None:
+        r0 = rnd.randrange(ROWS - 15)
+        await ok(await client.post("/api/finance/cells", json=[
+            {"year": year, "row": r0 + r, "col": c, "value": i + r + c, "revision": 0}
+            for r in range(15) for c in range(COLS)
+        ]))
+
+    async def undo_redo(i: int) -> None:
+        await ok(await client.post(f"/api/finance/revision/{year}/{('undo', 'redo')[i % 2]}"))
+
+    async def save_row(i: int) -> None:
+        await ok(await client.post("/api/finance/row", json={
+            "year": year, "row": i % ROWS, "position": i % ROWS,
+            "description": f"Posten {i}", "deleted": False, "irregular": i % 2 == 0,
+        }))
+
+    async def mixed(i: int) -> None:
+        if i % 5 == 0:
+            await cell_edit(i)
+        else:
+            await ok(await client.get(f"/api/finance/{years[i % len(years)]}"))
+
+    results = {
+        "write.cell_edit": await ameasure(cell_edit, n),
+        "write.paste_210_cells": await ameasure(paste, n // 5),
+        "write.undo_redo": await ameasure(undo_redo, n),
+        "write.save_row": await ameasure(save_row, n),
+        "write.mixed.concurrent": await ameasure(mixed, n * 2, concurrency=32),
+    }
+
+    # reset: re-import a full year each round, time only reset + job
+    export = (await ok(await client.get(f"/api/finance/{years[0]}/export?format=binary"))).content
+    latencies = []
+    t_total = 0.0
+    for _ in range(3 if quick else 10):
+        await ok(await client.post(f"/api/finance/{SCRATCH_YEAR}/import?format=binary",
+                                   content=export))
+        t = time.perf_counter()
+        job = (await ok(await client.delete(f"/api/finance/{SCRATCH_YEAR}/reset"))).json()
+        while job["status"] in ("queued", "running"):
+            await asyncio.sleep(0.005)
+            job = (await ok(await client.get(f"/api/jobs/{job['id']}"))).json()
+        assert job["status"] == "done", job
+        latencies.append(time.perf_counter() - t)
+        t_total += latencies[-1]
+    results["write.reset_year"] = summarize(latencies, t_total)
+    return results
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from backend.app import auth
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_tokens_round_trip_and_reject_tampering_and_expiry():
+    token = auth.create_access_token({"sub": "7"}, timedelta(minutes=5))
+    assert auth.decode_token(token)["sub"] == "7"
+
+    header, payload, signature = token.split(".")
+    forged = auth.create_access_token({"sub": "8"}).split(".")[1]
+    for bad in (f"{header}.{forged}.{signature}", token[:-2], "a.b", "",
+                auth.create_access_token({"sub": "7"}, timedelta(seconds=-1))):
+        with pytest.raises(auth.TokenError):
+            auth.decode_token(bad)
+
+
+def test_login_rehashes_outdated_cost(monkeypatch):
+    old = auth.get_password_hash("geheim", rounds=4)
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 5)
+    assert auth.verify_and_update("falsch", old) == (False, None)
+    ok, new = auth.verify_and_update("geheim", old)
+    assert ok and new.startswith("$2b$05$") and auth.verify_password("geheim", new)
+    assert auth.verify_and_update("geheim", new) == (True, None)
+    assert auth.verify_and_update("geheim", None) == (False, None)     # unknown user
+
+
+def test_hash_pool_admits_a_bounded_number_of_calls():
+    pool = auth.HashPool(workers=1, max_pending=2)
+    gate = threading.Event()
+
+    async def storm():
+        calls = [asyncio.ensure_future(pool.run(gate.wait, 5)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(storm())
+    assert results[:2] == [True, True]
+    assert all(isinstance(r, auth.PoolBusy) for r in results[2:])
+    assert pool.stats()["rejected"] == 2 and pool.pending == 0
+    pool.shutdown()
+
+
+def test_token_cache_respects_ttl_and_invalidation():
+    cache = auth.TokenCache(maxsize=2, ttl=60)
+    alice, bob = auth.AuthUser(1, "a@x"), auth.AuthUser(2, "b@x")
+    cache.put("t1", alice, time.time() + 600)
+    cache.put("t2", bob, time.time() - 1)           # token already expired
+    assert cache.get("t1") == alice and cache.get("t2") is None
+    cache.invalidate_user(1)
+    assert cache.get("t1") is None
+
+
+def test_protected_routes_need_a_token(tmp_path):
+    code = """
+        from fastapi.testclient import TestClient
+        from backend.app import auth, models
+        from backend.app.database import SessionLocal, migrate_db
+        from backend.app.main import app
+
+        migrate_db()
+        with SessionLocal() as s:
+            s.add(models.User(email="a@example.org",
+                              hashed_password=auth.get_password_hash("geheim", rounds=4)))
+            s.commit()
+        with TestClient(app) as client:
+            print(client.get("/api/finance/2025").status_code)
+            bad = client.post("/api/auth/token", json={"email": "a@example.org", "password": "x"})
+            r = client.post("/api/auth/token", json={"email": "a@example.org", "password": "geheim"})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+            print(bad.status_code, r.status_code)
+            print(client.get("/api/auth/me", headers=headers).json()["email"])
+            print(client.get("/api/finance/2025", headers=headers).status_code)
+            print(client.get("/api/finance/2025", headers={"Authorization": "Bearer x.y.z"}).status_code)
+            print(auth.token_cache.stats()["hits"])
+            with SessionLocal() as s:             # upgraded to the configured cost
+                print(s.query(models.User).one().hashed_password[:7])
+            change = {"password": "geheim", "new_password": "neu"}
+            print(client.post("/api/auth/password", json=change, headers=headers).status_code,
+                  client.get("/api/auth/me", headers=headers).status_code)   # token revoked
+    """
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "AUTH_ENABLED": "1", "BCRYPT_ROUNDS": "5",
+           "AUTH_SECRET_KEY": "test-key", "DATABASE_URL": f"sqlite:///{tmp_path / 'auth.db'}"}
+    out = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], env=env, cwd=ROOT,
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.split("\n")[:6] == ["401", "401 200", "a@example.org", "200", "401", "1"]
+    assert out.stdout.split("\n")[6:8] == ["$2b$05$", "204 401"]
+
+    env.pop("AUTH_SECRET_KEY")                    # default key: refuse to start
+    out = subprocess.run([sys.executable, "-c", "import backend.app.auth"], env=env, cwd=ROOT,
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode != 0 and "AUTH_SECRET_KEY" in out.stderr
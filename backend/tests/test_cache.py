@@ -0,0 +1,42 @@
+from backend.app.cache import ResultCache
+
+
+def test_lru_eviction_and_rule_invalidation():
+    rules = {"rate": 1}
+    c = ResultCache("t", 2, lambda: rules["rate"])
+    for key in ("a", "b", "a", "c"):
+        c.get(key, lambda: key.upper())
+    assert c.stats()["evictions"] == 1          # "b" was least recently used
+    assert c.get("a", lambda: "miss") == "A"
+    assert c.get("b", lambda: "miss") == "miss"
+
+    rules["rate"] = 2
+    assert c.get("a", lambda: "fresh") == "fresh"
+    assert c.stats()["invalidations"] == 1
+
+
+def test_values_computed_across_a_rule_change_are_not_kept():
+    rules = {"rate": 1}
+    c = ResultCache("t", 4, lambda: rules["rate"])
+
+    def compute_while_rules_change():
+        rules["rate"] = 2
+        assert c.get("b", lambda: "new") == "new"   # another caller, new rules
+        return "old"
+
+    assert c.get("a", compute_while_rules_change) == "old"
+    assert c.get("a", lambda: "recomputed") == "recomputed"
+    assert c.get("b", lambda: "miss") == "new"
+
+
+def test_tarif_fingerprint_is_cheap_and_follows_a_new_table(monkeypatch):
+    import pytest
+    from types import MappingProxyType
+    from backend.app import cache, tarif
+
+    assert cache._tarif_rules()[0] is tarif.TARIF_NRW_2025
+    with pytest.raises(TypeError):
+        tarif.TARIF_NRW_2025["EG 1"]["Grundentgelt"] = 1.0
+    before = cache._tarif_rules()
+    monkeypatch.setattr(tarif, "TARIF_NRW_2025", MappingProxyType({"EG 1": {"Grundentgelt": 1.0}}))
+    assert cache._tarif_rules() != before
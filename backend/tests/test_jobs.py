@@ -0,0 +1,46 @@
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, select
+
+from backend.app import jobs, models
+
+
+def _wait(job):
+    while job.status not in jobs.FINISHED:
+        time.sleep(0.01)
+    return job
+
+
+def test_reset_year_deletes_in_chunks_and_can_be_cancelled(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(jobs, "SessionLocal", sessionmaker(bind=engine, class_=Session))
+    monkeypatch.setattr(jobs, "log_action", lambda *a: None)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(models.FinanceCell.__table__), [
+            {"year": y, "row": r, "col": 0, "value": 1, "revision": 0, "ts": now}
+            for y in (2024, 2025) for r in range(250)
+        ])
+
+    runner = jobs.JobRunner()
+    monkeypatch.setattr(jobs, "JOB_CHUNK", 100)
+    job = _wait(runner.submit("reset_year", year=2025))
+    assert (job.status, job.done, job.total) == ("done", 250, 250)
+
+    # cancel from inside the first chunk: the job stops after it
+    cancel_all = lambda *a: [runner.cancel(j.id) for j in runner.list()]  # noqa: E731
+    monkeypatch.setattr(jobs.snapshots.cache, "invalidate", cancel_all)
+    job = _wait(runner.submit("reset_year", year=2024))
+    runner.stop()
+    assert (job.status, job.done) == ("cancelled", 100)
+
+    with Session(engine) as s:
+        years = s.exec(select(models.FinanceCell.year)).all()
+    assert years == [2024] * 150
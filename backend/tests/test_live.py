@@ -0,0 +1,146 @@
+import asyncio
+
+from backend.app import live
+from backend.app.snapshots import BOOT
+
+
+def test_changes_are_coalesced_versioned_and_replayed():
+    async def scenario():
+        broker = live.Broker(window=0.01, buffer=2)
+        sub = broker.subscribe(2025)
+        broker.receive(2025, {"cells": [{"row": 1, "col": 0, "revision": 0, "value": 1.0}]})
+        broker.receive(2025, {"cells": [{"row": 1, "col": 0, "revision": 0, "value": 2.0}]})
+        broker.receive(2025, {"cells": [{"row": 2, "col": 0, "revision": 0, "value": 5.0}],
+                              "cleared": [2]})
+        broker.receive(2024, {"revision": 3})
+        first = await asyncio.wait_for(sub.queue.get(), 1)
+
+        for v in (3.0, 4.0, 5.0):                  # three more windows
+            broker.receive(2025, {"rows": [{"row": 1, "description": str(v)}]})
+            await asyncio.sleep(0.03)
+        broker.unsubscribe(sub)
+        return first, broker
+
+    first, broker = asyncio.run(scenario())
+    assert first["version"] == 1
+    assert first["cleared"] == [2]
+    # cells of a cleared row stay dropped, a later write in the window survives
+    assert first["cells"] == [{"row": 1, "col": 0, "revision": 0, "value": 2.0},
+                              {"row": 2, "col": 0, "revision": 0, "value": 5.0}]
+    assert broker.version(2024) == 1 and broker.version(2025) == 4
+
+    assert [m["version"] for m in broker.missed(2025, f"{BOOT}-2")] == [3, 4]
+    assert broker.missed(2025, f"{BOOT}-4") == []
+    # left the buffer, or an id from another process → refetch
+    assert broker.missed(2025, f"{BOOT}-1") == [{"version": 4, "resync": True}]
+    assert broker.missed(2025, "deadbeef-4") == [{"version": 4, "resync": True}]
+
+
+def test_snapshot_invalidations_reach_the_other_workers(monkeypatch):
+    from backend.app import snapshots
+
+    cache = snapshots.SnapshotCache()
+    monkeypatch.setattr(snapshots, "cache", cache)
+    shared = []
+    cache.on_invalidate.append(lambda year, kinds: shared.append((year, kinds)))
+    cache.invalidate(2025, snapshots.ROWS)
+    assert shared == [(2025, (snapshots.ROWS,))]
+
+    pg = live.PostgresBackend("postgresql://unused")
+    pg._pid = 1
+    payload = '{"cache":"snapshots","key":[2025,["cells"]]}'
+    before = cache.version(2025, snapshots.CELLS)
+    pg._on_notify(None, 1, live.NOTIFY_CHANNEL, payload)      # our own echo
+    assert cache.version(2025, snapshots.CELLS) == before
+    pg._on_notify(None, 2, live.NOTIFY_CHANNEL, payload)      # another worker
+    assert cache.version(2025, snapshots.CELLS) == before + 1
+    assert len(shared) == 1                                   # not sent around again
+
+
+def test_settings_saves_drop_the_group_in_the_other_workers(monkeypatch):
+    from backend.app import settings
+
+    cache = settings.SettingsCache()
+    monkeypatch.setattr(settings, "cache", cache)
+    shared = []
+    cache.on_invalidate.append(shared.append)
+    cache.put("tarif", {"n": 1})
+    assert shared == ["tarif"]
+
+    pg = live.PostgresBackend("postgresql://unused")
+    pg._pid = 1
+    pg._on_notify(None, 2, live.NOTIFY_CHANNEL, '{"cache":"settings","key":"tarif"}')
+    assert cache.get("tarif") is None and shared == ["tarif"]
+
+
+def test_postgres_backend_reconnects_and_resyncs(monkeypatch):
+    import asyncpg
+    from backend.app import snapshots
+
+    class FakeConn:
+        pids = iter(range(10, 20))
+
+        def __init__(self):
+            self.pid, self.sent, self.closed = next(self.pids), [], False
+
+        async def add_listener(self, channel, callback):
+            pass
+
+        def add_termination_listener(self, callback):
+            self.terminate = lambda: callback(self)
+
+        def get_server_pid(self):
+            return self.pid
+
+        def is_closed(self):
+            return self.closed
+
+        async def execute(self, _sql, _channel, payload):
+            self.sent.append(payload)
+
+        async def close(self):
+            self.closed = True
+
+    attempts = []
+
+    async def connect(_dsn):
+        attempts.append(1)
+        if len(attempts) == 2:                      # the first reconnect fails
+            raise OSError("connection refused")
+        return FakeConn()
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(live, "LIVE_RECONNECT_MAX", 0.01)
+    cache = snapshots.SnapshotCache()
+    monkeypatch.setattr(snapshots, "cache", cache)
+
+    async def scenario():
+        pg = live.PostgresBackend("postgresql://unused")
+        await pg.start()
+        first = pg._conn
+        sub = live.broker.subscribe(2025)
+        cache.put(2025, snapshots.CELLS, None, 0, b"[]")
+        etag = cache.current_etag(2025, snapshots.CELLS)
+
+        first.closed = True
+        first.terminate()
+        pg.send(2025, {"revision": 1})              # dropped while away
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if pg._conn is not None and pg._conn.sent:
+                break
+        assert len(attempts) == 3 and pg._conn is not first and pg._pid == pg._conn.pid
+        assert pg._conn.sent == ['{"lost": true}'] and first.sent == []
+        assert cache.get(2025, snapshots.CELLS) is None
+        assert cache.current_etag(2025, snapshots.CELLS) != etag
+        assert cache.current_etag(2024, snapshots.ROWS) != cache.etag(2024, snapshots.ROWS, None, 0)
+        msg = await asyncio.wait_for(sub.queue.get(), 1)
+        assert msg["resync"] is True
+
+        pg._on_notify(None, 99, live.NOTIFY_CHANNEL, '{"lost": true}')   # another worker
+        assert (await asyncio.wait_for(sub.queue.get(), 1))["resync"] is True
+        live.broker.unsubscribe(sub)
+        await pg.stop()
+        assert pg._conn is None
+
+    asyncio.run(scenario())
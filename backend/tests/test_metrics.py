@@ -0,0 +1,69 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from backend.app import metrics
+
+
+def test_routes_are_labelled_by_template_and_streams_not_timed():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/probe/{year}")
+    def probe(year: int):
+        return {"year": year}
+
+    @app.get("/probe-stream")
+    def probe_stream():
+        return StreamingResponse(iter(["data: x\n\n"]), media_type="text/event-stream")
+
+    client = TestClient(app)
+    for year in (2024, 2025, 2026):
+        client.get(f"/probe/{year}")
+    client.get("/probe/abc")                        # 422, same template
+    client.get("/probe-stream")
+
+    assert metrics.http_requests.value("GET", "/probe/{year}", "200") == 3
+    assert metrics.http_requests.value("GET", "/probe/{year}", "422") == 1
+    assert metrics.http_duration.count("GET", "/probe/{year}") == 4
+    assert metrics.http_requests.value("GET", "/probe-stream", "200") == 1
+    assert metrics.http_duration.count("GET", "/probe-stream") == 0
+
+    body = metrics.render()
+    assert '# TYPE finance_http_requests counter' in body
+    assert 'finance_http_requests_total{method="GET",route="/probe/{year}",status="200"} 3' in body
+    assert ('finance_http_request_duration_seconds_bucket'
+            '{method="GET",route="/probe/{year}",le="+Inf"} 4') in body
+
+
+def test_statements_and_pool_checkouts_are_timed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    metrics.instrument_engine(engine, "test")
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+        for _ in range(3):
+            conn.execute(text("SELECT x FROM t"))
+        conn.execute(text("\n  select x from t"))
+
+    assert metrics.db_duration.count("test", "SELECT") == 4
+    assert metrics.db_duration.count("test", "INSERT") == 1
+    assert metrics.db_checkout_wait.count("test") == 1
+    engine.dispose()                                # recreated pool keeps the timing
+    with engine.connect():
+        pass
+    assert metrics.db_checkout_wait.count("test") == 2
+    assert 'finance_db_pool_connections{engine="test",state=' in metrics.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.calc_duration
+    for seconds in (0.000001, 0.00003, 0.00003, 1.0):
+        h.observe(seconds, "probe")
+    lines = [l for l in metrics.render().splitlines() if 'calculator="probe"' in l]
+    assert 'finance_calculator_duration_seconds_bucket{calculator="probe",le="1e-05"} 1' in lines
+    assert 'finance_calculator_duration_seconds_bucket{calculator="probe",le="5e-05"} 3' in lines
+    assert 'finance_calculator_duration_seconds_bucket{calculator="probe",le="0.25"} 3' in lines
+    assert 'finance_calculator_duration_seconds_bucket{calculator="probe",le="+Inf"} 4' in lines
+    assert 'finance_calculator_duration_seconds_count{calculator="probe"} 4' in lines
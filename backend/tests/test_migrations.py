@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, insert, text
+from sqlmodel import Session, SQLModel
+
+from backend.app import migrations, models, revisions
+
+
+def test_legacy_database_is_migrated_to_head(caplog):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        SQLModel.metadata.create_all(conn)
+        for name in ("ux_financecell_cell", "ix_financecell_year_revision", "ux_financerow_row"):
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("CREATE INDEX ix_financecell_year ON financecell (year)"))
+        now = datetime.utcnow()
+        conn.execute(insert(models.FinanceCell.__table__), [
+            {"year": 2025, "row": 0, "col": 0, "value": v, "revision": rev, "ts": now}
+            for v, rev in ((1, 0), (2, 0), (5, 1))
+        ])
+
+    with engine.begin() as conn, caplog.at_level("INFO", logger=migrations.__name__):
+        assert migrations.migrate(conn) == migrations.HEAD
+        applied = len(caplog.records)
+        assert migrations.migrate(conn) == migrations.HEAD         # idempotent
+        assert applied == migrations.HEAD == len(caplog.records)   # logged, once each
+        names = {i["name"] for i in inspect(conn).get_indexes("financecell")}
+    assert names == {"ux_financecell_cell", "ix_financecell_year_revision"}
+
+    with Session(engine) as s:
+        assert revisions.snapshot(s, 2025) == [
+            {"year": 2025, "row": 0, "col": 0, "value": 5.0, "revision": 1}
+        ]
+        assert revisions.snapshot(s, 2025, 0)[0]["value"] == 2.0   # newest duplicate kept
+        assert revisions.revision_bounds(s, 2025) == (0, 1)
+
+
+def test_settings_history_is_compacted_into_current_values():
+    from backend.app import settings
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        SQLModel.metadata.create_all(conn)
+        conn.execute(text("DROP INDEX ix_setting_group_ts"))
+        conn.execute(insert(models.Setting.__table__), [
+            {"group": g, "data": {"n": i}, "ts": datetime(2025, 1, 1, 0, 0, i)}
+            for i in range(40) for g in ("payroll", "tarif")
+        ])
+        conn.execute(text("DELETE FROM currentsetting"))
+
+    with engine.begin() as conn:
+        migrations.migrate(conn)
+        current = dict(conn.execute(text('SELECT "group", data FROM currentsetting')).all())
+        kept = conn.execute(text("SELECT count(*) FROM setting")).scalar_one()
+    assert current == {"payroll": '{"n": 39}', "tarif": '{"n": 39}'}
+    assert kept == 2 * settings.SETTINGS_HISTORY
@@ -7,3 +7,169 @@ def test_gross_to_net_basic():
     res = gross_to_net(inp)
     assert res.net > 0
 
+
+
+def test_batch_matches_scalar_to_the_cent():
+    import numpy as np
+    from backend.app.payroll_batch import gross_to_net_batch
+
+    rng = np.random.default_rng(0)
+    n = 2_000
+    cols = {
+        "gross": rng.uniform(0, 30_000, n).round(2),
+        "period": rng.choice(["monthly", "yearly"], n),
+        "tax_class": rng.choice([1, 2, 3, 4, 5, 6], n),
+        "married": rng.random(n) < 0.5,
+        "federal_state": rng.choice(["NW", "BY", "HE"], n),
+        "church": rng.random(n) < 0.5,
+        "childless": rng.random(n) < 0.5,
+        "additional_kv": rng.choice([0.0, 0.017, 0.025], n),
+    }
+    batch = gross_to_net_batch(**cols)
+    for i in range(n):
+        row = {k: v[i].item() for k, v in cols.items()}
+        assert gross_to_net(PayrollInputData(**row)).asdict() == {
+            k: v[i] for k, v in batch.items()
+        }
+
+
+def test_net_to_gross_inverts_gross_to_net():
+    from backend.app.payroll import net_to_gross
+
+    for target, kwargs in [
+        (2_500, {}),
+        (3_100.55, {"tax_class": 3, "church": True}),
+        (5_900, {"tax_class": 6, "childless": False}),
+        (48_000, {"period": "yearly", "married": True}),
+    ]:
+        gross, res = net_to_gross(target, **kwargs)
+        assert res == gross_to_net(PayrollInputData(gross=gross, **kwargs))
+        assert res.net >= target
+        below = gross_to_net(PayrollInputData(gross=round(gross - 0.01, 2), **kwargs))
+        assert below.net < target
+
+
+def test_net_to_gross_is_minimal_with_one_evaluation(monkeypatch):
+    import random
+    from backend.app import payroll
+
+    rnd = random.Random(5)
+    cases = [(round(rnd.uniform(100, 9_000), 2),
+              {"tax_class": rnd.choice([1, 3, 5, 6]), "church": rnd.random() < 0.5})
+             for _ in range(500)]
+    for _, kwargs in cases:                         # warm segment tables
+        payroll._segments(payroll._profile(PayrollInputData(gross=0, **kwargs)))
+    calls = []
+    evaluate = payroll.gross_to_net
+    monkeypatch.setattr(payroll, "gross_to_net", lambda d: calls.append(d) or evaluate(d))
+    monkeypatch.setattr(payroll, "_net_monthly", lambda *a: calls.append(a))
+    for target, kwargs in cases:
+        calls.clear()
+        gross, res = payroll.net_to_gross(target, **kwargs)
+        assert len(calls) == 1 and res.net >= target
+        assert evaluate(PayrollInputData(gross=round(gross - 0.01, 2), **kwargs)).net < target
+
+
+def test_net_curve_follows_scalar_between_kinks():
+    from backend.app.payroll_batch import curve_table, net_curve
+
+    table = curve_table((1, False, "NW", True, True, 0.025))
+    curve = net_curve(table, 0, 12_000, 7.5)
+    for g, net in zip(curve["gross"][::40], curve["net"][::40]):
+        ref = gross_to_net(PayrollInputData(gross=g, church=True)).net
+        assert abs(ref - net) <= 0.01
+
+
+def test_sonstiger_bezug_is_not_annualised():
+    from backend.app.payroll import sonstiger_bezug
+
+    profile = (1, False, "NW", False, True, 0.025)
+    tax, _, _ = sonstiger_bezug(12 * 4_000, 3_000, profile)
+    annualised = (
+        gross_to_net(PayrollInputData(gross=7_000)).income_tax
+        - gross_to_net(PayrollInputData(gross=4_000)).income_tax
+    )
+    assert 0 < tax < annualised
+
+
+def test_results_are_frozen_and_serialize_like_the_response_model():
+    import dataclasses
+    import orjson
+    import pytest
+    from backend.app import schemas
+    from backend.app.responses import dumps
+
+    res = gross_to_net(PayrollInputData(gross=4123.45, tax_class=3, church=True))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        res.net = 0
+    assert not hasattr(res, "__dict__")
+    assert res.asdict() == dataclasses.asdict(res)
+    assert orjson.loads(dumps(res)) == schemas.PayrollResult(**res.asdict()).model_dump()
+
+
+def test_special_sv_is_capped_by_the_pro_rata_ceiling():
+    import numpy as np
+    from backend.app.income import _special_sv
+    from backend.app.payroll import (
+        AV_RATE, BBG_KV_PV, BBG_RV_AV, KV_GENERAL, PV_BASE, PV_CHILDLESS_SURCH, RV_RATE,
+    )
+
+    kv_pv = (KV_GENERAL + 0.025) / 2 + PV_BASE / 2 + PV_CHILDLESS_SURCH
+    rv_av = (RV_RATE + AV_RATE) / 2
+    regular, special = np.full(12, 3_000.0), np.zeros(12)
+    special[5] = special[6] = 100_000.0             # far above any remaining room
+    sv = _special_sv(regular, special, True, 0.025)
+
+    june = (6 * BBG_KV_PV - 6 * 3_000) * kv_pv + (6 * BBG_RV_AV - 6 * 3_000) * rv_av
+    july = (BBG_KV_PV - 3_000) * kv_pv + (BBG_RV_AV - 3_000) * rv_av
+    assert np.isclose(sv[5], june) and np.isclose(sv[6], july)
+    assert not sv[np.r_[0:5, 7:12]].any()
+
+    special[:] = 0
+    special[10] = 500.0                             # room left: fully contributory
+    assert np.isclose(_special_sv(regular, special, True, 0.025)[10], 500 * (kv_pv + rv_av))
+    above = np.full(12, BBG_RV_AV + 1)              # ceilings used up by regular pay
+    assert not _special_sv(above, special, False, 0.025).any()
+
+
+def test_monthly_net_rows_add_up_to_the_year():
+    from backend.app.income import TOTAL_FIELDS, monthly_net
+    from backend.app.tarif import TarifInputData, get_monthly_breakdown
+
+    for eg, stufe, hours in [("EG 1", "Grundentgelt", 35), ("EG 14", "nach 36. Monat", 40)]:
+        tarif = TarifInputData(entgeltgruppe=eg, stufe=stufe, wochenstunden=hours,
+                               leistungszulage_pct=14, betriebszugehoerigkeit_monate=60)
+        res = monthly_net(tarif, (1, False, "NW", True, True, 0.025))
+        months = res["monate"]
+        assert [m["Brutto"] for m in months] == [m["Brutto"] for m in get_monthly_breakdown(tarif)]
+        for m in months:
+            deductions = (m["Lohnsteuer"] + m["Solidaritaet"] + m["Kirchensteuer"]
+                          + m["Sozialversicherung"])
+            # net and each deduction are rounded to cents separately
+            assert abs(m["Brutto"] - deductions - m["Netto"]) <= 0.02
+        for k in TOTAL_FIELDS:
+            assert res["jahr"][k] == round(sum(m[k] for m in months), 2)
+
+
+def test_tarif_net_route_returns_the_year(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.app import api
+
+    logged = []
+    monkeypatch.setattr(api, "log_action", lambda action, details: logged.append(details))
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    client = TestClient(app)
+
+    body = {"tarif": {"entgeltgruppe": "EG 9", "stufe": "Grundentgelt"},
+            "payroll": {"tax_class": 3, "church": True}}
+    res = client.post("/api/tarif/net", json=body)
+    assert res.status_code == 200
+    data = res.json()
+    assert len(data["monate"]) == 12
+    for k, total in data["jahr"].items():
+        assert total == round(sum(m[k] for m in data["monate"]), 2)
+    assert logged[0]["jahr"] == data["jahr"]
+    bad = {"tarif": {"entgeltgruppe": "EG 12", "stufe": "Grundentgelt"}}
+    assert client.post("/api/tarif/net", json=bad).status_code == 422
@@ -0,0 +1,43 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from backend.app import profiler
+
+
+def test_profiled_requests_report_statements_repeats_and_plans(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(profiler, "SQL_PROFILE", "header")
+    monkeypatch.setattr(profiler, "SQL_PROFILE_ENABLED", True)
+    monkeypatch.setattr(profiler, "SLOW_REQUEST_MS", 10_000)
+    monkeypatch.setattr(profiler, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(profiler, "SQL_PROFILE_REPEAT", 3)
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    profiler.instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, x INTEGER)"))
+
+    app = FastAPI()
+    app.add_middleware(profiler.ProfilerMiddleware)
+
+    @app.post("/n-plus-one")
+    def n_plus_one():                       # sync handler: runs in the threadpool
+        with engine.begin() as conn:
+            for i in range(4):
+                conn.execute(text("SELECT x FROM t WHERE id = :id"), {"id": i})
+            conn.execute(text("INSERT INTO t (x) VALUES (1)"))
+        return {}
+
+    client = TestClient(app)
+    assert "server-timing" not in client.post("/n-plus-one").headers
+    with caplog.at_level(logging.WARNING, logger=profiler.__name__):
+        r = client.post("/n-plus-one", headers={"X-SQL-Profile": "1"})
+
+    timing = r.headers["server-timing"]
+    assert 'db;dur=' in timing and 'desc="5 statements"' in timing
+    assert 'commit;desc="1"' in timing and 'repeat;desc="3"' in timing
+    (record,) = caplog.records
+    assert "repeated 4×" in record.message
+    assert "SELECT x FROM t WHERE id = ?" in record.message
+    assert "plan:" in record.message and "USING INTEGER PRIMARY KEY" in record.message
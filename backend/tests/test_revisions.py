@@ -0,0 +1,57 @@
+import random
+
+from sqlalchemy import create_engine, func, select
+from sqlmodel import Session, SQLModel
+
+from backend.app import models, revisions, schemas
+from backend.app.api import upsert_cells
+
+
+def test_range_query_matches_per_year_snapshots():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    rnd = random.Random(3)
+    with Session(engine) as s:
+        upsert_cells(s, [
+            schemas.Cell(year=y, row=r, col=c, value=rnd.randint(1, 99), revision=rnd.randrange(3))
+            for y in (2021, 2023) for r in range(4) for c in range(13)
+        ])
+        ranged = [dict(r._mapping) for r in s.execute(revisions.range_query(2020, 2024))]
+        per_year = [c for y in range(2020, 2025) for c in revisions.snapshot(s, y)]
+        key = lambda c: (c["year"], c["row"], c["col"])  # noqa: E731
+        assert ranged == sorted(per_year, key=key)
+
+        totals = {(r.year, r.row): r.total
+                  for r in s.execute(revisions.range_totals_query(2020, 2024))}
+        for (y, row), total in totals.items():
+            assert total == sum(c["value"] for c in per_year
+                                if (c["year"], c["row"]) == (y, row) and c["col"] < 12)
+
+
+def test_compaction_folds_one_revision_and_keeps_the_window(monkeypatch):
+    from sqlalchemy import event
+
+    monkeypatch.setattr(revisions, "UNDO_DEPTH", 3)
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        upsert_cells(s, [schemas.Cell(year=2025, row=r, col=c, value=1, revision=0)
+                         for r in range(100) for c in range(12)])
+        history = {}
+        written = []
+        event.listen(engine, "after_cursor_execute",
+                     lambda conn, cur, stmt, *a: written.append(cur.rowcount)
+                     if stmt.startswith(("UPDATE", "DELETE")) else None)
+        for rev in range(1, 9):
+            written.clear()
+            revisions.compact(s, 2025)                       # what opening a revision does
+            assert sum(written) <= 1                         # never re-tags the base
+            upsert_cells(s, [schemas.Cell(year=2025, row=0, col=0, value=rev, revision=rev)])
+            history[rev] = revisions.snapshot(s, 2025, rev)
+
+        floor, latest = revisions.revision_bounds(s, 2025)
+        assert (floor, latest) == (5, 8)
+        for rev in range(floor, latest + 1):
+            assert revisions.snapshot(s, 2025, rev) == history[rev]
+        assert s.execute(select(func.count()).where(
+            models.FinanceCell.row == 0, models.FinanceCell.col == 0)).scalar_one() == 5  # 4 … 8
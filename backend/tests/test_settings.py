@@ -0,0 +1,29 @@
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from backend.app import models, settings
+
+
+def test_save_upserts_current_value_and_bounds_history(monkeypatch):
+    monkeypatch.setattr(settings, "SETTINGS_HISTORY", 3)
+    monkeypatch.setattr(settings, "cache", settings.SettingsCache())
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        assert settings.load(s, "tarif") == {}
+        for i in range(10):
+            settings.save(s, "tarif", {"n": i})
+        s.commit()
+        settings.cache.put("tarif", {"n": 9})
+
+        assert len(s.exec(select(models.CurrentSetting)).all()) == 1
+        history = s.exec(select(models.Setting.data)).all()
+        assert sorted(h["n"] for h in history) == [7, 8, 9]
+        assert s.get(models.CurrentSetting, "tarif").data == {"n": 9}
+
+    generation = settings.cache.generation("tarif")
+    settings.cache.fill("tarif", {"n": 0}, generation)   # a stale read never wins
+    assert settings.load(None, "tarif") == {"n": 9}
+
+    settings.cache.drop("tarif")                    # another worker saved it
+    settings.cache.fill("tarif", {"n": 0}, generation)   # read from before the drop
+    assert settings.cache.get("tarif") is None
@@ -0,0 +1,55 @@
+from backend.app.snapshots import CELLS, ROWS, SnapshotCache, etag_matches
+
+
+def test_versioned_entries_and_precise_invalidation():
+    c = SnapshotCache(maxsize=8)
+    v = c.version(2025, CELLS)
+    c.put(2025, CELLS, None, v, b"[1]")
+    c.put(2025, ROWS, None, c.version(2025, ROWS), b"{}")
+    c.put(2024, CELLS, None, c.version(2024, CELLS), b"[0]")
+    tag = c.current_etag(2025, CELLS)
+    assert c.get(2025, CELLS) == b"[1]"
+
+    c.invalidate(2025, CELLS)
+    assert c.get(2025, CELLS) is None
+    assert c.get(2025, ROWS) == b"{}" and c.get(2024, CELLS) == b"[0]"
+    assert not etag_matches(tag, c.current_etag(2025, CELLS))
+
+    # a read that started before the write must not be cached
+    c.put(2025, CELLS, None, v, b"[stale]")
+    assert c.get(2025, CELLS) is None
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
+
+
+def test_cached_and_not_modified_reads_are_audited(monkeypatch):
+    import asyncio
+
+    from starlette.requests import Request
+
+    from backend.app import api, snapshots
+
+    logged = []
+    monkeypatch.setattr(api, "log_action", lambda action, info: logged.append(action))
+    monkeypatch.setattr(snapshots, "cache", SnapshotCache())
+    snapshots.cache.put(2025, CELLS, None, 0, b"[]")
+    snapshots.cache.put(2025, ROWS, None, 0, b"{}")
+    tag = snapshots.cache.current_etag(2025, CELLS).encode()
+
+    def request(headers=()):
+        return Request({"type": "http", "method": "GET", "headers": list(headers)})
+
+    async def reads():
+        return [
+            (await api.finance_year(2025, request(), None, s=None)).status_code,
+            (await api.finance_year(2025, request([(b"if-none-match", tag)]), None,
+                                    s=None)).status_code,
+            (await api.finance_rows(2025, request(), s=None)).status_code,
+        ]
+
+    assert asyncio.run(reads()) == [200, 304, 200]
+    assert logged == ["finance_year", "finance_year", "finance_rows"]
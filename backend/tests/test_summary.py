@@ -0,0 +1,64 @@
+import random
+
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel
+
+from backend.app import models, schemas, summary
+from backend.app.api import upsert_cells
+
+
+def test_incremental_totals_match_rebuild():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    rnd = random.Random(7)
+    with Session(engine) as s:
+        s.add(models.FinanceRow(year=2025, row=1, description="Gehalt", income=True))
+        s.add(models.FinanceRow(year=2025, row=2, description="Urlaub", irregular=True))
+        for _ in range(300):
+            upsert_cells(s, [schemas.Cell(
+                year=rnd.choice((2024, 2025)), row=rnd.randrange(5), col=rnd.randrange(14),
+                value=rnd.randint(-100, 100), revision=rnd.randrange(3),
+            )])
+        # reclassify a row, then compare with a full recompute
+        rec = s.get(models.FinanceRow, 1)
+        old = summary.row_kind(rec, 1)
+        rec.deleted = True
+        summary.move_row(s, 2025, 1, old, summary.row_kind(rec, 1))
+
+        incremental = summary.year_summaries(s, 2024, 2025)
+        s.flush()
+        summary.rebuild(s)
+        assert summary.year_summaries(s, 2024, 2025) == incremental
+
+    y2025 = incremental[1]
+    assert y2025["carry_in"] == incremental[0]["leftover"]
+    assert y2025["months"][-1]["carry"] == round(y2025["carry_in"] + y2025["leftover"], 2)
+
+
+def test_concurrent_saves_of_one_cell_keep_the_totals(tmp_path):
+    import threading
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'summary.db'}",
+                           connect_args={"timeout": 30})
+    SQLModel.metadata.create_all(engine)
+    start = threading.Barrier(4)
+
+    def editor(seed: int) -> None:
+        rnd = random.Random(seed)
+        start.wait()
+        for _ in range(25):
+            with Session(engine) as s:
+                upsert_cells(s, [schemas.Cell(year=2025, row=1, col=3,
+                                              value=rnd.randint(1, 999), revision=0)])
+                s.commit()
+
+    threads = [threading.Thread(target=editor, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with Session(engine) as s:
+        incremental = summary.year_summaries(s, 2025, 2025)
+        summary.rebuild(s)
+        assert summary.year_summaries(s, 2025, 2025) == incremental
@@ -7,3 +7,21 @@ def test_tarif_basic():
     res = berechne_nrw_2025(inp)
     assert res.monatsgesamt > 0
 
+
+
+def test_matrix_matches_scalar_calculator():
+    from backend.app.tarif import get_monthly_breakdown
+    from backend.app.tarif_matrix import build_matrix
+
+    rows = build_matrix().rows(breakdown=True)
+    assert len(rows) == 20 * 6 * 2
+    for row in rows:
+        inp = TarifInputData(
+            entgeltgruppe=row["entgeltgruppe"],
+            stufe=row["stufe"],
+            wochenstunden=row["wochenstunden"],
+            betriebszugehoerigkeit_monate=row["betriebszugehoerigkeit_monate"],
+        )
+        res = berechne_nrw_2025(inp).asdict()
+        assert {k: row[k] for k in res} == res
+        assert row["monate"] == [m["Brutto"] for m in get_monthly_breakdown(inp)]
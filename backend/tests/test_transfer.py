@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app import models, transfer
+
+
+async def _roundtrip(fmt: str, piece: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as s:
+        s.add(models.FinanceRow(year=2024, row=1, description="Miete", irregular=True))
+        s.add_all(
+            models.FinanceCell(year=2024, row=r, col=c, value=r * 0.5 - c, revision=rev)
+            for r in range(10) for c in range(14) for rev in range(2)
+        )
+        await s.commit()
+        body = b"".join([chunk async for chunk in transfer.export_year(s, 2024, fmt)])
+
+    async def upload():                     # arbitrary splits, like a network stream
+        for i in range(0, len(body), piece):
+            yield body[i:i + piece]
+
+    async with Session() as s:
+        counts = await transfer.import_year(s, 2030, fmt, upload())
+        await s.commit()
+        cells = {
+            year: sorted(tuple(r) for r in await s.exec(
+                select(models.FinanceCell.row, models.FinanceCell.col,
+                       models.FinanceCell.value, models.FinanceCell.revision)
+                .where(models.FinanceCell.year == year)
+            ))
+            for year in (2024, 2030)
+        }
+        row = (await s.exec(select(models.FinanceRow).where(models.FinanceRow.year == 2030))).one()
+    await engine.dispose()
+    return counts, cells, row
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "binary"])
+def test_export_import_roundtrip(monkeypatch, fmt):
+    monkeypatch.setattr(transfer, "TRANSFER_CHUNK", 64)
+    counts, cells, row = asyncio.run(_roundtrip(fmt, piece=37))
+    assert counts == {"rows": 1, "cells": 280}
+    assert cells[2030] == cells[2024]
+    assert (row.description, row.irregular) == ("Miete", True)
+
+
+def test_binary_reader_rejects_garbage():
+    reader = transfer.BinaryReader()
+    with pytest.raises(transfer.TransferError):
+        list(reader.feed(b"nope-not-an-export"))
+    reader = transfer.BinaryReader()
+    list(reader.feed(transfer.MAGIC + b"\x03\xff"))
+    with pytest.raises(transfer.TransferError):
+        list(reader.close())
+    reader = transfer.BinaryReader()                # no buffering of a huge frame
+    with pytest.raises(transfer.TransferError):
+        list(reader.feed(transfer.MAGIC + transfer.FRAME.pack(transfer.CELLS, 2**32 - 1)))
+
+
+def test_ndjson_reader_rejects_out_of_range_and_endless_lines(monkeypatch):
+    reader = transfer.NdjsonReader()
+    with pytest.raises(transfer.TransferError):
+        list(reader.feed(b'{"kind":"cell","row":99999999999,"col":0,"value":1}\n'))
+        list(reader.close())
+    monkeypatch.setattr(transfer, "TRANSFER_MAX_FRAME", 100)
+    with pytest.raises(transfer.TransferError):
+        list(transfer.NdjsonReader().feed(b'{"kind":"row","description":"' + b"x" * 200))
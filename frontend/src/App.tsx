@@ -62,10 +62,10 @@ const App: React.FC = () => {
 
   /* persist every change */
   useEffect(() => {
-    saveSettings('tarif', tarifInput);
+    saveSettings('tarif', tarifInput).catch(console.error);
   }, [tarifInput]);
   useEffect(() => {
-    saveSettings('payroll', payrollInput);
+    saveSettings('payroll', payrollInput).catch(console.error);
   }, [payrollInput]);
 
   /* expose undo/redo coming from FinanceTable */
@@ -26,6 +26,15 @@ export async function saveCell(cell: Cell): Promise<void> {
   });
 }
 
+/** Bulk up-sert – one request (and one DB statement) for many cells */
+export async function saveCells(cells: Cell[]): Promise<void> {
+  await fetch('/api/finance/cells', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(cells)
+  });
+}
+
 export async function shiftRevision(
   year: number,
   dir: 'undo' | 'redo'
@@ -35,8 +44,119 @@ export async function shiftRevision(
   );
 }
 
+export interface Job {
+  id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'done' | 'failed' | 'cancelled';
+  done: number;
+  total: number | null;
+  error: string | null;
+}
+
+/** Poll a background job until it has finished (done / failed / cancelled) */
+export async function waitForJob(job: Job, intervalMs = 300): Promise<Job> {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+    job = await fetch(`/api/jobs/${job.id}`).then(r => r.json());
+  }
+  return job;
+}
+
+/** Wipe a year – runs as a chunked server job, resolves once it is finished */
 export async function resetFinanceYear(year: number): Promise<void> {
-  await fetch(`/api/finance/${year}/reset`, { method: 'DELETE' });
+  const job: Job = await fetch(`/api/finance/${year}/reset`, {
+    method: 'DELETE'
+  }).then(r => r.json());
+  await waitForJob(job);
+}
+
+/* ───────────────────────── monthly totals / carry-over ─────────────────── */
+
+export interface MonthSummary {
+  month: number;        // 0 = Jan … 11 = Dec
+  income: number;
+  expense: number;      // incl. irregular
+  irregular: number;
+  leftover: number;
+  carry: number;        // running, incl. carry_in
+}
+
+export interface YearSummary {
+  year: number;
+  carry_in: number;     // previous year's leftover
+  leftover: number;
+  months: MonthSummary[];
+}
+
+export async function getFinanceSummary(
+  from: number,
+  to: number = from
+): Promise<YearSummary[]> {
+  return fetch(`/api/finance/summary?from=${from}&to=${to}`).then(r => r.json());
+}
+
+export interface FinanceYear {
+  year: number;
+  revision: number;
+  rows: Record<number, RowMeta>;
+  cells?: Cell[];
+  totals?: Record<number, number>;  // aggregate=true: row → Jan … Dec sum
+}
+
+/** Latest cells + row meta of several years in one streamed request */
+export async function getFinanceRange(
+  from: number,
+  to: number,
+  aggregate = false
+): Promise<FinanceYear[]> {
+  return fetch(
+    `/api/finance/range?from=${from}&to=${to}&aggregate=${aggregate}`
+  ).then(r => r.json());
+}
+
+/* ───────────────────────── live changes ─────────────────────────────── */
+
+/** Coalesced changes of one year, pushed by the server */
+export interface FinanceDiff {
+  version: number;
+  resync: boolean;           // true → refetch the year, nothing else is set
+  cleared?: number[];        // rows whose cells were dropped
+  rows?: Omit<RowMeta, 'year'>[];
+  cells?: Omit<Cell, 'year'>[];
+  revision?: number | null;  // newly opened revision
+}
+
+/** Subscribe to a year's changes (SSE, reconnects itself); returns the unsubscribe */
+export function subscribeFinance(
+  year: number,
+  onDiff: (diff: FinanceDiff) => void
+): () => void {
+  const source = new EventSource(`/api/finance/${year}/events`);
+  source.addEventListener('diff', e => onDiff(JSON.parse((e as MessageEvent).data)));
+  return () => source.close();
+}
+
+/* ───────────────────────── export / import ─────────────────────────── */
+
+export type TransferFormat = 'ndjson' | 'binary';
+
+/** Download URL of a year's export (all revisions + row meta) */
+export function financeExportUrl(year: number, format: TransferFormat = 'ndjson'): string {
+  return `/api/finance/${year}/export?format=${format}`;
+}
+
+/** Replace a year with an export file; the body is streamed to the server */
+export async function importFinanceYear(
+  year: number,
+  file: Blob,
+  format: TransferFormat = 'ndjson'
+): Promise<{ rows: number; cells: number }> {
+  const res = await fetch(`/api/finance/${year}/import?format=${format}`, {
+    method: 'POST',
+    body: file
+  });
+  if (!res.ok) throw new Error((await res.json()).detail);
+  return res.json();
 }
 
 /* ───────────────────────── row-meta persistence ─────────────────────── */
@@ -75,10 +195,45 @@ export async function loadSettings<T = any>(group: string): Promise<T> {
   return fetch(`/api/settings/${group}`).then(r => r.json());
 }
 
-export async function saveSettings(group: string, data: any): Promise<void> {
-  await fetch(`/api/settings/${group}`, {
+interface PendingSave {
+  data: any;
+  timer: ReturnType<typeof setTimeout>;
+  waiters: { resolve: () => void; reject: (err: unknown) => void }[];
+}
+
+const pendingSettings: Record<string, PendingSave> = {};
+
+/** POST a group's pending settings now and settle every call it superseded */
+function flushSettings(group: string, keepalive = false): Promise<void> {
+  const pending = pendingSettings[group];
+  if (!pending) return Promise.resolve();
+  clearTimeout(pending.timer);
+  delete pendingSettings[group];
+  return fetch(`/api/settings/${group}`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify(data)
+    body: JSON.stringify(pending.data),
+    keepalive
+  }).then(
+    () => pending.waiters.forEach(w => w.resolve()),
+    err => pending.waiters.forEach(w => w.reject(err))
+  );
+}
+
+/** Debounced per group – a burst of edits is stored with a single POST */
+export function saveSettings(group: string, data: any, delayMs = 500): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const pending = pendingSettings[group];
+    if (pending) clearTimeout(pending.timer);
+    pendingSettings[group] = {
+      data,
+      waiters: [...(pending?.waiters ?? []), { resolve, reject }],
+      timer: setTimeout(() => flushSettings(group), delayMs)
+    };
   });
 }
+
+/* closing the tab inside the debounce window must not lose the last edit */
+window.addEventListener('pagehide', () =>
+  Object.keys(pendingSettings).forEach(group => flushSettings(group, true))
+);
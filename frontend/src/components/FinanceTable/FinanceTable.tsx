@@ -34,6 +34,7 @@ import {
   forwardRef,
   useEffect,
   useImperativeHandle,
+  useRef,
   useState,
   useCallback,
 } from "react";
@@ -54,11 +55,14 @@ import {
   Cell,
   getFinance,
   saveCell,
+  saveCells,
   shiftRevision,
   resetFinanceYear,
+  getFinanceSummary,
   getRowMeta,
   saveRowMeta,
   deleteRowMeta,
+  subscribeFinance,
 } from "../../api";
 
 /* Height (px) of the fixed toolbar – keep in sync with `h` below */
@@ -112,10 +116,13 @@ const FinanceTable = forwardRef<FinanceTableHandle, FinanceTableProps>(
     const [revision, setRevision] = useState(0);
     const [showChart, setShowChart] = useState(false);
     const [prevLeftover, setPrevLeftover] = useState(0);
+    const [reloads, setReloads] = useState(0);
     const [edit, setEdit] =
       useState<null | { rowIdx: number; col: number; val: number }>(null);
 
     const incomeDlg = useDisclosure();
+    /* newest revision the rows on screen reflect – live patches must match it */
+    const shownRef = useRef(0);
 
     /* ─── load CURRENT year snapshot + meta ─────────────── */
     useEffect(() => {
@@ -126,27 +133,56 @@ const FinanceTable = forwardRef<FinanceTableHandle, FinanceTableProps>(
         ]);
         setRows(toRows(cells, metaObj, year));
         setMeta(metaObj);
+        shownRef.current = cells.length ? cells[0].revision : 0;
         if (cells.length) setRevision(cells[0].revision);
       };
       loadCurrent();
-    }, [year, revision]);
+    }, [year, revision, reloads]);
+
+    /* ─── live changes from other tabs / users ──────────── */
+    const rowsRef = useRef(rows);
+    rowsRef.current = rows;
+    useEffect(
+      () =>
+        subscribeFinance(year, (diff) => {
+          if (diff.revision != null) {
+            /* a redo elsewhere: the newly opened revision holds no cells
+               yet, so just follow its number; any other jump → refetch */
+            if (diff.revision === shownRef.current + 1) {
+              shownRef.current = diff.revision;
+            } else if (diff.revision !== shownRef.current) {
+              setReloads((n) => n + 1);
+            }
+            return;
+          }
+          const known = new Set(rowsRef.current.map((r) => r.idx));
+          if (
+            diff.resync ||
+            diff.rows?.length ||
+            diff.cleared?.length ||
+            diff.cells?.some((c) => !known.has(c.row) || c.revision !== shownRef.current)
+          ) {
+            setReloads((n) => n + 1);
+            return;
+          }
+          setRows((prev) =>
+            prev.map((r) => {
+              const changed = (diff.cells ?? []).filter((c) => c.row === r.idx && c.col < 12);
+              if (!changed.length) return r;
+              const values = [...r.values];
+              changed.forEach((c) => (values[c.col] = c.value));
+              return { ...r, values };
+            }),
+          );
+        }),
+      [year],
+    );
 
-    /* ─── load PREVIOUS year for carry-over ─────────────── */
+    /* ─── carry-over from the PREVIOUS year (server-side totals) ── */
     useEffect(() => {
-      const loadPrev = async () => {
-        const [cellsPrev, metaPrev] = await Promise.all([
-          getFinance(year - 1),
-          getRowMeta(year - 1),
-        ]);
-        if (!cellsPrev.length) {
-          setPrevLeftover(0);
-          return;
-        }
-        const prevRows = toRows(cellsPrev, metaPrev, year - 1);
-        const left = calcMonthlyLeftover(prevRows, 0);
-        setPrevLeftover(left[left.length - 1] ?? 0);
-      };
-      loadPrev();
+      getFinanceSummary(year).then(([summary]) =>
+        setPrevLeftover(summary?.carry_in ?? 0)
+      );
     }, [year]);
 
     /* expose undo / redo to parent */
@@ -216,16 +252,14 @@ const FinanceTable = forwardRef<FinanceTableHandle, FinanceTableProps>(
       (async () => {
         try {
           const rev = await shiftRevision(year, "redo");
-          await Promise.all(
-            newVals.map((v, m) =>
-              saveCell({
-                year,
-                row: rowIdx,
-                col: m,
-                value: v,
-                revision: rev,
-              }),
-            ),
+          await saveCells(
+            newVals.map((v, m) => ({
+              year,
+              row: rowIdx,
+              col: m,
+              value: v,
+              revision: rev,
+            })),
           );
           setRevision(rev);
         } catch (err) {
@@ -606,16 +640,14 @@ const FinanceTable = forwardRef<FinanceTableHandle, FinanceTableProps>(
           payrollInput={payrollInput}
           applyIncome={async (nets, incomeRowIdx, yr) => {
             const rev = await shiftRevision(yr, "redo");
-            await Promise.all(
-              nets.map((v, m) =>
-                saveCell({
-                  year: yr,
-                  row: incomeRowIdx,
-                  col: m,
-                  value: v,
-                  revision: rev,
-                }),
-              ),
+            await saveCells(
+              nets.map((v, m) => ({
+                year: yr,
+                row: incomeRowIdx,
+                col: m,
+                value: v,
+                revision: rev,
+              })),
             );
             setRows((prev) =>
               prev.map((r) =>
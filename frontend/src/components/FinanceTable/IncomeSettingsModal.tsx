@@ -62,49 +62,21 @@ const IncomeSettingsModal: FC<Props> = ({
             onClick={async () => {
               setSaving(true);
               try {
-                /* 1️⃣  month-by-month gross breakdown ---------- */
-                const breakdown: { Monat: string; Brutto: number }[] =
-                  await fetch('/api/tarif/breakdown', {
+                /* 1️⃣  tarif ➜ monthly net in one call ------------ */
+                const { monate }: { monate: { Netto: number }[] } =
+                  await fetch('/api/tarif/net', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(incomeTarif),
+                    body: JSON.stringify({
+                      tarif: incomeTarif,
+                      payroll: incomePayroll,
+                    }),
                   }).then((r) => r.json());
 
-                const monthIdx: Record<string, number> = {
-                  Januar: 0,
-                  Februar: 1,
-                  März: 2,
-                  April: 3,
-                  Mai: 4,
-                  Juni: 5,
-                  Juli: 6,
-                  August: 7,
-                  September: 8,
-                  Oktober: 9,
-                  November: 10,
-                  Dezember: 11,
-                };
+                /* months arrive in calendar order (Januar … Dezember) */
+                const nets: number[] = monate.map((m) => m.Netto);
 
-                /* 2️⃣  gross ➜ net for each month -------------- */
-                const nets: number[] = Array(12).fill(0);
-                await Promise.all(
-                  breakdown.map(async (rec) => {
-                    const { net } = await fetch(
-                      '/api/payroll/gross-to-net',
-                      {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                          ...incomePayroll,
-                          gross: rec.Brutto,
-                        }),
-                      },
-                    ).then((r) => r.json());
-                    nets[monthIdx[rec.Monat]] = net;
-                  }),
-                );
-
-                /* 3️⃣  persist + update table ------------------- */
+                /* 2️⃣  persist + update table ------------------- */
                 await applyIncome(nets, incomeRowIdx, year);
                 onClose();
               } finally {
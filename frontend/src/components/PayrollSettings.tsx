@@ -67,7 +67,7 @@ const PayrollSettings: React.FC<Props> = ({ value, onChange }) => {
 
   /* persist */
   useEffect(() => {
-    saveSettings('payroll', value);
+    saveSettings('payroll', value).catch(console.error);
   }, [value]);
 
   const num = (
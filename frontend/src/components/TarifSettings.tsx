@@ -126,7 +126,7 @@ const TarifSettings: React.FC<Props> = ({ value, onChange }) => {
 
   /* persist every change (App persists too, this is redundancy-safe) */
   useEffect(() => {
-    saveSettings('tarif', value);
+    saveSettings('tarif', value).catch(console.error);
   }, [value]);
 
   return (